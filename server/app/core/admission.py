@@ -0,0 +1,76 @@
+"""
+Admission control for generation requests.
+
+Generation requests are expensive and queue behind each other; once this
+worker is saturated, new ones are turned away with 503 and Retry-After so
+the load balancer or client tries another replica later. Everything else
+(reads, auth, uploads) is always admitted.
+"""
+import json
+import math
+import re
+from typing import Iterable, Optional, Tuple
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.circuit_breaker import OPEN, gemini_circuit_breaker
+from app.core.config import settings
+from app.core.inflight import generation_tracker
+from app.core.metrics import current_loop_lag
+from app.services.generation_scheduler import get_generation_scheduler
+
+# Paths (below the API prefix) of endpoints that start Gemini work
+GENERATION_PATHS = (
+    r"/campaigns/[^/]+/generate-[a-z-]+",
+    r"/campaigns/[^/]+/(?:ideas|ad-copy)/[^/]+/regenerate",
+    r"/campaigns/[^/]+/localize-ad-copy",
+    r"/campaigns/batches",
+)
+
+
+def overload_reason() -> Optional[Tuple[str, int]]:
+    """
+    Why this worker should not take new generation work right now.
+
+    Returns:
+        (reason, retry-after seconds), or None if it can accept work
+    """
+    if generation_tracker.draining:
+        return "shutting down", settings.ADMISSION_RETRY_AFTER_SECONDS
+    if gemini_circuit_breaker.state == OPEN:
+        return "the generation provider is failing", math.ceil(gemini_circuit_breaker.retry_after) or 1
+    if get_generation_scheduler().queue_depth >= settings.ADMISSION_MAX_QUEUE_DEPTH:
+        return "generation queue is full", settings.ADMISSION_RETRY_AFTER_SECONDS
+    if current_loop_lag() * 1000 >= settings.ADMISSION_MAX_LOOP_LAG_MS:
+        return "server is overloaded", settings.ADMISSION_RETRY_AFTER_SECONDS
+    return None
+
+
+class AdmissionControlMiddleware:
+    """Reject new generation requests with 503 + Retry-After while overloaded"""
+
+    def __init__(self, app: ASGIApp, api_prefix: str = "", paths: Iterable[str] = GENERATION_PATHS):
+        self.app = app
+        self.pattern = re.compile(
+            "^" + re.escape(api_prefix) + "(?:" + "|".join(paths) + ")$"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["method"] == "POST" and self.pattern.match(scope["path"]):
+            overload = overload_reason()
+            if overload:
+                reason, retry_after = overload
+                body = json.dumps({
+                    "message": f"Service temporarily unavailable: {reason}, please retry",
+                    "status_code": 503
+                }).encode()
+                await send({
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"retry-after", str(retry_after).encode()),
+                    ],
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
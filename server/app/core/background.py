@@ -0,0 +1,32 @@
+import asyncio
+import logging
+from typing import Coroutine, Set
+
+logger = logging.getLogger(__name__)
+
+# Strong references: the event loop only keeps weak ones to running tasks
+_tasks: Set[asyncio.Task] = set()
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_name()} failed", exc_info=task.exception())
+
+
+def spawn(work: Coroutine, name: str) -> asyncio.Task:
+    """Run work in the background, outliving the request that started it"""
+    task = asyncio.create_task(work, name=name)
+    _tasks.add(task)
+    task.add_done_callback(_log_failure)
+    return task
+
+
+async def cancel_background_tasks() -> None:
+    """Cancel background work still running at shutdown and wait for it to unwind"""
+    tasks = list(_tasks)
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        logger.warning(f"Cancelled {len(tasks)} background task(s) at shutdown")
+        await asyncio.gather(*tasks, return_exceptions=True)
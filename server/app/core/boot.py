@@ -0,0 +1,51 @@
+"""
+Boot latency report.
+
+Records how long importing the app and each startup phase took, logs one
+"Startup report" record per worker and exports the phases as metrics so
+boot latency can be compared across releases.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+from app.core.config import settings
+from app.core.metrics import STARTUP_PHASE_DURATION
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Durations of the import and lifespan startup phases"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = seconds
+        STARTUP_PHASE_DURATION.labels(name).set(seconds)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a startup phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def log(self) -> None:
+        total = sum(self.phases.values())
+        STARTUP_PHASE_DURATION.labels("total").set(total)
+        logger.info(
+            f"Startup finished in {total * 1000:.0f} ms",
+            extra={
+                "event": "startup_report",
+                "version": settings.APP_VERSION,
+                "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+                "total_ms": round(total * 1000, 1),
+            }
+        )
+
+
+startup_report = StartupReport()
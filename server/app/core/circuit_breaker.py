@@ -0,0 +1,56 @@
+import time
+from typing import Optional
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for an upstream dependency.
+
+    After `failure_threshold` failures in a row the circuit opens for
+    `reset_timeout` seconds; then it is half-open and the next call decides
+    whether it closes again or re-opens.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the circuit is half-open (0 unless open)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+# Fed by the outcome of every Gemini API call (see app.core.metrics.observe_gemini)
+gemini_circuit_breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=settings.GEMINI_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.GEMINI_CIRCUIT_RESET_SECONDS
+)
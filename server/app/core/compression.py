@@ -0,0 +1,152 @@
+"""
+Response compression (brotli when available, otherwise gzip).
+
+Buffered responses are compressed in one go once they pass the minimum
+size; streaming responses are compressed chunk by chunk with a flush after
+each chunk so clients still receive data as it is produced.
+"""
+import zlib
+from typing import Iterable, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.static_files import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only without it
+    brotli = None
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        # wbits=31: gzip container
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing allowlisted response types.
+
+    Responses are left alone when the client does not accept gzip/br, the
+    path is excluded, the body is already encoded, the content type is not
+    allowlisted or a buffered body is below the minimum size.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        content_types: Iterable[str] = ("application/json",),
+        exclude_paths: Iterable[str] = (),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = tuple(content_type.lower() for content_type in content_types)
+        self.exclude_paths = tuple(exclude_paths)
+
+    def _encoding_for(self, scope: Scope) -> Optional[str]:
+        accepted = accepted_encodings(Headers(scope=scope))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+    def _compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        # Entries ending in "/" match a whole family (e.g. "text/")
+        return any(
+            content_type.startswith(allowed) if allowed.endswith("/") else content_type == allowed
+            for allowed in self.content_types
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = self._encoding_for(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                passthrough = not self._compressible(Headers(raw=message["headers"]))
+                if passthrough:
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    # Small buffered body: not worth the CPU
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = self._compressor(encoding)
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The encoded bytes differ, so the validator can only be weak
+                    headers["etag"] = f"W/{etag}"
+                if more_body:
+                    del headers["content-length"]
+                    await send(start_message)
+                else:
+                    compressed = compressor.process(body) + compressor.finish()
+                    headers["content-length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+            data = compressor.process(body) if body else b""
+            if not more_body:
+                data += compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
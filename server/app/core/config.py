@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import Field, computed_field
 import json
 import os
@@ -23,6 +23,93 @@ class Settings(BaseSettings):
     SERVER_URL:str = "http://localhost:8000"
     CLIENT_URL:str = "http://localhost:3000"
     
+    # Server (production launcher: serve.py)
+    SERVER_HOST: str = Field(default="0.0.0.0", description="Bind address")
+    SERVER_PORT: int = Field(default=8000, description="Bind port")
+    WEB_CONCURRENCY: int = Field(default=0, description="Worker processes (0 = one per CPU)")
+    SERVER_BACKLOG: int = Field(default=2048, description="Maximum number of pending connections")
+    SERVER_KEEP_ALIVE_TIMEOUT: int = Field(default=5, description="Seconds to keep idle keep-alive connections open")
+    SERVER_LIMIT_CONCURRENCY: int = Field(default=0, description="Maximum concurrent connections per worker before 503 (0 = unlimited)")
+    SERVER_GRACEFUL_SHUTDOWN_TIMEOUT: int = Field(default=120, description="Seconds uvicorn waits for open connections on shutdown")
+    SERVER_FORWARDED_ALLOW_IPS: str = Field(default="127.0.0.1", description="Proxy IPs trusted for X-Forwarded-* headers")
+    SERVER_ACCESS_LOG: bool = Field(default=True, description="Enable uvicorn access log")
+    SHUTDOWN_DRAIN_TIMEOUT: int = Field(default=90, description="Seconds to wait for in-flight generation requests before closing MongoDB")
+    
+    # Response compression (brotli when installed, otherwise gzip)
+    COMPRESSION_ENABLED: bool = Field(default=True, description="Compress API responses")
+    COMPRESSION_MINIMUM_SIZE: int = Field(default=1024, description="Smallest buffered response body in bytes that gets compressed")
+    COMPRESSION_GZIP_LEVEL: int = Field(default=6, description="gzip compression level (1-9)")
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=4, description="Brotli quality (0-11)")
+    COMPRESSION_CONTENT_TYPES_STR: str = Field(
+        default="application/json,text/,application/javascript,image/svg+xml",
+        description="Comma-separated content types to compress; entries ending in / match a family"
+    )
+    
+    # Logging
+    LOG_LEVEL: str = Field(default="INFO", description="Root log level")
+    LOG_LEVELS: str = Field(default="", description="Per-module levels, e.g. app.services.agent=DEBUG,pymongo=WARNING")
+    LOG_FORMAT: str = Field(default="json", description="Log output format: json or text")
+    LOG_DEBUG_SAMPLE_RATE: float = Field(default=1.0, description="Fraction of DEBUG records kept (0-1)")
+    
+    # Generation scheduling (capacity per worker, user limits across workers)
+    GENERATION_MAX_CONCURRENCY: int = Field(default=8, description="Generation requests running at once per worker")
+    DEFAULT_PLAN: str = Field(default="free", description="Plan used for users without one")
+    GENERATION_PLAN_LIMITS_STR: str = Field(
+        default='{"free": {"max_in_flight": 1, "weight": 1}, "pro": {"max_in_flight": 3, "weight": 2}, "agency": {"max_in_flight": 6, "weight": 4}}',
+        description="JSON: plan -> max_in_flight (concurrent generations per user, across all workers) and weight (fair-share weight within a worker)"
+    )
+    
+    # Load shedding and readiness
+    ADMISSION_MAX_QUEUE_DEPTH: int = Field(default=50, description="Queued generation requests at which new ones get 503 and readiness fails")
+    ADMISSION_MAX_LOOP_LAG_MS: int = Field(default=500, description="Event loop lag in ms at which new generation requests get 503 and readiness fails")
+    ADMISSION_RETRY_AFTER_SECONDS: int = Field(default=10, description="Retry-After sent with load-shedding 503s")
+    READINESS_MONGO_TIMEOUT: float = Field(default=1.0, description="Seconds the readiness MongoDB ping may take")
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5, description="Consecutive Gemini failures that open the circuit")
+    GEMINI_CIRCUIT_RESET_SECONDS: int = Field(default=30, description="Seconds the Gemini circuit stays open before a trial call")
+    
+    # Generation single-flight and idempotency
+    GENERATION_LEASE_TTL_SECONDS: int = Field(default=60, description="Lease (and per-user slot) lifetime for a running generation; renewed while it runs")
+    GENERATION_LEASE_POLL_INTERVAL: float = Field(default=0.5, description="Seconds between checks while waiting on another worker's generation or a free user slot")
+    IDEMPOTENCY_KEY_TTL_HOURS: int = Field(default=24, description="Hours stored responses are replayed for an Idempotency-Key")
+    
+    # Generation deadlines (keep them below the proxy's timeout)
+    GENERATION_DEADLINES_STR: str = Field(
+        default='{"generate_ideas": 60, "generate_ad_copy": 90, "generate_image": 60, "regenerate_idea": 30, "regenerate_ad_copy_field": 20, "generate_ad_copy_variants": 45, "localize_ad_copy": 60}',
+        description="JSON: generation operation -> seconds the whole request may take"
+    )
+    GENERATION_DEFAULT_DEADLINE_SECONDS: float = Field(default=60.0, description="Deadline for generation operations missing from GENERATION_DEADLINES_STR")
+    GENERATION_MIN_STAGE_SECONDS: float = Field(default=3.0, description="Stages with less budget than this are skipped instead of started")
+    
+    # Localization
+    LOCALIZATION_CHUNK_SIZE: int = Field(default=8, description="Locales translated per model call")
+    TRANSLATION_CACHE_TTL_DAYS: int = Field(default=90, description="Days cached ad copy translations are kept")
+    
+    # Brand context compiled from onboarding data for generation prompts
+    BRAND_CONTEXT_CACHE_TTL_SECONDS: float = Field(default=300.0, description="Seconds a worker keeps a compiled brand context (other workers' onboarding edits show up after this)")
+    BRAND_CONTEXT_CACHE_SIZE: int = Field(default=10000, description="Users whose brand context a worker keeps in memory")
+    
+    # Bulk campaign creation
+    CAMPAIGN_BATCH_POLL_INTERVAL: float = Field(default=1.0, description="Seconds between progress checks when streaming a batch")
+    CAMPAIGN_BATCH_STALE_SECONDS: int = Field(default=600, description="Seconds without progress after which a running batch is reported interrupted")
+    
+    # Client disconnects
+    GENERATION_CANCEL_ON_DISCONNECT: bool = Field(default=True, description="Cancel generation (and its model calls) when the client disconnects")
+    GENERATION_DISCONNECT_POLL_INTERVAL: float = Field(default=0.5, description="Seconds between client connection checks during generation")
+    
+    # Startup
+    WARMUP_ON_STARTUP: bool = Field(default=True, description="Build generation services and warm MongoDB/Gemini connections before serving")
+    MONGO_WARMUP_CONNECTIONS: int = Field(default=4, description="MongoDB pool connections opened at startup")
+    GEMINI_WARMUP_TIMEOUT: float = Field(default=5.0, description="Seconds the startup Gemini warmup call may take")
+    
+    # Metrics
+    METRICS_ENABLED: bool = Field(default=True, description="Expose Prometheus metrics at /metrics and record request/dependency latencies")
+    
+    # Event loop watchdog
+    LOOP_WATCHDOG_ENABLED: bool = Field(default=True, description="Detect event loop stalls and record the blocking call site")
+    LOOP_STALL_THRESHOLD_MS: int = Field(default=100, description="Loop stall length in milliseconds that gets recorded")
+    LOOP_STALL_STACK_DEPTH: int = Field(default=30, description="Frames captured from the loop thread per stall")
+    DEBUG_ENDPOINTS_ENABLED: bool = Field(default=False, description="Expose /debug endpoints (loop stall report)")
+    
     # API
     API_V1_PREFIX: str = Field(default="/api", description="API v1 prefix")
     
@@ -39,15 +126,44 @@ class Settings(BaseSettings):
     EMAIL_ADDRESS:str = "your-email-id"
     EMAIL_PASSWORD:str = "your-app-password"
     PASSWORD_RESET_TOKEN_EXPIRE_HOURS: int = Field(default=24, description="Password reset token expiration in hours")
-    
+
+    # Company details (used in email footers)
+    COMPANY_NAME: str = Field(default="Creative Flow", description="Company name shown in emails")
+    COMPANY_ADDRESS: str = Field(default="", description="Company postal address shown in emails")
+    SUPPORT_EMAIL: str = Field(default="support@yourcompany.com", description="Support contact address shown in emails")
+
     # File Upload
     UPLOAD_DIR: str = Field(default="uploads", description="Directory for file uploads")
     MAX_UPLOAD_SIZE: int = Field(default=5242880, description="Maximum upload size in bytes (5MB)")
+    MAX_FONT_UPLOAD_SIZE: int = Field(default=10485760, description="Maximum font upload size in bytes (10MB)")
+    UPLOAD_CHUNK_SIZE: int = Field(default=262144, description="Chunk size in bytes used when streaming uploads to disk")
+    UPLOADS_CACHE_MAX_AGE: int = Field(default=31536000, description="Cache-Control max-age in seconds for immutable /uploads files")
     ALLOWED_EXTENSIONS_STR: str = Field(
         default=".jpg,.jpeg,.png,.svg,.gif",
         description="Comma-separated list of allowed file extensions (from env)"
     )
     
+    # Image derivatives
+    IMAGE_DERIVATIVE_WORKERS: int = Field(default=2, description="Worker processes used to render image thumbnails and WebP/AVIF variants")
+    IMAGE_THUMBNAIL_SIZE: int = Field(default=320, description="Longest side in pixels of thumbnail variants")
+    IMAGE_MEDIUM_SIZE: int = Field(default=1024, description="Longest side in pixels of medium variants")
+    IMAGE_VARIANT_QUALITY: int = Field(default=80, description="WebP/AVIF encoder quality (0-100)")
+    
+    # Asset garbage collection
+    ASSET_GC_ENABLED: bool = Field(default=True, description="Run the background collector for unreferenced uploads")
+    ASSET_GC_GRACE_DAYS: int = Field(default=7, description="Days a file must be unreferenced before it is deleted")
+    ASSET_GC_INTERVAL_SECONDS: int = Field(default=3600, description="Seconds between garbage collection runs")
+    
+    # Object storage
+    STORAGE_BACKEND: str = Field(default="local", description="Storage backend for uploads and generated images: 'local' or 's3'")
+    S3_BUCKET: str = Field(default="", description="S3 bucket name (STORAGE_BACKEND=s3)")
+    S3_ENDPOINT_URL: str = Field(default="", description="S3-compatible endpoint URL, e.g. a local MinIO (empty for AWS)")
+    S3_REGION: str = Field(default="", description="S3 region")
+    S3_ACCESS_KEY_ID: str = Field(default="", description="S3 access key ID (empty to use the default credential chain)")
+    S3_SECRET_ACCESS_KEY: str = Field(default="", description="S3 secret access key")
+    S3_PUBLIC_URL: str = Field(default="", description="Public/CDN base URL for the bucket; presigned URLs are used when empty")
+    S3_PRESIGNED_URL_EXPIRE_SECONDS: int = Field(default=3600, description="Lifetime of presigned download URLs in seconds")
+    
     # CORS
     CORS_ORIGINS_STR: str = Field(
         default="http://localhost:3000,http://localhost:3001,http://127.0.0.1:3000",
@@ -75,6 +191,39 @@ class Settings(BaseSettings):
         # Parse as comma-separated string
         return [ext.strip() for ext in self.ALLOWED_EXTENSIONS_STR.split(',') if ext.strip()]
     
+    @computed_field
+    @property
+    def GENERATION_PLAN_LIMITS(self) -> Dict[str, Dict[str, float]]:
+        """Parse per-plan generation limits from JSON - Returns dict"""
+        try:
+            parsed = json.loads(self.GENERATION_PLAN_LIMITS_STR)
+            if isinstance(parsed, dict):
+                return parsed
+        except (json.JSONDecodeError, TypeError):
+            pass
+        return {self.DEFAULT_PLAN: {"max_in_flight": 1, "weight": 1}}
+    
+    @computed_field
+    @property
+    def GENERATION_DEADLINES(self) -> Dict[str, float]:
+        """Parse per-operation generation deadlines from JSON - Returns dict"""
+        try:
+            parsed = json.loads(self.GENERATION_DEADLINES_STR)
+            if isinstance(parsed, dict):
+                return {operation: float(seconds) for operation, seconds in parsed.items()}
+        except (json.JSONDecodeError, TypeError, ValueError):
+            pass
+        return {}
+    
+    @computed_field
+    @property
+    def COMPRESSION_CONTENT_TYPES(self) -> List[str]:
+        """Parse compressible content types from comma-separated string - Returns list"""
+        return [
+            content_type.strip() for content_type in self.COMPRESSION_CONTENT_TYPES_STR.split(',')
+            if content_type.strip()
+        ]
+    
     @computed_field
     @property
     def CORS_ORIGINS(self) -> List[str]:
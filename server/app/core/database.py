@@ -1,5 +1,7 @@
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
+from app.core.metrics import mongo_event_listeners
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,7 +17,10 @@ db = Database()
 async def connect_to_mongo():
     """Create database connection"""
     try:
-        db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+        db.client = AsyncIOMotorClient(
+            settings.MONGODB_URL,
+            event_listeners=mongo_event_listeners() if settings.METRICS_ENABLED else None
+        )
         # Test connection
         await db.client.admin.command('ping')
         logger.info("Connected to MongoDB")
@@ -31,6 +36,22 @@ async def close_mongo_connection():
         logger.info("Disconnected from MongoDB")
 
 
+async def warm_up_mongo(connections: int) -> None:
+    """Open several pool connections up front with concurrent pings"""
+    await asyncio.gather(*(db.client.admin.command('ping') for _ in range(connections)))
+
+
+async def ping_mongo(timeout: float) -> bool:
+    """Whether MongoDB answers a ping within the timeout"""
+    if not db.client:
+        return False
+    try:
+        await asyncio.wait_for(db.client.admin.command('ping'), timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+
 async def get_database():
     """Get database instance"""
     return db.client[settings.DATABASE_NAME]
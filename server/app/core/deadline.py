@@ -0,0 +1,68 @@
+"""
+Request deadlines and per-stage time budgets.
+
+A generation request gets one deadline when it arrives (configured per
+operation). Each pipeline stage runs within a share of whatever time is
+left, so a slow early stage shrinks the later ones instead of pushing the
+request past the proxy timeout; callers catch asyncio.TimeoutError to
+degrade (skip or replace the stage) rather than fail.
+"""
+import asyncio
+import time
+from typing import Awaitable, Optional, TypeVar
+from app.core.config import settings
+from app.core.metrics import GENERATION_DEGRADED
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """Point in time a request's work has to be finished by"""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def for_operation(cls, operation: str) -> "Deadline":
+        """Deadline configured for a generation operation (e.g. "generate_ideas")"""
+        return cls(settings.GENERATION_DEADLINES.get(operation, settings.GENERATION_DEFAULT_DEADLINE_SECONDS))
+
+    def remaining(self) -> float:
+        """Seconds left (0 once expired)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+
+async def run_stage(work: Awaitable[T], deadline: Optional[Deadline], share: float = 1.0) -> T:
+    """
+    Run a pipeline stage within its share of the remaining budget.
+
+    Args:
+        work: Coroutine performing the stage
+        deadline: Request deadline; None runs the stage without a timeout
+        share: Fraction of the remaining time this stage may use (the last
+            stage takes 1.0)
+
+    Returns:
+        The stage's result
+
+    Raises:
+        asyncio.TimeoutError: The budget ran out, or was already below
+            GENERATION_MIN_STAGE_SECONDS so the stage was not started
+    """
+    if deadline is None:
+        return await work
+    budget = deadline.remaining() * share
+    if budget < settings.GENERATION_MIN_STAGE_SECONDS:
+        if asyncio.iscoroutine(work):
+            work.close()
+        raise asyncio.TimeoutError
+    return await asyncio.wait_for(work, budget)
+
+
+def record_degraded(stage: str) -> None:
+    """Count a stage skipped or replaced because the budget ran out"""
+    GENERATION_DEGRADED.labels(stage).inc()
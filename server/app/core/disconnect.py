@@ -0,0 +1,85 @@
+"""
+Cancellation of request work when the client goes away.
+
+Starlette does not cancel a handler when the client disconnects, so a
+closed tab would otherwise still pay for every model call of a generation
+pipeline. `run_until_disconnected` polls the connection while the work
+runs and cancels it as soon as the client is gone.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, TypeVar
+from starlette.requests import Request
+from app.core.config import settings
+from app.core.exceptions import ClientDisconnectedError
+from app.core.metrics import GENERATION_CANCELLED
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+async def _wait_for_disconnect(request: Request, poll_interval: float) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(poll_interval)
+
+
+async def run_until_disconnected(
+    request: Request,
+    work: Awaitable[T],
+    operation: str,
+    keep_running: Optional[Callable[[], bool]] = None
+) -> T:
+    """
+    Await `work`, cancelling it if the client disconnects first.
+
+    Args:
+        request: Request whose connection is watched
+        work: Coroutine doing the request's work
+        operation: Operation name for logs and metrics, e.g. "generate_ideas"
+        keep_running: Checked on disconnect; if it returns True the work is
+            finished anyway (e.g. another request is waiting for its result)
+
+    Returns:
+        The result of `work`
+
+    Raises:
+        ClientDisconnectedError: The client disconnected and the work was cancelled
+    """
+    if not settings.GENERATION_CANCEL_ON_DISCONNECT:
+        return await work
+
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.create_task(
+        _wait_for_disconnect(request, settings.GENERATION_DISCONNECT_POLL_INTERVAL)
+    )
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    if task.done():
+        return task.result()
+    if watcher.exception() is not None:
+        # Could not read the connection state: just finish the work
+        logger.warning(f"Disconnect watch for {operation} failed: {watcher.exception()}")
+        return await task
+
+    if keep_running is not None and keep_running():
+        logger.info(f"Client disconnected during {operation}; finishing for waiting requests")
+        return await task
+
+    logger.info(f"Client disconnected during {operation}; cancelling generation")
+    GENERATION_CANCELLED.labels(operation).inc()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        # Failed before the cancellation landed; nobody is left to tell
+        logger.debug(f"{operation} failed while cancelling: {e}")
+    raise ClientDisconnectedError()
@@ -30,8 +30,27 @@ class ForbiddenError(AppException):
         super().__init__(message, status_code=403)
 
 
+class ServiceUnavailableError(AppException):
+    """Service temporarily unavailable"""
+    def __init__(self, message: str = "Service temporarily unavailable"):
+        super().__init__(message, status_code=503)
+
+
 class ConflictError(AppException):
     """Resource conflict"""
     def __init__(self, message: str = "Resource already exists"):
         super().__init__(message, status_code=409)
 
+
+
+class ClientDisconnectedError(AppException):
+    """Client closed the connection before the response was ready"""
+    def __init__(self, message: str = "Client closed request"):
+        # 499: nginx's "client closed request"; only ever seen in logs and metrics
+        super().__init__(message, status_code=499)
+
+
+class DeadlineExceededError(AppException):
+    """Request ran out of its time budget"""
+    def __init__(self, message: str = "Request timed out"):
+        super().__init__(message, status_code=504)
@@ -0,0 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class InFlightTracker:
+    """Counts in-flight work so shutdown can wait for it to finish"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.draining = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @asynccontextmanager
+    async def track(self) -> AsyncIterator[None]:
+        """Mark a unit of work as in flight for the duration of the block"""
+        self.count += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.count -= 1
+            if self.count == 0:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stop admitting work and wait for in-flight work to finish.
+
+        Returns:
+            True if everything finished within the timeout
+        """
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+# Gemini generation requests (ideas, ad copy, images)
+generation_tracker = InFlightTracker("generation")
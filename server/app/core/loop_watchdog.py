@@ -0,0 +1,152 @@
+"""
+Event loop stall detector.
+
+A heartbeat task stamps the time on every loop tick; a monitor thread
+notices when the stamp goes stale and captures the loop thread's stack,
+so blocking calls (sync SDK calls, bcrypt, smtplib, file I/O) show up
+with the call site that caused them.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import EVENT_LOOP_STALLS, EVENT_LOOP_STALL_DURATION
+
+# Frames under this directory are preferred as the reported call site
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Distinct call sites kept before new ones are folded into "<other>"
+MAX_CALL_SITES = 200
+
+
+def _call_site(stack: traceback.StackSummary) -> str:
+    """Innermost application frame, or the innermost frame if none is ours"""
+    frames = [frame for frame in stack if frame.filename.startswith(APP_ROOT)] or list(stack)
+    if not frames:
+        return "<unknown>"
+    frame = frames[-1]
+    filename = os.path.relpath(frame.filename, os.path.dirname(APP_ROOT)) if frame.filename.startswith(APP_ROOT) else frame.filename
+    return f"{filename}:{frame.lineno} in {frame.name}"
+
+
+class LoopStallDetector:
+    """Watches one event loop from a background thread and aggregates stalls by call site"""
+
+    def __init__(self, threshold_ms: int = 100, stack_depth: int = 30):
+        self.threshold = threshold_ms / 1000
+        self.stack_depth = stack_depth
+        self._interval = self.threshold / 2
+        self._last_tick = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._monitor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._sites: Dict[str, dict] = {}
+        # (tick stamp, call site) of the stall currently in progress
+        self._current: Optional[tuple] = None
+
+    @property
+    def running(self) -> bool:
+        return self._monitor is not None and self._monitor.is_alive()
+
+    def start(self) -> None:
+        """Start watching the running loop; call from inside the loop"""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._tick())
+        self._monitor = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._monitor.start()
+
+    def stop(self) -> None:
+        """Stop the heartbeat task and the monitor thread"""
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._monitor:
+            self._monitor.join(timeout=1)
+            self._monitor = None
+
+    async def _tick(self) -> None:
+        while True:
+            self._last_tick = time.monotonic()
+            await asyncio.sleep(self._interval)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self._interval):
+            last_tick = self._last_tick
+            if self._current and self._current[0] != last_tick:
+                # Loop is running again: the stall lasted until this tick
+                self._finish_stall(last_tick - self._current[0] - self._interval)
+            elif self._current is None and time.monotonic() - last_tick > self.threshold:
+                self._begin_stall(last_tick)
+
+    def _begin_stall(self, tick: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame, limit=self.stack_depth)
+        site = _call_site(stack)
+        with self._lock:
+            if site not in self._sites and len(self._sites) >= MAX_CALL_SITES:
+                site = "<other>"
+            entry = self._sites.setdefault(site, {
+                "count": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+                "last_seen": None,
+                "stack": [],
+            })
+            entry["count"] += 1
+            entry["last_seen"] = time.time()
+            entry["stack"] = traceback.format_list(stack)
+        EVENT_LOOP_STALLS.labels(site).inc()
+        self._current = (tick, site)
+
+    def _finish_stall(self, duration: float) -> None:
+        _, site = self._current
+        self._current = None
+        duration = max(duration, self.threshold)
+        with self._lock:
+            entry = self._sites.get(site)
+            if entry:  # may have been reset mid-stall
+                entry["total_seconds"] += duration
+                entry["max_seconds"] = max(entry["max_seconds"], duration)
+        EVENT_LOOP_STALL_DURATION.observe(duration)
+
+    def report(self) -> List[dict]:
+        """Stalls aggregated by call site, worst total time first"""
+        with self._lock:
+            sites = [
+                {"call_site": site, **{key: value for key, value in entry.items() if key != "stack"},
+                 "stack": list(entry["stack"])}
+                for site, entry in self._sites.items()
+            ]
+        return sorted(sites, key=lambda entry: entry["total_seconds"], reverse=True)
+
+    def reset(self) -> None:
+        """Forget all recorded stalls"""
+        with self._lock:
+            self._sites.clear()
+
+
+_loop_stall_detector: Optional[LoopStallDetector] = None
+
+
+def get_loop_stall_detector() -> LoopStallDetector:
+    """Get or create the stall detector configured from settings"""
+    global _loop_stall_detector
+    if _loop_stall_detector is None:
+        _loop_stall_detector = LoopStallDetector(
+            threshold_ms=settings.LOOP_STALL_THRESHOLD_MS,
+            stack_depth=settings.LOOP_STALL_STACK_DEPTH
+        )
+    return _loop_stall_detector
@@ -0,0 +1,299 @@
+"""
+Prometheus metrics.
+
+With several workers, set PROMETHEUS_MULTIPROC_DIR (serve.py does this
+automatically) so every worker writes to shared files and /metrics
+aggregates them.
+"""
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from google.api_core.exceptions import GoogleAPIError
+from pymongo import monitoring
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.circuit_breaker import gemini_circuit_breaker
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+MONGO_OPERATION_DURATION = Histogram(
+    "mongo_operation_duration_seconds",
+    "MongoDB command latency",
+    ["command", "collection", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "mongo_pool_connections_checked_out",
+    "MongoDB connections currently checked out of the pool",
+    multiprocess_mode="livesum",
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    "mongo_pool_connections_open",
+    "MongoDB connections currently open",
+    multiprocess_mode="livesum",
+)
+GEMINI_CALL_DURATION = Histogram(
+    "gemini_call_duration_seconds",
+    "Gemini API call latency",
+    ["agent", "operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when a loop callback was due and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+EVENT_LOOP_STALLS = Counter(
+    "event_loop_stalls_total",
+    "Event loop stalls longer than the watchdog threshold, by blocking call site",
+    ["call_site"],
+)
+EVENT_LOOP_STALL_DURATION = Histogram(
+    "event_loop_stall_duration_seconds",
+    "Duration of event loop stalls detected by the watchdog",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+GENERATION_IN_FLIGHT = Gauge(
+    "generation_in_flight",
+    "Generation requests holding a scheduler slot",
+    multiprocess_mode="livesum",
+)
+GENERATION_QUEUE_DEPTH = Gauge(
+    "generation_queue_depth",
+    "Generation requests waiting for a scheduler slot",
+    multiprocess_mode="livesum",
+)
+GENERATION_QUEUE_WAIT = Histogram(
+    "generation_queue_wait_seconds",
+    "Time generation requests waited for a scheduler slot",
+    buckets=LATENCY_BUCKETS,
+)
+GENERATION_CANCELLED = Counter(
+    "generation_cancelled_total",
+    "Generation requests cancelled because the client disconnected",
+    ["operation"],
+)
+GEMINI_CALLS_CANCELLED = Counter(
+    "gemini_calls_cancelled_total",
+    "Gemini calls abandoned mid-flight because their request was cancelled",
+    ["agent", "operation"],
+)
+GENERATION_DEGRADED = Counter(
+    "generation_degraded_total",
+    "Generation stages skipped or replaced because the request's time budget ran out",
+    ["stage"],
+)
+STARTUP_PHASE_DURATION = Gauge(
+    "app_startup_phase_seconds",
+    "Duration of app import and startup phases in the latest boot",
+    ["phase"],
+    multiprocess_mode="max",
+)
+
+# Commands whose first value is the collection name
+_COLLECTION_COMMANDS = {
+    "find", "insert", "update", "delete", "aggregate", "count",
+    "distinct", "findAndModify", "createIndexes", "getMore",
+}
+
+
+# Most recent event loop lag measurement, for readiness and admission control
+_last_loop_lag = 0.0
+
+
+@contextmanager
+def observe_gemini(agent: str, operation: str) -> Iterator[None]:
+    """Time a Gemini call and feed API failures (not local errors) to the Gemini circuit breaker"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    except asyncio.CancelledError:
+        # Our cancellation, not a Gemini failure: keep it away from the breaker
+        outcome = "cancelled"
+        GEMINI_CALLS_CANCELLED.labels(agent, operation).inc()
+        raise
+    except GoogleAPIError:
+        raise
+    except Exception:
+        # Raised in our process (e.g. the SDK rejecting an argument): says nothing about Gemini
+        outcome = "local_error"
+        raise
+    finally:
+        GEMINI_CALL_DURATION.labels(agent, operation, outcome).observe(time.perf_counter() - start)
+        if outcome == "success":
+            gemini_circuit_breaker.record_success()
+        elif outcome == "error":
+            gemini_circuit_breaker.record_failure()
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Records per-command latency for every repository operation"""
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        name = event.command_name
+        collection = event.command.get(name) if name in _COLLECTION_COMMANDS else None
+        if name == "getMore":
+            collection = event.command.get("collection")
+        self._collections[event.request_id] = collection if isinstance(collection, str) else ""
+
+    def _observe(self, event, outcome: str) -> None:
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_OPERATION_DURATION.labels(event.command_name, collection, outcome).observe(
+            event.duration_micros / 1_000_000
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._observe(event, "success")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._observe(event, "error")
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Tracks open and checked-out pool connections"""
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.inc()
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.dec()
+
+    def connection_checked_out(self, event):
+        MONGO_POOL_CHECKED_OUT.inc()
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CHECKED_OUT.dec()
+
+
+def mongo_event_listeners() -> list:
+    """Listeners to pass to the Motor client"""
+    return [MongoCommandMetrics(), MongoPoolMetrics()]
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Background task: measure how late a periodic sleep wakes up"""
+    global _last_loop_lag
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        _last_loop_lag = max(0.0, loop.time() - start - interval)
+        EVENT_LOOP_LAG.observe(_last_loop_lag)
+
+
+def current_loop_lag() -> float:
+    """Latest event loop lag in seconds"""
+    return _last_loop_lag
+
+
+def _route_template(app: ASGIApp, scope: Scope) -> str:
+    """Path template of the matching route, to keep label cardinality bounded"""
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "") or scope["path"]
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status codes and in-flight requests"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = _route_template(scope["app"], scope) if "app" in scope else "<unmatched>"
+            labels = (scope["method"], route, str(status_code))
+            HTTP_REQUEST_DURATION.labels(*labels).observe(time.perf_counter() - start)
+            HTTP_REQUESTS_TOTAL.labels(*labels).inc()
+
+
+def render_metrics() -> tuple:
+    """Exposition body and content type, aggregated across workers when multiprocess"""
+    if MULTIPROCESS:
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead() -> None:
+    """Drop this worker's live gauges from the shared multiprocess files"""
+    if MULTIPROCESS:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(os.getpid())
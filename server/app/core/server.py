@@ -0,0 +1,20 @@
+import uvicorn
+
+from app.core.inflight import generation_tracker
+
+
+class DrainingServer(uvicorn.Server):
+    """
+    uvicorn server that starts draining generation work as soon as it is
+    told to exit.
+
+    uvicorn only runs the lifespan shutdown after it has stopped accepting
+    connections and waited for the open ones, so a flag set there is never
+    seen by live requests. Setting it from the signal handler makes
+    keep-alive clients get 503s for new generation work, fails readiness,
+    and lets in-flight requests finish within timeout_graceful_shutdown.
+    """
+
+    def handle_exit(self, sig, frame) -> None:
+        generation_tracker.draining = True
+        super().handle_exit(sig, frame)
@@ -0,0 +1,204 @@
+import os
+import re
+from mimetypes import guess_type
+from typing import AsyncIterator, Optional, Tuple
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+from app.core.config import settings
+
+
+# Content-Encoding -> suffix of the precompressed variant stored next to the file
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# File types that get precompressed variants (images and woff fonts already are compressed)
+PRECOMPRESSIBLE_EXTENSIONS = {".svg", ".ttf", ".otf"}
+
+# Types missing from the stdlib mimetypes table
+MEDIA_TYPES = {
+    ".svg": "image/svg+xml",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+    ".otf": "font/otf",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+}
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _media_type(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    return MEDIA_TYPES.get(extension) or guess_type(path)[0] or "application/octet-stream"
+
+
+def accepted_encodings(request_headers: Headers) -> set:
+    accepted = set()
+    for item in request_headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def _parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=" header into an inclusive (start, end).
+
+    Returns None for unsatisfiable ranges. Multi-range requests are not
+    supported; callers fall back to the full body.
+    """
+    match = RANGE_PATTERN.match(value.strip())
+    if not match:
+        raise ValueError("Unsupported range")
+    first, last = match.groups()
+    if first == "" and last == "":
+        raise ValueError("Unsupported range")
+    if first == "":
+        # Suffix range: last N bytes
+        length = int(last)
+        if length == 0:
+            return None
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+async def _iter_file_range(path: str, start: int, end: int, chunk_size: int) -> AsyncIterator[bytes]:
+    async with await anyio.open_file(path, mode="rb") as file:
+        await file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles for immutable, uniquely named uploads.
+
+    Adds long-lived `Cache-Control: immutable`, strong ETags, If-None-Match
+    list handling, single byte-range requests and precompressed (.br/.gz)
+    variants for SVG and font files.
+    """
+
+    def __init__(self, *args, max_age: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = settings.UPLOADS_CACHE_MAX_AGE if max_age is None else max_age
+
+    def _precompressed_variant(
+        self,
+        full_path: str,
+        request_headers: Headers
+    ) -> Optional[Tuple[str, os.stat_result, str]]:
+        accepted = accepted_encodings(request_headers)
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding in accepted:
+                try:
+                    return full_path + suffix, os.stat(full_path + suffix), encoding
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+        return None
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        method = scope["method"]
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        media_type = _media_type(full_path)
+
+        headers = {
+            "cache-control": f"public, max-age={self.max_age}, immutable",
+            "accept-ranges": "bytes",
+        }
+        served_path, served_stat, encoding = full_path, stat_result, None
+
+        precompressible = os.path.splitext(full_path)[1].lower() in PRECOMPRESSIBLE_EXTENSIONS
+        if precompressible:
+            headers["vary"] = "Accept-Encoding"
+            variant = self._precompressed_variant(full_path, request_headers)
+            if variant:
+                served_path, served_stat, encoding = variant
+                headers["content-encoding"] = encoding
+
+        # Uploads never change once written, so size + mtime identify the bytes
+        etag = f'"{served_stat.st_size:x}-{served_stat.st_mtime_ns:x}{"-" + encoding if encoding else ""}"'
+        headers["etag"] = etag
+
+        response = FileResponse(
+            served_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=served_stat,
+            method=method,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        range_header = request_headers.get("range")
+        if range_header and method == "GET" and status_code == 200:
+            if_range = request_headers.get("if-range")
+            if if_range is None or if_range.strip() == etag:
+                return self._range_response(served_path, served_stat, range_header, response)
+        return response
+
+    def _range_response(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        range_header: str,
+        full_response: FileResponse
+    ) -> Response:
+        size = stat_result.st_size
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return full_response
+
+        headers = {
+            key: value for key, value in full_response.headers.items()
+            if key not in ("content-length", "content-type")
+        }
+        if byte_range is None:
+            headers["content-range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+        start, end = byte_range
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+        headers["content-length"] = str(end - start + 1)
+        return StreamingResponse(
+            _iter_file_range(path, start, end, FileResponse.chunk_size),
+            status_code=206,
+            headers=headers,
+            media_type=full_response.media_type,
+        )
+
+    def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
+        """Handle If-None-Match lists and weak validators before the date check"""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            etag = response_headers.get("etag")
+            if not etag:
+                return False
+            candidates = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in candidates or any(
+                tag.removeprefix("W/") == etag for tag in candidates
+            )
+        return super().is_not_modified(response_headers, request_headers)
@@ -0,0 +1,432 @@
+import asyncio
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Public path prefix stored on documents; resolved by the /uploads mount or redirect
+UPLOADS_URL_PREFIX = "/uploads/"
+
+
+# Uploads are streamed here before being moved to their content-addressed key
+INCOMING_PREFIX = "incoming/"
+
+
+def content_key(sha256: str, extension: str) -> str:
+    """Content-addressed key: the SHA-256 of the bytes plus the file extension"""
+    return f"{sha256}{extension}"
+
+
+def url_for_key(key: str) -> str:
+    """Stable URL stored on documents for a storage key"""
+    return f"{UPLOADS_URL_PREFIX}{key}"
+
+
+def key_from_url(url: Optional[str]) -> Optional[str]:
+    """Extract the storage key from a stored /uploads/ URL"""
+    if url and url.startswith(UPLOADS_URL_PREFIX):
+        return url[len(UPLOADS_URL_PREFIX):]
+    return None
+
+
+async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+class StorageBackend(ABC):
+    """Object storage for uploads and generated images"""
+
+    @abstractmethod
+    async def put_stream(
+        self,
+        key: str,
+        chunks: AsyncIterator[bytes],
+        content_type: Optional[str] = None
+    ) -> int:
+        """
+        Store an object from an async stream of chunks.
+
+        The object only becomes visible once the stream is fully consumed; if
+        the stream raises, nothing is stored.
+
+        Returns:
+            Number of bytes written
+        """
+
+    async def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None) -> int:
+        """Store an object from bytes"""
+        return await self.put_stream(key, _single_chunk(data), content_type)
+
+    @abstractmethod
+    def get_stream(self, key: str, chunk_size: int = 262144) -> AsyncIterator[bytes]:
+        """Stream an object's content in chunks"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Check whether an object exists"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete an object (no error if missing)"""
+
+    @abstractmethod
+    async def move(self, source_key: str, destination_key: str) -> None:
+        """Move an object to a new key, replacing any existing object there"""
+
+    @abstractmethod
+    def list_keys(self, prefix: str = "") -> AsyncIterator[str]:
+        """Iterate over stored keys, optionally only those starting with prefix"""
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        """URL clients should fetch the object from"""
+
+    @property
+    def serves_locally(self) -> bool:
+        """Whether objects are served from local disk by the API process"""
+        return False
+
+
+def _commit(handle: BinaryIO, destination: Path) -> None:
+    handle.flush()
+    os.fsync(handle.fileno())
+    handle.close()
+    os.replace(handle.name, destination)
+
+
+def _write_file_atomic(destination: Path, data: bytes) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=destination.parent, prefix=".upload-")
+    try:
+        # Write through a memoryview so partial writes never copy the buffer
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        os.fsync(fd)
+        os.close(fd)
+        fd = None
+        os.replace(temp_path, destination)
+    except BaseException:
+        if fd is not None:
+            os.close(fd)
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _discard(handle: BinaryIO) -> None:
+    handle.close()
+    try:
+        os.unlink(handle.name)
+    except FileNotFoundError:
+        pass
+
+
+class LocalStorageBackend(StorageBackend):
+    """Stores objects as files under a local directory"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._resolved_root = self.root.resolve()
+
+    @property
+    def serves_locally(self) -> bool:
+        return True
+
+    def path_for(self, key: str) -> Path:
+        """Filesystem path for a key, rejecting keys that escape the root"""
+        path = (self._resolved_root / key).resolve()
+        if self._resolved_root not in path.parents:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    async def put_stream(
+        self,
+        key: str,
+        chunks: AsyncIterator[bytes],
+        content_type: Optional[str] = None
+    ) -> int:
+        path = self.path_for(key)
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        # Temp file in the same directory so the final rename is atomic
+        handle = await asyncio.to_thread(
+            tempfile.NamedTemporaryFile, dir=path.parent, prefix=".upload-", delete=False
+        )
+        size = 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                await asyncio.to_thread(handle.write, chunk)
+            await asyncio.to_thread(_commit, handle, path)
+        except BaseException:
+            await asyncio.to_thread(_discard, handle)
+            raise
+        return size
+
+    async def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None) -> int:
+        # One worker-thread hop: temp file, memoryview writes, fsync, atomic rename
+        await asyncio.to_thread(_write_file_atomic, self.path_for(key), data)
+        return len(data)
+
+    async def get_stream(self, key: str, chunk_size: int = 262144) -> AsyncIterator[bytes]:
+        handle = await asyncio.to_thread(open, self.path_for(key), "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(handle.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await asyncio.to_thread(handle.close)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self.path_for(key).is_file)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await asyncio.to_thread(os.unlink, self.path_for(key))
+        except FileNotFoundError:
+            pass
+
+    async def move(self, source_key: str, destination_key: str) -> None:
+        destination = self.path_for(destination_key)
+        await asyncio.to_thread(destination.parent.mkdir, parents=True, exist_ok=True)
+        await asyncio.to_thread(os.replace, self.path_for(source_key), destination)
+
+    def _scan(self, prefix: str) -> list:
+        # Only walk the directory the prefix points into
+        directory, _, name_prefix = prefix.rpartition("/")
+        base = self.root / directory if directory else self.root
+        if not base.is_dir():
+            return []
+        paths = []
+        for entry in base.iterdir():
+            if not entry.name.startswith(name_prefix):
+                continue
+            if entry.is_dir():
+                paths.extend(path for path in entry.rglob("*") if path.is_file())
+            elif entry.is_file():
+                paths.append(entry)
+        return [path for path in paths if not path.name.startswith(".upload-")]
+
+    async def list_keys(self, prefix: str = "") -> AsyncIterator[str]:
+        paths = await asyncio.to_thread(self._scan, prefix)
+        for path in paths:
+            yield path.relative_to(self.root).as_posix()
+
+    def url_for(self, key: str) -> str:
+        return url_for_key(key)
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Stores objects in an S3-compatible bucket (AWS S3, MinIO, R2, ...).
+
+    Set S3_ENDPOINT_URL to point at a local stand-in such as MinIO for testing.
+    Uploads use multipart so large streams are never buffered in full.
+    """
+
+    # S3 requires every multipart part except the last to be at least 5MB
+    MIN_PART_SIZE = 5 * 1024 * 1024
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        public_url: Optional[str] = None,
+        presigned_expire_seconds: int = 3600
+    ):
+        try:
+            import boto3
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the 'boto3' package") from e
+
+        if not bucket:
+            raise ValueError("S3_BUCKET must be set when STORAGE_BACKEND=s3")
+
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.presigned_expire_seconds = presigned_expire_seconds
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+        )
+
+    async def put_stream(
+        self,
+        key: str,
+        chunks: AsyncIterator[bytes],
+        content_type: Optional[str] = None
+    ) -> int:
+        # Keys are unique and never rewritten, so objects are cacheable forever
+        extra = {"CacheControl": f"public, max-age={settings.UPLOADS_CACHE_MAX_AGE}, immutable"}
+        if content_type:
+            extra["ContentType"] = content_type
+        upload = await asyncio.to_thread(
+            self.client.create_multipart_upload, Bucket=self.bucket, Key=key, **extra
+        )
+        upload_id = upload["UploadId"]
+        parts = []
+        buffer = bytearray()
+        size = 0
+
+        async def flush():
+            part_number = len(parts) + 1
+            response = await asyncio.to_thread(
+                self.client.upload_part,
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=bytes(buffer),
+            )
+            parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+            buffer.clear()
+
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                buffer.extend(chunk)
+                if len(buffer) >= self.MIN_PART_SIZE:
+                    await flush()
+            if buffer or not parts:
+                await flush()
+            await asyncio.to_thread(
+                self.client.complete_multipart_upload,
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            await asyncio.to_thread(
+                self.client.abort_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id
+            )
+            raise
+        return size
+
+    async def get_stream(self, key: str, chunk_size: int = 262144) -> AsyncIterator[bytes]:
+        response = await asyncio.to_thread(self.client.get_object, Bucket=self.bucket, Key=key)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await asyncio.to_thread(body.close)
+
+    async def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+            return True
+        except ClientError:
+            return False
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+    async def move(self, source_key: str, destination_key: str) -> None:
+        await asyncio.to_thread(
+            self.client.copy_object,
+            Bucket=self.bucket,
+            Key=destination_key,
+            CopySource={"Bucket": self.bucket, "Key": source_key},
+        )
+        await self.delete(source_key)
+
+    async def list_keys(self, prefix: str = "") -> AsyncIterator[str]:
+        token = None
+        while True:
+            kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+            if token:
+                kwargs["ContinuationToken"] = token
+            page = await asyncio.to_thread(self.client.list_objects_v2, **kwargs)
+            for item in page.get("Contents", []):
+                yield item["Key"]
+            if not page.get("IsTruncated"):
+                break
+            token = page.get("NextContinuationToken")
+
+    def url_for(self, key: str) -> str:
+        """Direct public/CDN URL when configured, otherwise a presigned GET URL"""
+        if self.public_url:
+            return f"{self.public_url}/{key}"
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=self.presigned_expire_seconds,
+        )
+
+
+async def migrate_storage(
+    source: StorageBackend,
+    destination: StorageBackend,
+    overwrite: bool = False
+) -> int:
+    """
+    Copy every object from one backend to another.
+
+    Args:
+        source: Backend to read from
+        destination: Backend to write to
+        overwrite: Replace objects that already exist in the destination
+
+    Returns:
+        Number of objects copied
+    """
+    copied = 0
+    async for key in source.list_keys():
+        if not overwrite and await destination.exists(key):
+            continue
+        await destination.put_stream(key, source.get_stream(key))
+        copied += 1
+        logger.info(f"Migrated {key}")
+    return copied
+
+
+def create_storage_backend(backend: Optional[str] = None) -> StorageBackend:
+    """Build a storage backend from settings"""
+    backend = (backend or settings.STORAGE_BACKEND).lower()
+    if backend == "local":
+        return LocalStorageBackend(Path(settings.UPLOAD_DIR))
+    if backend == "s3":
+        return S3StorageBackend(
+            bucket=settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            public_url=settings.S3_PUBLIC_URL,
+            presigned_expire_seconds=settings.S3_PRESIGNED_URL_EXPIRE_SECONDS,
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}'")
+
+
+# Create singleton instance (lazy initialization)
+_storage_instance: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """Get or create the configured storage backend singleton"""
+    global _storage_instance
+    if _storage_instance is None:
+        _storage_instance = create_storage_backend()
+    return _storage_instance
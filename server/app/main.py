@@ -1,38 +1,108 @@
-from fastapi import FastAPI
+import time
+
+# Taken before any other import so the startup report includes import time
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
-from pathlib import Path
 
 from app.core.config import settings
-from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.background import cancel_background_tasks
+from app.core.boot import startup_report
+from app.core.database import connect_to_mongo, close_mongo_connection, get_database, warm_up_mongo
 from app.core.exceptions import AppException
+from app.core.admission import AdmissionControlMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.inflight import generation_tracker
+from app.core.logging_config import setup_logging
+from app.core.loop_watchdog import get_loop_stall_detector
+from app.core.metrics import MetricsMiddleware, mark_worker_dead, monitor_event_loop_lag, render_metrics
 from app.core.exception_handlers import (
     app_exception_handler,
     validation_exception_handler,
     general_exception_handler
 )
-from app.routes import auth, onboarding, campaign
+from app.core.static_files import CachedStaticFiles
+from app.core.storage import get_storage
+from app.services.image_derivative_service import shutdown_image_derivative_service
+from app.repositories.asset_repository import AssetRepository
+from app.repositories.generation_lease_repository import GenerationLeaseRepository
+from app.repositories.translation_repository import TranslationRepository
+from app.services.asset_service import AssetService, run_asset_gc_periodically
+from app.services.campaign_service import get_campaign_service
+from app.routes import auth, onboarding, campaign, uploads, debug, health
 from fastapi.exceptions import RequestValidationError
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 
+async def warm_up():
+    """Build the generation services and open connections before the first request"""
+    with startup_report.phase("mongo_warmup"):
+        try:
+            await warm_up_mongo(settings.MONGO_WARMUP_CONNECTIONS)
+        except Exception as e:
+            logger.warning(f"MongoDB warmup failed: {e}")
+    if not settings.GEMINI_API_KEY:
+        logger.warning("GEMINI_API_KEY is not set; generation services will not be available")
+        return
+    with startup_report.phase("campaign_service"):
+        # Imports the Gemini SDK and builds the agents
+        campaign_service = get_campaign_service()
+    with startup_report.phase("gemini_warmup"):
+        await campaign_service.warm_up(settings.GEMINI_WARMUP_TIMEOUT)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
     # Startup
-    await connect_to_mongo()
+    if settings.LOOP_WATCHDOG_ENABLED:
+        get_loop_stall_detector().start()
+    with startup_report.phase("mongo_connect"):
+        await connect_to_mongo()
+    # Lag feeds metrics, readiness and admission control
+    loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+    with startup_report.phase("indexes"):
+        await GenerationLeaseRepository(await get_database()).ensure_indexes(
+            settings.IDEMPOTENCY_KEY_TTL_HOURS * 3600
+        )
+        await TranslationRepository(await get_database()).ensure_indexes(
+            settings.TRANSLATION_CACHE_TTL_DAYS * 86400
+        )
+    if settings.WARMUP_ON_STARTUP:
+        await warm_up()
+    asset_gc_task = None
+    if settings.ASSET_GC_ENABLED:
+        asset_repository = AssetRepository(await get_database())
+        await asset_repository.ensure_indexes()
+        asset_gc_task = asyncio.create_task(run_asset_gc_periodically(
+            AssetService(asset_repository, get_storage()),
+            settings.ASSET_GC_INTERVAL_SECONDS
+        ))
+    startup_report.log()
     yield
-    # Shutdown
+    # Shutdown: let paid-for generation work finish before the database goes away
+    # (serve.py already set draining on the signal; requests had timeout_graceful_shutdown,
+    # this covers background work such as campaign batches)
+    if generation_tracker.count:
+        logger.info(f"Draining {generation_tracker.count} in-flight generation request(s)")
+    if not await generation_tracker.drain(settings.SHUTDOWN_DRAIN_TIMEOUT):
+        logger.warning(f"Shutdown drain timed out with {generation_tracker.count} generation request(s) in flight")
+    await cancel_background_tasks()
+    if asset_gc_task:
+        asset_gc_task.cancel()
+    loop_lag_task.cancel()
+    shutdown_image_derivative_service()
     await close_mongo_connection()
+    get_loop_stall_detector().stop()
+    mark_worker_dead()
 
 
 # Create FastAPI app
@@ -43,6 +113,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Load shedding for generation requests (innermost, so 503s still get CORS headers)
+app.add_middleware(AdmissionControlMiddleware, api_prefix=settings.API_V1_PREFIX)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -52,28 +125,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression (uploads are served precompressed or are already-compressed images)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        content_types=settings.COMPRESSION_CONTENT_TYPES,
+        exclude_paths=("/uploads",),
+    )
+
+# Request metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Exception handlers
 app.add_exception_handler(AppException, app_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
 # Include routers
+app.include_router(health.router)
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(onboarding.router, prefix=settings.API_V1_PREFIX)
 app.include_router(campaign.router, prefix=settings.API_V1_PREFIX)
+if settings.DEBUG_ENDPOINTS_ENABLED:
+    app.include_router(debug.router)
+
+# Serve uploads: local disk via StaticFiles, remote backends via redirect
+storage = get_storage()
+if storage.serves_locally:
+    app.mount("/uploads", CachedStaticFiles(directory=str(storage.root)), name="uploads")
+else:
+    app.include_router(uploads.router)
 
-# Create uploads directory if it doesn't exist
-uploads_dir = Path(settings.UPLOAD_DIR)
-uploads_dir.mkdir(exist_ok=True)
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics endpoint"""
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
 
-# Mount static files for uploads
-app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
 
-# Health check endpoint
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "version": settings.APP_VERSION}
+startup_report.record("import", time.perf_counter() - _IMPORT_STARTED)
 
 
 @app.get("/")
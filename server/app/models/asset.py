@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional, List
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class AssetModel(BaseModel):
+    """Stored file tracked by content hash"""
+    id: str = Field(alias="_id")  # storage key: <sha256><extension>
+    sha256: Optional[str] = None
+    size: Optional[int] = None
+    content_type: Optional[str] = None
+    refs: List[str] = []  # e.g. "onboarding:<user_id>:logo", "campaign:<campaign_id>:image"
+    unreferenced_since: Optional[datetime] = None
+    collecting_since: Optional[datetime] = None  # set while the garbage collector deletes its files
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True
+    )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from bson import ObjectId
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
@@ -19,6 +19,24 @@ class AdCopyModel(BaseModel):
     call_to_action: str
     visual_direction: str
     image_url: Optional[str] = None
+    image_variants: Dict[str, str] = Field(default_factory=dict)  # e.g. thumbnail_webp -> URL
+
+
+class LocalizedAdCopyModel(BaseModel):
+    """Ad copy translated into one locale"""
+    headline: str
+    body: str
+    call_to_action: str
+    source_hash: str  # hash of the ad copy it was translated from
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class GenerationStageModel(BaseModel):
+    """Progress of one generation pipeline stage (checkpoint)"""
+    status: str  # running, completed, failed
+    input_hash: Optional[str] = None  # fingerprint of the inputs the output belongs to
+    error: Optional[str] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
 class CampaignModel(BaseModel):
@@ -34,9 +52,22 @@ class CampaignModel(BaseModel):
     all_ideas: List[CampaignIdeaModel] = []
     top_ideas: List[CampaignIdeaModel] = []
     selected_idea_index: Optional[int] = None
+    idea_drafts: List[CampaignIdeaModel] = []  # unscored ideas awaiting evaluation
     
     # Ad copy and visual direction
     ad_copy: Optional[AdCopyModel] = None
+    ad_copy_draft: Optional[AdCopyModel] = None  # ad copy awaiting its image
+    
+    # A/B variants for one idea; the active one is copied into ad_copy
+    ad_copy_variants: List[AdCopyModel] = []
+    ad_copy_variants_idea_index: Optional[int] = None
+    active_variant_index: Optional[int] = None
+    
+    # Locale (e.g. "de-DE") -> translated ad copy
+    localized_ad_copy: Dict[str, LocalizedAdCopyModel] = Field(default_factory=dict)
+    
+    # Pipeline checkpoints: stage name (ideas, evaluation, ad_copy, image) -> progress
+    stages: Dict[str, GenerationStageModel] = Field(default_factory=dict)
     
     # Metadata
     status: str = "draft"  # draft, ideas_generated, ad_copy_generated, completed
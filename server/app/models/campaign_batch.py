@@ -0,0 +1,34 @@
+from typing import List, Optional
+from datetime import datetime
+from bson import ObjectId
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+
+
+class CampaignBatchItemModel(BaseModel):
+    """One campaign of a batch and the progress of its idea generation"""
+    campaign_id: str
+    status: str = "pending"  # pending, running, completed, failed
+    error: Optional[str] = None
+    shared_from: Optional[int] = None  # index of the identical brief whose ideas it reuses
+
+
+class CampaignBatchModel(BaseModel):
+    """Bulk campaign creation and idea generation"""
+    id: str = Field(alias="_id")
+    user_id: str
+    items: List[CampaignBatchItemModel] = []
+    status: str = "running"  # running, completed, interrupted
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    @field_validator('id', mode='before')
+    @classmethod
+    def convert_objectid_to_str(cls, v):
+        if isinstance(v, ObjectId):
+            return str(v)
+        return v
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True
+    )
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class GenerationLeaseModel(BaseModel):
+    """Cross-worker lock and last result of one generation operation on a campaign"""
+    id: str = Field(alias="_id")  # "<campaign_id>:<operation>"
+    owner: Optional[str] = None  # token of the worker holding the lease
+    status: str = "running"  # running | completed | failed
+    fingerprint: Optional[str] = None  # hash of the request parameters
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    expires_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True
+    )
+
+
+class IdempotencyRecordModel(BaseModel):
+    """Stored response for an Idempotency-Key"""
+    id: str = Field(alias="_id")  # "<user_id>:<key>"
+    campaign_id: str
+    operation: str
+    fingerprint: Optional[str] = None
+    response: Dict[str, Any]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True
+    )
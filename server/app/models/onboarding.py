@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from bson import ObjectId
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
@@ -11,6 +11,7 @@ class OnboardingModel(BaseModel):
     brand_name: str
     industry: str
     logo_url: Optional[str] = None
+    logo_variants: Dict[str, str] = Field(default_factory=dict)  # e.g. thumbnail_webp -> URL
     logo_position: str
     typography: str
     font_type: Optional[str] = None  # 'dropdown' | 'google' | 'upload'
@@ -0,0 +1,18 @@
+from datetime import datetime
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class TranslationModel(BaseModel):
+    """Cached translation of one ad copy text into one locale"""
+    id: str = Field(alias="_id")  # "<source_hash>:<locale>"
+    source_hash: str  # hash of the source headline, body and call_to_action
+    locale: str
+    headline: str
+    body: str
+    call_to_action: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True
+    )
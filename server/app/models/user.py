@@ -11,6 +11,7 @@ class UserModel(BaseModel):
     email: EmailStr
     hashed_password: str
     is_active: bool = True
+    plan: str = "free"  # key into settings.GENERATION_PLAN_LIMITS
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     password_reset_token: Optional[str] = None
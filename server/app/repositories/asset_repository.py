@@ -0,0 +1,144 @@
+from typing import Optional, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING
+from app.models.asset import AssetModel
+from datetime import datetime
+
+
+def _unreferenced_since(now: datetime) -> dict:
+    """Pipeline expression: keep/start the orphan clock when refs is empty, clear it otherwise"""
+    return {
+        "$cond": [
+            {"$eq": [{"$size": {"$ifNull": ["$refs", []]}}, 0]},
+            {"$ifNull": ["$unreferenced_since", now]},
+            None
+        ]
+    }
+
+
+class AssetRepository:
+    """Repository for content-addressed asset tracking"""
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.assets
+    
+    async def ensure_indexes(self) -> None:
+        """Create indexes used by the garbage collector"""
+        await self.collection.create_index([("unreferenced_since", ASCENDING)], sparse=True)
+    
+    async def get_by_key(self, key: str) -> Optional[AssetModel]:
+        """Get asset by storage key"""
+        asset = await self.collection.find_one({"_id": key})
+        if asset:
+            return AssetModel(**asset)
+        return None
+    
+    async def register(
+        self,
+        key: str,
+        sha256: Optional[str] = None,
+        size: Optional[int] = None,
+        content_type: Optional[str] = None
+    ) -> None:
+        """
+        Record a stored file.
+        
+        A file without references gets a fresh orphan timestamp, so an upload
+        that is never attached is collected after the grace period and a
+        re-upload of a pending orphan is protected for another full period.
+        """
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": key},
+            [
+                {"$set": {
+                    "sha256": {"$ifNull": [sha256, "$sha256"]},
+                    "size": {"$ifNull": [size, "$size"]},
+                    "content_type": {"$ifNull": [content_type, "$content_type"]},
+                    "refs": {"$ifNull": ["$refs", []]},
+                    "created_at": {"$ifNull": ["$created_at", now]},
+                    "updated_at": now,
+                    "collecting_since": None,
+                }},
+                {"$set": {
+                    "unreferenced_since": {
+                        "$cond": [{"$eq": [{"$size": "$refs"}, 0]}, now, None]
+                    }
+                }},
+            ],
+            upsert=True
+        )
+    
+    async def add_reference(self, key: str, ref: str) -> None:
+        """Attach a document reference to an asset"""
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": key},
+            {
+                "$addToSet": {"refs": ref},
+                "$set": {"unreferenced_since": None, "collecting_since": None, "updated_at": now},
+                "$setOnInsert": {"created_at": now}
+            },
+            upsert=True
+        )
+    
+    async def remove_reference(self, key: str, ref: str) -> None:
+        """Detach a document reference; starts the orphan clock when none remain"""
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": key},
+            [
+                {"$set": {
+                    "refs": {"$setDifference": [{"$ifNull": ["$refs", []]}, [ref]]},
+                    "updated_at": now,
+                }},
+                {"$set": {"unreferenced_since": _unreferenced_since(now)}},
+            ]
+        )
+    
+    async def find_orphans(self, unreferenced_before: datetime, limit: int = 500) -> List[AssetModel]:
+        """Assets without references since before the given time"""
+        cursor = self.collection.find({
+            "refs": {"$size": 0},
+            "unreferenced_since": {"$ne": None, "$lte": unreferenced_before}
+        }).limit(limit)
+        return [AssetModel(**asset) async for asset in cursor]
+    
+    async def claim_orphan(
+        self,
+        key: str,
+        unreferenced_before: datetime,
+        claim_expired_before: datetime
+    ) -> Optional[datetime]:
+        """
+        Mark an orphan as being collected (a tombstone) before its files are deleted.
+        
+        Registering or referencing the asset clears the mark. A mark older than
+        claim_expired_before (a collector that died midway) can be taken over.
+        
+        Returns:
+            The claim timestamp, or None if the asset is no longer collectable
+        """
+        now = datetime.utcnow()
+        result = await self.collection.update_one(
+            {
+                "_id": key,
+                "refs": {"$size": 0},
+                "unreferenced_since": {"$ne": None, "$lte": unreferenced_before},
+                "$or": [
+                    {"collecting_since": None},
+                    {"collecting_since": {"$lte": claim_expired_before}}
+                ]
+            },
+            {"$set": {"collecting_since": now}}
+        )
+        return now if result.modified_count else None
+    
+    async def delete_if_claimed(self, key: str, claimed_at: datetime) -> bool:
+        """Delete the asset record only if it was not registered or referenced since it was claimed"""
+        result = await self.collection.delete_one({
+            "_id": key,
+            "refs": {"$size": 0},
+            "collecting_since": claimed_at
+        })
+        return result.deleted_count > 0
@@ -0,0 +1,50 @@
+from typing import Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.models.campaign_batch import CampaignBatchModel
+from datetime import datetime
+
+
+class CampaignBatchRepository:
+    """Repository for campaign batch operations"""
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.campaign_batches
+    
+    async def create(self, batch_data: dict) -> CampaignBatchModel:
+        """Create a new batch"""
+        await self.collection.insert_one(batch_data)
+        return CampaignBatchModel(**batch_data)
+    
+    async def get_by_id(self, batch_id: str) -> Optional[CampaignBatchModel]:
+        """Get batch by ID"""
+        if not ObjectId.is_valid(batch_id):
+            return None
+        batch = await self.collection.find_one({"_id": ObjectId(batch_id)})
+        if batch:
+            return CampaignBatchModel(**batch)
+        return None
+    
+    async def set_item_status(
+        self,
+        batch_id: str,
+        item_index: int,
+        status: str,
+        error: Optional[str] = None
+    ) -> None:
+        """Record the progress of one item"""
+        await self.collection.update_one(
+            {"_id": ObjectId(batch_id)},
+            {"$set": {
+                f"items.{item_index}.status": status,
+                f"items.{item_index}.error": error,
+                "updated_at": datetime.utcnow()
+            }}
+        )
+    
+    async def finish(self, batch_id: str, status: str) -> None:
+        """Mark the batch completed or interrupted"""
+        await self.collection.update_one(
+            {"_id": ObjectId(batch_id)},
+            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+        )
@@ -1,6 +1,7 @@
-from typing import Optional, List
+from typing import Optional, List, Iterable
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
 from app.models.campaign import CampaignModel
 from app.core.exceptions import NotFoundError
 from datetime import datetime
@@ -18,6 +19,11 @@ class CampaignRepository:
         campaign = await self.collection.find_one({"_id": result.inserted_id})
         return CampaignModel(**campaign)
     
+    async def create_many(self, campaigns_data: List[dict]) -> List[str]:
+        """Create several campaigns in one round trip; returns their IDs in order"""
+        result = await self.collection.insert_many(campaigns_data, ordered=True)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+    
     async def get_by_id(self, campaign_id: str) -> Optional[CampaignModel]:
         """Get campaign by ID"""
         if not ObjectId.is_valid(campaign_id):
@@ -27,6 +33,15 @@ class CampaignRepository:
             return CampaignModel(**campaign)
         return None
     
+    async def get_version(self, campaign_id: str) -> Optional[dict]:
+        """Get only the owner and updated_at of a campaign, for conditional reads"""
+        if not ObjectId.is_valid(campaign_id):
+            return None
+        return await self.collection.find_one(
+            {"_id": ObjectId(campaign_id)},
+            {"user_id": 1, "updated_at": 1}
+        )
+    
     async def get_by_user_id(self, user_id: str) -> List[CampaignModel]:
         """Get all campaigns for a user"""
         campaigns = []
@@ -52,6 +67,110 @@ class CampaignRepository:
                 return CampaignModel(**campaign)
         return None
     
+    async def replace_top_idea(self, campaign_id: str, index: int, old_title: str, idea: dict) -> bool:
+        """
+        Replace one top idea in place, and the same idea in all_ideas
+        
+        Only matches while top_ideas[index] is still the idea that was
+        replaced, so a concurrent full regeneration is not overwritten.
+        Ad copy variants written for the replaced idea can no longer be
+        selected (their ad_copy_variants_idea_index is cleared).
+        
+        Returns:
+            False if the campaign or the idea at that index changed
+        """
+        if not ObjectId.is_valid(campaign_id):
+            return False
+        result = await self.collection.update_one(
+            {"_id": ObjectId(campaign_id), f"top_ideas.{index}.title": old_title},
+            {"$set": {
+                f"top_ideas.{index}": idea,
+                "all_ideas.$[replaced]": idea,
+                "updated_at": datetime.utcnow()
+            }},
+            array_filters=[{"replaced.title": old_title}]
+        )
+        if not result.matched_count:
+            return False
+        await self.collection.update_one(
+            {"_id": ObjectId(campaign_id), "ad_copy_variants_idea_index": index},
+            {"$set": {"ad_copy_variants_idea_index": None}}
+        )
+        return True
+    
+    async def set_ad_copy_field(
+        self,
+        campaign_id: str,
+        field: str,
+        value: str,
+        old_ad_copy: dict,
+        variant_index: Optional[int] = None
+    ) -> Optional[CampaignModel]:
+        """
+        Set one ad copy field in place, and in the active variant if any
+        
+        Only matches while the ad copy still has the values in old_ad_copy
+        (those the new value was generated against) and the same active
+        variant, so it is not mixed into ad copy that changed in the meantime.
+        
+        Returns:
+            The updated campaign, or None if the campaign or its ad copy changed
+        """
+        if not ObjectId.is_valid(campaign_id):
+            return None
+        query = {
+            "_id": ObjectId(campaign_id),
+            "ad_copy": {"$type": "object"},
+            "active_variant_index": variant_index
+        }
+        query.update({f"ad_copy.{name}": old_value for name, old_value in old_ad_copy.items()})
+        update_data = {f"ad_copy.{field}": value, "updated_at": datetime.utcnow()}
+        if variant_index is not None:
+            # Keep the variant in step, or selecting it again would bring back the old value
+            update_data[f"ad_copy_variants.{variant_index}.{field}"] = value
+        campaign = await self.collection.find_one_and_update(
+            query,
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+        if campaign:
+            return CampaignModel(**campaign)
+        return None
+    
+    async def set_stage(
+        self,
+        campaign_id: str,
+        stage: str,
+        status: str,
+        input_hash: Optional[str] = None,
+        error: Optional[str] = None,
+        data: Optional[dict] = None,
+        unset: Iterable[str] = ()
+    ) -> None:
+        """
+        Record a pipeline stage's status, together with its output, in one update
+        
+        Args:
+            campaign_id: Campaign ID
+            stage: Stage name, e.g. "ideas"
+            status: running, completed or failed
+            input_hash: Fingerprint of the stage's inputs
+            error: Failure reason
+            data: Fields to set alongside (the stage's output)
+            unset: Fields to remove, e.g. checkpoints of later stages
+        """
+        if not ObjectId.is_valid(campaign_id):
+            return
+        now = datetime.utcnow()
+        update = {"$set": {
+            **(data or {}),
+            f"stages.{stage}": {"status": status, "input_hash": input_hash, "error": error, "updated_at": now},
+            "updated_at": now
+        }}
+        if unset:
+            update["$unset"] = {field: "" for field in unset}
+        await self.collection.update_one({"_id": ObjectId(campaign_id)}, update)
+    
     async def delete(self, campaign_id: str) -> bool:
         """Delete campaign"""
         if not ObjectId.is_valid(campaign_id):
@@ -0,0 +1,108 @@
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.models.generation_lease import GenerationLeaseModel, IdempotencyRecordModel
+from datetime import datetime, timedelta
+
+
+class GenerationLeaseRepository:
+    """Repository for generation leases and idempotency records"""
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.generation_leases
+        self.idempotency_collection = db.idempotency_keys
+    
+    async def ensure_indexes(self, idempotency_ttl_seconds: int) -> None:
+        """Expire idempotency records after their retention period"""
+        await self.idempotency_collection.create_index(
+            [("created_at", ASCENDING)],
+            expireAfterSeconds=idempotency_ttl_seconds
+        )
+    
+    async def get(self, lease_id: str) -> Optional[GenerationLeaseModel]:
+        """Get a lease by id"""
+        lease = await self.collection.find_one({"_id": lease_id})
+        if lease:
+            return GenerationLeaseModel(**lease)
+        return None
+    
+    async def acquire(
+        self,
+        lease_id: str,
+        owner: str,
+        fingerprint: Optional[str],
+        ttl_seconds: int
+    ) -> bool:
+        """
+        Take the lease unless another worker holds an unexpired one.
+        
+        Returns:
+            True if this owner now holds the lease
+        """
+        now = datetime.utcnow()
+        try:
+            await self.collection.find_one_and_update(
+                {
+                    "_id": lease_id,
+                    "$or": [{"status": {"$ne": "running"}}, {"expires_at": {"$lte": now}}]
+                },
+                {
+                    "$set": {
+                        "owner": owner,
+                        "status": "running",
+                        "fingerprint": fingerprint,
+                        "result": None,
+                        "error": None,
+                        "expires_at": now + timedelta(seconds=ttl_seconds),
+                        "started_at": now,
+                        "completed_at": None
+                    }
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return True
+        except DuplicateKeyError:
+            # The filter did not match an existing, running lease
+            return False
+    
+    async def renew(self, lease_id: str, owner: str, ttl_seconds: int) -> bool:
+        """Extend a held lease; False if it was lost"""
+        result = await self.collection.update_one(
+            {"_id": lease_id, "owner": owner, "status": "running"},
+            {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=ttl_seconds)}}
+        )
+        return result.matched_count > 0
+    
+    async def complete(self, lease_id: str, owner: str, result: dict) -> None:
+        """Release a held lease with the operation's result"""
+        await self.collection.update_one(
+            {"_id": lease_id, "owner": owner},
+            {"$set": {"status": "completed", "result": result, "completed_at": datetime.utcnow()}}
+        )
+    
+    async def fail(self, lease_id: str, owner: str, error: str) -> None:
+        """Release a held lease after the operation failed"""
+        await self.collection.update_one(
+            {"_id": lease_id, "owner": owner},
+            {"$set": {"status": "failed", "error": error, "completed_at": datetime.utcnow()}}
+        )
+    
+    async def release(self, lease_id: str, owner: str) -> None:
+        """Drop a held lease without a result so another worker can take over"""
+        await self.collection.delete_one({"_id": lease_id, "owner": owner, "status": "running"})
+    
+    async def get_idempotency_record(self, record_id: str) -> Optional[IdempotencyRecordModel]:
+        """Get the stored response for an idempotency key"""
+        record = await self.idempotency_collection.find_one({"_id": record_id})
+        if record:
+            return IdempotencyRecordModel(**record)
+        return None
+    
+    async def save_idempotency_record(self, record: dict) -> None:
+        """Store the response for an idempotency key (first writer wins)"""
+        try:
+            await self.idempotency_collection.insert_one(record)
+        except DuplicateKeyError:
+            pass
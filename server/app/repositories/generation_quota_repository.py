@@ -0,0 +1,57 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime, timedelta
+
+
+class GenerationQuotaRepository:
+    """Repository for per-user generation slots shared by all workers"""
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.generation_user_slots
+    
+    async def acquire(self, user_id: str, token: str, limit: int, ttl_seconds: int) -> bool:
+        """
+        Take one of the user's slots if fewer than limit are held.
+        
+        Expired slots (their worker died) are dropped on the way.
+        
+        Returns:
+            True if the slot was taken
+        """
+        now = datetime.utcnow()
+        live = {
+            "$filter": {
+                "input": {"$ifNull": ["$slots", []]},
+                "cond": {"$gt": ["$$this.expires_at", now]}
+            }
+        }
+        slot = {"token": token, "expires_at": now + timedelta(seconds=ttl_seconds)}
+        await self.collection.update_one(
+            {"_id": user_id},
+            [
+                {"$set": {"slots": live}},
+                {"$set": {
+                    "slots": {
+                        "$cond": [
+                            {"$lt": [{"$size": "$slots"}, limit]},
+                            {"$concatArrays": ["$slots", [slot]]},
+                            "$slots"
+                        ]
+                    },
+                    "updated_at": now
+                }},
+            ],
+            upsert=True
+        )
+        return await self.collection.count_documents({"_id": user_id, "slots.token": token}, limit=1) > 0
+    
+    async def renew(self, user_id: str, token: str, ttl_seconds: int) -> bool:
+        """Extend a held slot; False if it was lost"""
+        result = await self.collection.update_one(
+            {"_id": user_id, "slots.token": token},
+            {"$set": {"slots.$.expires_at": datetime.utcnow() + timedelta(seconds=ttl_seconds)}}
+        )
+        return result.matched_count > 0
+    
+    async def release(self, user_id: str, token: str) -> None:
+        """Give a slot back"""
+        await self.collection.update_one({"_id": user_id}, {"$pull": {"slots": {"token": token}}})
@@ -26,6 +26,12 @@ class OnboardingRepository:
             return OnboardingModel(**onboarding)
         return None
     
+    async def get_version(self, user_id: str) -> Optional[dict]:
+        """Get only the id and updated_at of a user's onboarding data, for conditional reads"""
+        if not ObjectId.is_valid(user_id):
+            return None
+        return await self.collection.find_one({"user_id": ObjectId(user_id)}, {"updated_at": 1})
+    
     async def update(self, user_id: str, update_data: dict) -> Optional[OnboardingModel]:
         """Update onboarding data"""
         update_data["updated_at"] = datetime.utcnow()
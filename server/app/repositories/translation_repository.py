@@ -0,0 +1,46 @@
+from typing import Dict, Iterable
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, UpdateOne
+from app.models.translation import TranslationModel
+from datetime import datetime
+
+
+def translation_id(source_hash: str, locale: str) -> str:
+    return f"{source_hash}:{locale}"
+
+
+class TranslationRepository:
+    """Repository for cached ad copy translations, keyed by (source hash, locale)"""
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.translations
+    
+    async def ensure_indexes(self, ttl_seconds: int) -> None:
+        """Expire cached translations after their retention period"""
+        await self.collection.create_index(
+            [("created_at", ASCENDING)],
+            expireAfterSeconds=ttl_seconds
+        )
+    
+    async def get_many(self, source_hash: str, locales: Iterable[str]) -> Dict[str, TranslationModel]:
+        """Get cached translations of a text; locale -> translation for the locales found"""
+        ids = [translation_id(source_hash, locale) for locale in locales]
+        translations = {}
+        async for document in self.collection.find({"_id": {"$in": ids}}):
+            translation = TranslationModel(**document)
+            translations[translation.locale] = translation
+        return translations
+    
+    async def save_many(self, source_hash: str, translations: Dict[str, dict]) -> None:
+        """Store translations of a text (locale -> headline, body, call_to_action)"""
+        if not translations:
+            return
+        now = datetime.utcnow()
+        await self.collection.bulk_write([
+            UpdateOne(
+                {"_id": translation_id(source_hash, locale)},
+                {"$set": {**fields, "source_hash": source_hash, "locale": locale, "created_at": now}},
+                upsert=True
+            )
+            for locale, fields in translations.items()
+        ], ordered=False)
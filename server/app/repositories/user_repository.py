@@ -39,6 +39,13 @@ class UserRepository:
             return UserModel(**user)
         return None
     
+    async def get_plan(self, user_id: str) -> Optional[str]:
+        """Get only the user's plan"""
+        if not ObjectId.is_valid(user_id):
+            return None
+        user = await self.collection.find_one({"_id": ObjectId(user_id)}, {"plan": 1})
+        return user.get("plan") if user else None
+    
     async def update_password_reset_token(
         self, 
         email: str, 
@@ -1,5 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+import asyncio
+import json
+import logging
+import math
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import partial
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError as PydanticValidationError
+from typing import AsyncContextManager, AsyncIterator, Callable, Iterable, List, Optional
 from bson import ObjectId
 from app.schemas.campaign import (
     CreateCampaignRequest,
@@ -8,15 +18,146 @@ from app.schemas.campaign import (
     CampaignIdeaSchema,
     GenerateAdCopyRequest,
     GenerateAdCopyResponse,
-    AdCopySchema
+    AdCopySchema,
+    AdCopyField,
+    RegenerateIdeaResponse,
+    GenerateAdCopyVariantsRequest,
+    AdCopyVariantsResponse,
+    LocalizeAdCopyRequest,
+    LocalizeAdCopyResponse,
+    LocalizedAdCopySchema,
+    CreateCampaignBatchRequest,
+    CampaignBatchItemSchema,
+    CampaignBatchResponse
 )
+from app.core.background import spawn
+from app.core.deadline import Deadline
+from app.core.disconnect import run_until_disconnected
+from app.core.exceptions import AppException
+from app.core.inflight import generation_tracker
+from app.models.campaign import CampaignModel
+from app.models.campaign_batch import CampaignBatchModel
+from app.core.config import settings
 from app.repositories.campaign_repository import CampaignRepository
+from app.repositories.campaign_batch_repository import CampaignBatchRepository
+from app.repositories.translation_repository import TranslationRepository
+from app.services.asset_service import AssetService, campaign_ref
+from app.services.brand_context import BrandContext
 from app.services.campaign_service import get_campaign_service
-from app.utils.dependencies import get_campaign_repository, get_current_user_id
-from datetime import datetime
+from app.services.generation_guard import GenerationGuard, request_fingerprint
+from app.services.generation_quota import GenerationQuota
+from app.services.generation_scheduler import BATCH, SchedulerTicket, get_generation_scheduler
+from app.utils.dependencies import (
+    get_asset_service,
+    get_brand_context,
+    get_campaign_batch_repository,
+    get_campaign_repository,
+    get_current_user_id,
+    get_current_user_plan,
+    get_generation_guard,
+    get_generation_quota,
+    get_generation_slot,
+    get_translation_repository,
+    track_generation_request
+)
+from app.utils.etag import document_etag, etag_matches, not_modified, set_etag
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/campaigns", tags=["campaigns"])
 
+GenerationSlot = Callable[..., AsyncContextManager[SchedulerTicket]]
+
+
+def _degraded_note(degraded: List[str]) -> str:
+    """Message suffix naming stages skipped because the time budget ran out"""
+    notes = {"director": "ranked without the Creative Director", "image": "without an image"}
+    if not degraded:
+        return ""
+    return f" ({', '.join(notes.get(stage, stage) for stage in degraded)}: time budget exhausted)"
+
+
+def _variant_image_ref(campaign_id: str, variant_index: int) -> str:
+    return campaign_ref(campaign_id, f"variant_{variant_index}_image")
+
+
+def _set_queue_headers(response: Response, ticket: SchedulerTicket) -> None:
+    """Tell the client where the request queued for a generation slot"""
+    response.headers["X-Queue-Position"] = str(ticket.position)
+    response.headers["X-Queue-Wait"] = f"{ticket.waited_seconds:.3f}"
+
+
+def _stage_completed(campaign: CampaignModel, stage: str, input_hash: str) -> bool:
+    """Whether a checkpoint holds the stage's output for these inputs"""
+    checkpoint = campaign.stages.get(stage)
+    return checkpoint is not None and checkpoint.status == "completed" and checkpoint.input_hash == input_hash
+
+
+@asynccontextmanager
+async def _checkpointed_stage(
+    campaign_repo: CampaignRepository,
+    campaign_id: str,
+    stage: str,
+    input_hash: str,
+    reset: Iterable[str] = ()
+) -> AsyncIterator[None]:
+    """
+    Mark a pipeline stage running for the block and failed if it raises.
+    
+    The caller records completion together with the stage's output.
+    
+    Args:
+        reset: Fields to clear on start, e.g. checkpoints of later stages
+    """
+    await campaign_repo.set_stage(campaign_id, stage, "running", input_hash, unset=reset)
+    try:
+        yield
+    except Exception as e:
+        error = getattr(e, "detail", None) or str(e) or type(e).__name__
+        await campaign_repo.set_stage(campaign_id, stage, "failed", input_hash, error=str(error))
+        raise
+
+
+async def _verify_campaign_owner(
+    campaign_repo: CampaignRepository,
+    campaign_id: str,
+    user_id: str
+) -> None:
+    """Check the campaign exists and belongs to the user without loading it"""
+    version = await campaign_repo.get_version(campaign_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    # Verify ownership
+    if version.get("user_id") != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this campaign")
+
+
+def _campaign_document(campaign_data: CreateCampaignRequest, user_id: str) -> dict:
+    """New draft campaign document"""
+    now = datetime.utcnow()
+    return {
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "campaign_brief": campaign_data.campaign_brief,
+        "objective": campaign_data.objective,
+        "target_audience": campaign_data.target_audience,
+        "ad_formats": campaign_data.ad_formats,
+        "all_ideas": [],
+        "top_ideas": [],
+        "status": "draft",
+        "created_at": now,
+        "updated_at": now
+    }
+
+
+def _ideas_input_hash(
+    campaign_brief: str, objective: str, target_audience: str, ad_formats: List[str], brand_fingerprint: str
+) -> str:
+    """Fingerprint of the inputs idea generation depends on, the brand profile included"""
+    return request_fingerprint([campaign_brief, objective, target_audience, ad_formats, brand_fingerprint])
+
 
 @router.post("/create", response_model=CampaignResponse)
 async def create_campaign(
@@ -26,22 +167,7 @@ async def create_campaign(
 ):
     """Create a new campaign"""
     try:
-        # Create campaign document
-        campaign_doc = {
-            "_id": ObjectId(),
-            "user_id": user_id,
-            "campaign_brief": campaign_data.campaign_brief,
-            "objective": campaign_data.objective,
-            "target_audience": campaign_data.target_audience,
-            "ad_formats": campaign_data.ad_formats,
-            "all_ideas": [],
-            "top_ideas": [],
-            "status": "draft",
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-        
-        campaign = await campaign_repo.create(campaign_doc)
+        campaign = await campaign_repo.create(_campaign_document(campaign_data, user_id))
         
         return CampaignResponse(
             id=campaign.id,
@@ -62,39 +188,114 @@ async def create_campaign(
         raise HTTPException(status_code=500, detail=f"Failed to create campaign: {str(e)}")
 
 
-@router.post("/{campaign_id}/generate-ideas", response_model=GenerateIdeasResponse)
+@router.post(
+    "/{campaign_id}/generate-ideas",
+    response_model=GenerateIdeasResponse,
+    dependencies=[Depends(track_generation_request)]
+)
 async def generate_campaign_ideas(
     campaign_id: str,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     user_id: str = Depends(get_current_user_id),
-    campaign_repo: CampaignRepository = Depends(get_campaign_repository)
+    campaign_repo: CampaignRepository = Depends(get_campaign_repository),
+    generation_guard: GenerationGuard = Depends(get_generation_guard),
+    generation_slot: GenerationSlot = Depends(get_generation_slot),
+    brand_context: BrandContext = Depends(get_brand_context)
 ):
-    """Generate campaign ideas using multi-agent system"""
+    """
+    Generate campaign ideas using multi-agent system.
+    
+    Concurrent duplicates wait for the running generation; an Idempotency-Key
+    replays the stored response on retry. If the client disconnects, the
+    generation is cancelled unless a duplicate is waiting for it.
+    """
+    deadline = Deadline.for_operation("generate_ideas")
+    await _verify_campaign_owner(campaign_repo, campaign_id, user_id)
+    return await run_until_disconnected(
+        request,
+        generation_guard.run(
+            campaign_id,
+            "generate_ideas",
+            lambda: _generate_campaign_ideas(
+                campaign_id, campaign_repo, generation_slot, response, deadline, brand_context
+            ),
+            GenerateIdeasResponse,
+            user_id=user_id,
+            idempotency_key=idempotency_key
+        ),
+        "generate_ideas",
+        keep_running=lambda: generation_guard.has_joiners(campaign_id, "generate_ideas")
+    )
+
+
+async def _generate_campaign_ideas(
+    campaign_id: str,
+    campaign_repo: CampaignRepository,
+    generation_slot: GenerationSlot,
+    response: Response,
+    deadline: Deadline,
+    brand_context: BrandContext
+) -> GenerateIdeasResponse:
     try:
-        # Get campaign
+        # Re-read under the lease: a run that finished meanwhile may have changed it
         campaign = await campaign_repo.get_by_id(campaign_id)
         if not campaign:
             raise HTTPException(status_code=404, detail="Campaign not found")
         
-        # Verify ownership
-        if campaign.user_id != user_id:
-            raise HTTPException(status_code=403, detail="Not authorized to access this campaign")
-        
-        # Generate ideas using multi-agent system
-        campaign_service = get_campaign_service()
-        result = await campaign_service.generate_campaign_ideas(
-            campaign_brief=campaign.campaign_brief,
-            objective=campaign.objective,
-            target_audience=campaign.target_audience,
-            ad_formats=campaign.ad_formats,
-            threshold=7.0
+        # Resume from the checkpointed ideas if only the evaluation is missing (and the brand is unchanged)
+        ideas_hash = _ideas_input_hash(
+            campaign.campaign_brief, campaign.objective, campaign.target_audience, campaign.ad_formats,
+            brand_context.fingerprint
+        )
+        resume = (
+            bool(campaign.idea_drafts)
+            and _stage_completed(campaign, "ideas", ideas_hash)
+            and not _stage_completed(campaign, "evaluation", ideas_hash)
         )
         
-        # Ensure we have top ideas
-        if not result.get("top_ideas") or len(result["top_ideas"]) == 0:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to generate ideas: No ideas were generated"
-            )
+        # Generate ideas using multi-agent system (two model calls, one when resuming)
+        campaign_service = get_campaign_service()
+        async with generation_slot(cost=1 if resume else 2) as ticket:
+            if resume:
+                logger.info("Resuming idea generation from checkpointed ideas", extra={"campaign_id": campaign_id})
+                all_ideas = [CampaignIdeaSchema(**idea.model_dump()) for idea in campaign.idea_drafts]
+            else:
+                async with _checkpointed_stage(
+                    campaign_repo, campaign_id, "ideas", ideas_hash, reset=["stages.evaluation"]
+                ):
+                    all_ideas = await campaign_service.generate_idea_drafts(
+                        campaign_brief=campaign.campaign_brief,
+                        objective=campaign.objective,
+                        target_audience=campaign.target_audience,
+                        ad_formats=campaign.ad_formats,
+                        deadline=deadline,
+                        brand_context=brand_context
+                    )
+                await campaign_repo.set_stage(
+                    campaign_id, "ideas", "completed", ideas_hash,
+                    data={"idea_drafts": [idea.model_dump() for idea in all_ideas]}
+                )
+            
+            async with _checkpointed_stage(campaign_repo, campaign_id, "evaluation", ideas_hash):
+                result = await campaign_service.evaluate_ideas(
+                    all_ideas,
+                    campaign_brief=campaign.campaign_brief,
+                    objective=campaign.objective,
+                    target_audience=campaign.target_audience,
+                    threshold=7.0,
+                    deadline=deadline,
+                    brand_context=brand_context
+                )
+                
+                # Ensure we have top ideas
+                if not result.get("top_ideas") or len(result["top_ideas"]) == 0:
+                    raise HTTPException(
+                        status_code=500,
+                        detail="Failed to generate ideas: No ideas were generated"
+                    )
+        _set_queue_headers(response, ticket)
         
         # Update campaign with generated ideas
         update_data = {
@@ -103,30 +304,41 @@ async def generate_campaign_ideas(
             "status": "ideas_generated"
         }
         
-        await campaign_repo.update(campaign_id, update_data)
+        await campaign_repo.set_stage(
+            campaign_id, "evaluation", "completed", ideas_hash, data=update_data, unset=["idea_drafts"]
+        )
         
         return GenerateIdeasResponse(
             campaign_id=campaign_id,
             top_ideas=result["top_ideas"],
-            message="Successfully generated campaign ideas"
+            message="Successfully generated campaign ideas" + _degraded_note(result["degraded"])
         )
-    except HTTPException:
+    except (HTTPException, AppException):
         raise
     except Exception as e:
-        import traceback
         error_detail = str(e)
-        print(f"Error generating campaign ideas: {error_detail}")
-        print(traceback.format_exc())
+        logger.error(f"Error generating campaign ideas: {error_detail}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to generate ideas: {error_detail}")
 
 
 @router.get("/{campaign_id}", response_model=CampaignResponse)
 async def get_campaign(
     campaign_id: str,
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_current_user_id),
     campaign_repo: CampaignRepository = Depends(get_campaign_repository)
 ):
-    """Get campaign by ID"""
+    """Get campaign by ID (supports If-None-Match)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Answer polling from a projection before loading and validating the campaign
+        version = await campaign_repo.get_version(campaign_id)
+        if version and version.get("user_id") == user_id and version.get("updated_at"):
+            etag = document_etag(version["_id"], version["updated_at"])
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+    
     campaign = await campaign_repo.get_by_id(campaign_id)
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
@@ -143,9 +355,11 @@ async def get_campaign(
             body=campaign.ad_copy.body,
             call_to_action=campaign.ad_copy.call_to_action,
             visual_direction=campaign.ad_copy.visual_direction,
-            image_url=campaign.ad_copy.image_url
+            image_url=campaign.ad_copy.image_url,
+            image_variants=campaign.ad_copy.image_variants
         )
     
+    set_etag(response, document_etag(campaign.id, campaign.updated_at))
     return CampaignResponse(
         id=campaign.id,
         user_id=campaign.user_id,
@@ -157,6 +371,12 @@ async def get_campaign(
         top_ideas=campaign.top_ideas,
         selected_idea_index=campaign.selected_idea_index,
         ad_copy=ad_copy_schema,
+        ad_copy_variants=[AdCopySchema(**variant.model_dump()) for variant in campaign.ad_copy_variants],
+        active_variant_index=campaign.active_variant_index,
+        localized_ad_copy={
+            locale: LocalizedAdCopySchema(**localized.model_dump())
+            for locale, localized in campaign.localized_ad_copy.items()
+        },
         status=campaign.status,
         created_at=campaign.created_at.isoformat(),
         updated_at=campaign.updated_at.isoformat()
@@ -180,7 +400,8 @@ async def get_user_campaigns(
                 body=campaign.ad_copy.body,
                 call_to_action=campaign.ad_copy.call_to_action,
                 visual_direction=campaign.ad_copy.visual_direction,
-                image_url=campaign.ad_copy.image_url
+                image_url=campaign.ad_copy.image_url,
+                image_variants=campaign.ad_copy.image_variants
             )
         
         result.append(CampaignResponse(
@@ -194,6 +415,12 @@ async def get_user_campaigns(
             top_ideas=campaign.top_ideas,
             selected_idea_index=campaign.selected_idea_index,
             ad_copy=ad_copy_schema,
+            ad_copy_variants=[AdCopySchema(**variant.model_dump()) for variant in campaign.ad_copy_variants],
+            active_variant_index=campaign.active_variant_index,
+            localized_ad_copy={
+                locale: LocalizedAdCopySchema(**localized.model_dump())
+                for locale, localized in campaign.localized_ad_copy.items()
+            },
             status=campaign.status,
             created_at=campaign.created_at.isoformat(),
             updated_at=campaign.updated_at.isoformat()
@@ -202,62 +429,150 @@ async def get_user_campaigns(
     return result
 
 
-@router.post("/{campaign_id}/generate-ad-copy", response_model=GenerateAdCopyResponse)
+@router.post(
+    "/{campaign_id}/generate-ad-copy",
+    response_model=GenerateAdCopyResponse,
+    dependencies=[Depends(track_generation_request)]
+)
 async def generate_ad_copy(
     campaign_id: str,
     request: GenerateAdCopyRequest,
+    http_request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     user_id: str = Depends(get_current_user_id),
-    campaign_repo: CampaignRepository = Depends(get_campaign_repository)
+    campaign_repo: CampaignRepository = Depends(get_campaign_repository),
+    asset_service: AssetService = Depends(get_asset_service),
+    generation_guard: GenerationGuard = Depends(get_generation_guard),
+    generation_slot: GenerationSlot = Depends(get_generation_slot),
+    brand_context: BrandContext = Depends(get_brand_context)
 ):
-    """Generate ad copy and visual direction with image for selected campaign idea"""
+    """
+    Generate ad copy and visual direction with image for selected campaign idea.
+    
+    Concurrent duplicates wait for the running generation (a concurrent request
+    for a different idea gets 409); an Idempotency-Key replays the stored
+    response on retry. If the client disconnects, the generation is cancelled
+    unless a duplicate is waiting for it.
+    """
+    # Verify campaign_id matches
+    if request.campaign_id != campaign_id:
+        raise HTTPException(status_code=400, detail="Campaign ID mismatch")
+    
+    deadline = Deadline.for_operation("generate_ad_copy")
+    await _verify_campaign_owner(campaign_repo, campaign_id, user_id)
+    return await run_until_disconnected(
+        http_request,
+        generation_guard.run(
+            campaign_id,
+            "generate_ad_copy",
+            lambda: _generate_ad_copy(
+                campaign_id, request, campaign_repo, asset_service, generation_slot, response, deadline, brand_context
+            ),
+            GenerateAdCopyResponse,
+            user_id=user_id,
+            idempotency_key=idempotency_key,
+            params=request.model_dump()
+        ),
+        "generate_ad_copy",
+        keep_running=lambda: generation_guard.has_joiners(campaign_id, "generate_ad_copy")
+    )
+
+
+async def _generate_ad_copy(
+    campaign_id: str,
+    request: GenerateAdCopyRequest,
+    campaign_repo: CampaignRepository,
+    asset_service: AssetService,
+    generation_slot: GenerationSlot,
+    response: Response,
+    deadline: Deadline,
+    brand_context: BrandContext
+) -> GenerateAdCopyResponse:
     try:
-        # Verify campaign_id matches
-        if request.campaign_id != campaign_id:
-            raise HTTPException(status_code=400, detail="Campaign ID mismatch")
-        
-        # Get campaign
+        # Re-read under the lease: a run that finished meanwhile may have changed it
         campaign = await campaign_repo.get_by_id(campaign_id)
         if not campaign:
             raise HTTPException(status_code=404, detail="Campaign not found")
         
-        # Verify ownership
-        if campaign.user_id != user_id:
-            raise HTTPException(status_code=403, detail="Not authorized to access this campaign")
-        
         # Verify selected idea index is valid
         if request.selected_idea_index < 0 or request.selected_idea_index >= len(campaign.top_ideas):
             raise HTTPException(status_code=400, detail="Invalid selected idea index")
         
         selected_idea = campaign.top_ideas[request.selected_idea_index]
         
-        # Generate ad copy and image
-        campaign_service = get_campaign_service()
-        result = await campaign_service.generate_ad_copy_and_visual(
-            campaign_brief=campaign.campaign_brief,
-            objective=campaign.objective,
-            target_audience=campaign.target_audience,
-            selected_idea_title=selected_idea.title,
-            selected_idea_description=selected_idea.description,
-            ad_formats=campaign.ad_formats
+        # Resume from the checkpointed ad copy if only the image is missing (and the brand is unchanged)
+        ad_copy_hash = request_fingerprint([
+            campaign.campaign_brief, campaign.objective, campaign.target_audience, campaign.ad_formats,
+            selected_idea.title, selected_idea.description, brand_context.fingerprint
+        ])
+        resume = (
+            campaign.ad_copy_draft is not None
+            and _stage_completed(campaign, "ad_copy", ad_copy_hash)
+            and not _stage_completed(campaign, "image", ad_copy_hash)
         )
         
+        # Generate ad copy and image (two model calls, one when resuming)
+        campaign_service = get_campaign_service()
+        async with generation_slot(cost=1 if resume else 2) as ticket:
+            if resume:
+                logger.info("Resuming ad copy generation from checkpointed ad copy", extra={"campaign_id": campaign_id})
+                ad_copy = campaign.ad_copy_draft.model_dump(
+                    include={"headline", "body", "call_to_action", "visual_direction"}
+                )
+            else:
+                async with _checkpointed_stage(
+                    campaign_repo, campaign_id, "ad_copy", ad_copy_hash, reset=["stages.image"]
+                ):
+                    ad_copy = await campaign_service.generate_ad_copy(
+                        campaign_brief=campaign.campaign_brief,
+                        objective=campaign.objective,
+                        target_audience=campaign.target_audience,
+                        selected_idea_title=selected_idea.title,
+                        selected_idea_description=selected_idea.description,
+                        ad_formats=campaign.ad_formats,
+                        deadline=deadline,
+                        brand_context=brand_context
+                    )
+                await campaign_repo.set_stage(
+                    campaign_id, "ad_copy", "completed", ad_copy_hash, data={"ad_copy_draft": ad_copy}
+                )
+            
+            async with _checkpointed_stage(campaign_repo, campaign_id, "image", ad_copy_hash):
+                result = await campaign_service.generate_ad_copy_image(
+                    ad_copy, campaign.campaign_brief, deadline, brand_context
+                )
+        _set_queue_headers(response, ticket)
+        
         # Create AdCopyModel
         ad_copy_model = {
-            "headline": result["headline"],
-            "body": result["body"],
-            "call_to_action": result["call_to_action"],
-            "visual_direction": result["visual_direction"],
-            "image_url": result.get("image_url")
+            **ad_copy,
+            "image_url": result.get("image_url"),
+            "image_variants": result.get("image_variants", {})
         }
         
-        # Update campaign with ad copy
+        # Update campaign with ad copy (it no longer matches a variant)
         update_data = {
             "selected_idea_index": request.selected_idea_index,
             "ad_copy": ad_copy_model,
+            "active_variant_index": None,
             "status": "ad_copy_generated"
         }
         
-        await campaign_repo.update(campaign_id, update_data)
+        # An image skipped for lack of time is not done: keep the draft so a retry resumes with it
+        if "image" in result["degraded"]:
+            await campaign_repo.set_stage(
+                campaign_id, "image", "failed", ad_copy_hash, error="Time budget exhausted", data=update_data
+            )
+        else:
+            await campaign_repo.set_stage(
+                campaign_id, "image", "completed", ad_copy_hash, data=update_data, unset=["ad_copy_draft"]
+            )
+        await asset_service.replace_reference(
+            campaign_ref(campaign_id, "image"),
+            campaign.ad_copy.image_url if campaign.ad_copy else None,
+            ad_copy_model["image_url"]
+        )
         
         # Create response schema
         ad_copy_schema = AdCopySchema(**ad_copy_model)
@@ -265,46 +580,90 @@ async def generate_ad_copy(
         return GenerateAdCopyResponse(
             campaign_id=campaign_id,
             ad_copy=ad_copy_schema,
-            message="Successfully generated ad copy and visual direction"
+            message="Successfully generated ad copy and visual direction" + _degraded_note(result["degraded"])
         )
-    except HTTPException:
+    except (HTTPException, AppException):
         raise
     except Exception as e:
-        import traceback
         error_detail = str(e)
-        print(f"Error generating ad copy: {error_detail}")
-        print(traceback.format_exc())
+        logger.error(f"Error generating ad copy: {error_detail}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to generate ad copy: {error_detail}")
 
 
-@router.post("/{campaign_id}/generate-image", response_model=GenerateAdCopyResponse)
+@router.post(
+    "/{campaign_id}/generate-image",
+    response_model=GenerateAdCopyResponse,
+    dependencies=[Depends(track_generation_request)]
+)
 async def generate_image(
     campaign_id: str,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     user_id: str = Depends(get_current_user_id),
-    campaign_repo: CampaignRepository = Depends(get_campaign_repository)
+    campaign_repo: CampaignRepository = Depends(get_campaign_repository),
+    asset_service: AssetService = Depends(get_asset_service),
+    generation_guard: GenerationGuard = Depends(get_generation_guard),
+    generation_slot: GenerationSlot = Depends(get_generation_slot),
+    brand_context: BrandContext = Depends(get_brand_context)
 ):
-    """Generate or regenerate image for campaign ad copy"""
+    """
+    Generate or regenerate image for campaign ad copy.
+    
+    Concurrent duplicates wait for the running generation; an Idempotency-Key
+    replays the stored response on retry. If the client disconnects, the
+    generation is cancelled unless a duplicate is waiting for it.
+    """
+    deadline = Deadline.for_operation("generate_image")
+    await _verify_campaign_owner(campaign_repo, campaign_id, user_id)
+    return await run_until_disconnected(
+        request,
+        generation_guard.run(
+            campaign_id,
+            "generate_image",
+            lambda: _generate_image(
+                campaign_id, campaign_repo, asset_service, generation_slot, response, deadline, brand_context
+            ),
+            GenerateAdCopyResponse,
+            user_id=user_id,
+            idempotency_key=idempotency_key
+        ),
+        "generate_image",
+        keep_running=lambda: generation_guard.has_joiners(campaign_id, "generate_image")
+    )
+
+
+async def _generate_image(
+    campaign_id: str,
+    campaign_repo: CampaignRepository,
+    asset_service: AssetService,
+    generation_slot: GenerationSlot,
+    response: Response,
+    deadline: Deadline,
+    brand_context: BrandContext
+) -> GenerateAdCopyResponse:
     try:
-        # Get campaign
+        # Re-read under the lease: a run that finished meanwhile may have changed it
         campaign = await campaign_repo.get_by_id(campaign_id)
         if not campaign:
             raise HTTPException(status_code=404, detail="Campaign not found")
         
-        # Verify ownership
-        if campaign.user_id != user_id:
-            raise HTTPException(status_code=403, detail="Not authorized to access this campaign")
-        
         # Check if ad copy exists
         if not campaign.ad_copy:
             raise HTTPException(status_code=400, detail="Ad copy must be generated first")
         
         # Generate image using the visual direction
         campaign_service = get_campaign_service()
-        image_url = await campaign_service.generate_image_only(
-            visual_direction=campaign.ad_copy.visual_direction,
-            headline=campaign.ad_copy.headline,
-            campaign_brief=campaign.campaign_brief
-        )
+        async with generation_slot(cost=1) as ticket:
+            image_url = await campaign_service.generate_image_only(
+                visual_direction=campaign.ad_copy.visual_direction,
+                headline=campaign.ad_copy.headline,
+                campaign_brief=campaign.campaign_brief,
+                deadline=deadline,
+                brand_context=brand_context
+            )
+        _set_queue_headers(response, ticket)
+        image_variants = await campaign_service.create_image_variants(image_url)
         
         # Update the ad_copy with new image_url
         ad_copy_dict = {
@@ -312,14 +671,30 @@ async def generate_image(
             "body": campaign.ad_copy.body,
             "call_to_action": campaign.ad_copy.call_to_action,
             "visual_direction": campaign.ad_copy.visual_direction,
-            "image_url": image_url
+            "image_url": image_url,
+            "image_variants": image_variants
         }
         
         update_data = {
             "ad_copy": ad_copy_dict
         }
         
+        # Keep the image on the active variant too, so switching back to it keeps the image
+        variant_index = campaign.active_variant_index
+        if variant_index is not None and variant_index < len(campaign.ad_copy_variants):
+            update_data[f"ad_copy_variants.{variant_index}.image_url"] = image_url
+            update_data[f"ad_copy_variants.{variant_index}.image_variants"] = image_variants
+        
         await campaign_repo.update(campaign_id, update_data)
+        await asset_service.replace_reference(
+            campaign_ref(campaign_id, "image"), campaign.ad_copy.image_url, image_url
+        )
+        if variant_index is not None and variant_index < len(campaign.ad_copy_variants):
+            await asset_service.replace_reference(
+                _variant_image_ref(campaign_id, variant_index),
+                campaign.ad_copy_variants[variant_index].image_url,
+                image_url
+            )
         
         # Get updated campaign
         updated_campaign = await campaign_repo.get_by_id(campaign_id)
@@ -328,7 +703,8 @@ async def generate_image(
             body=updated_campaign.ad_copy.body,
             call_to_action=updated_campaign.ad_copy.call_to_action,
             visual_direction=updated_campaign.ad_copy.visual_direction,
-            image_url=updated_campaign.ad_copy.image_url
+            image_url=updated_campaign.ad_copy.image_url,
+            image_variants=updated_campaign.ad_copy.image_variants
         )
         
         return GenerateAdCopyResponse(
@@ -336,12 +712,732 @@ async def generate_image(
             ad_copy=ad_copy_schema,
             message="Successfully generated image"
         )
-    except HTTPException:
+    except (HTTPException, AppException):
         raise
     except Exception as e:
-        import traceback
         error_detail = str(e)
-        print(f"Error generating image: {error_detail}")
-        print(traceback.format_exc())
+        logger.error(f"Error generating image: {error_detail}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to generate image: {error_detail}")
 
+
+@router.post(
+    "/{campaign_id}/ideas/{idea_index}/regenerate",
+    response_model=RegenerateIdeaResponse,
+    dependencies=[Depends(track_generation_request)]
+)
+async def regenerate_idea(
+    campaign_id: str,
+    idea_index: int,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    user_id: str = Depends(get_current_user_id),
+    campaign_repo: CampaignRepository = Depends(get_campaign_repository),
+    generation_guard: GenerationGuard = Depends(get_generation_guard),
+    generation_slot: GenerationSlot = Depends(get_generation_slot),
+    brand_context: BrandContext = Depends(get_brand_context)
+):
+    """
+    Replace one of the top ideas, keeping the others.
+    
+    Only the new idea is written and scored, with small prompts, instead of
+    re-running the whole ideas pipeline.
+    """
+    deadline = Deadline.for_operation("regenerate_idea")
+    await _verify_campaign_owner(campaign_repo, campaign_id, user_id)
+    operation = f"regenerate_idea_{idea_index}"
+    return await run_until_disconnected(
+        request,
+        generation_guard.run(
+            campaign_id,
+            operation,
+            lambda: _regenerate_idea(
+                campaign_id, idea_index, campaign_repo, generation_slot, response, deadline, brand_context
+            ),
+            RegenerateIdeaResponse,
+            user_id=user_id,
+            idempotency_key=idempotency_key
+        ),
+        "regenerate_idea",
+        keep_running=lambda: generation_guard.has_joiners(campaign_id, operation)
+    )
+
+
+async def _regenerate_idea(
+    campaign_id: str,
+    idea_index: int,
+    campaign_repo: CampaignRepository,
+    generation_slot: GenerationSlot,
+    response: Response,
+    deadline: Deadline,
+    brand_context: BrandContext
+) -> RegenerateIdeaResponse:
+    try:
+        campaign = await campaign_repo.get_by_id(campaign_id)
+        if not campaign:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+        
+        if idea_index < 0 or idea_index >= len(campaign.top_ideas):
+            raise HTTPException(status_code=400, detail="Invalid idea index")
+        
+        replaced_idea = campaign.top_ideas[idea_index]
+        # The new idea has to differ from every idea the user still sees
+        kept_ideas = [
+            CampaignIdeaSchema(**idea.model_dump())
+            for idea in (campaign.all_ideas or campaign.top_ideas)
+            if idea.title != replaced_idea.title
+        ]
+        
+        campaign_service = get_campaign_service()
+        async with generation_slot(cost=1) as ticket:
+            idea = await campaign_service.regenerate_idea(
+                replaced_idea=CampaignIdeaSchema(**replaced_idea.model_dump()),
+                kept_ideas=kept_ideas,
+                campaign_brief=campaign.campaign_brief,
+                objective=campaign.objective,
+                target_audience=campaign.target_audience,
+                ad_formats=campaign.ad_formats,
+                deadline=deadline,
+                brand_context=brand_context
+            )
+        _set_queue_headers(response, ticket)
+        
+        if not await campaign_repo.replace_top_idea(campaign_id, idea_index, replaced_idea.title, idea.model_dump()):
+            raise HTTPException(status_code=409, detail="Campaign ideas changed during regeneration; reload and retry")
+        
+        return RegenerateIdeaResponse(
+            campaign_id=campaign_id,
+            idea_index=idea_index,
+            idea=idea,
+            message="Successfully regenerated idea"
+        )
+    except (HTTPException, AppException):
+        raise
+    except Exception as e:
+        error_detail = str(e)
+        logger.error(f"Error regenerating idea: {error_detail}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to regenerate idea: {error_detail}")
+
+
+@router.post(
+    "/{campaign_id}/ad-copy/{field}/regenerate",
+    response_model=GenerateAdCopyResponse,
+    dependencies=[Depends(track_generation_request)]
+)
+async def regenerate_ad_copy_field(
+    campaign_id: str,
+    field: AdCopyField,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    user_id: str = Depends(get_current_user_id),
+    campaign_repo: CampaignRepository = Depends(get_campaign_repository),
+    generation_guard: GenerationGuard = Depends(get_generation_guard),
+    generation_slot: GenerationSlot = Depends(get_generation_slot),
+    brand_context: BrandContext = Depends(get_brand_context)
+):
+    """
+    Regenerate one ad copy field (headline, body, call_to_action or
+    visual_direction), keeping the other fields fixed.
+    
+    A new visual_direction does not replace the image; call generate-image
+    afterwards to match it.
+    """
+    deadline = Deadline.for_operation("regenerate_ad_copy_field")
+    await _verify_campaign_owner(campaign_repo, campaign_id, user_id)
+    operation = f"regenerate_ad_copy_{field}"
+    return await run_until_disconnected(
+        request,
+        generation_guard.run(
+            campaign_id,
+            operation,
+            lambda: _regenerate_ad_copy_field(
+                campaign_id, field, campaign_repo, generation_slot, response, deadline, brand_context
+            ),
+            GenerateAdCopyResponse,
+            user_id=user_id,
+            idempotency_key=idempotency_key
+        ),
+        "regenerate_ad_copy_field",
+        keep_running=lambda: generation_guard.has_joiners(campaign_id, operation)
+    )
+
+
+async def _regenerate_ad_copy_field(
+    campaign_id: str,
+    field: str,
+    campaign_repo: CampaignRepository,
+    generation_slot: GenerationSlot,
+    response: Response,
+    deadline: Deadline,
+    brand_context: BrandContext
+) -> GenerateAdCopyResponse:
+    try:
+        campaign = await campaign_repo.get_by_id(campaign_id)
+        if not campaign:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+        
+        if not campaign.ad_copy:
+            raise HTTPException(status_code=400, detail="Ad copy must be generated first")
+        
+        selected_idea = None
+        if campaign.selected_idea_index is not None and 0 <= campaign.selected_idea_index < len(campaign.top_ideas):
+            selected_idea = campaign.top_ideas[campaign.selected_idea_index]
+        
+        ad_copy = campaign.ad_copy.model_dump(include={"headline", "body", "call_to_action", "visual_direction"})
+        campaign_service = get_campaign_service()
+        async with generation_slot(cost=1) as ticket:
+            value = await campaign_service.regenerate_ad_copy_field(
+                field=field,
+                ad_copy=ad_copy,
+                campaign_brief=campaign.campaign_brief,
+                objective=campaign.objective,
+                target_audience=campaign.target_audience,
+                selected_idea_title=selected_idea.title if selected_idea else "",
+                selected_idea_description=selected_idea.description if selected_idea else "",
+                deadline=deadline,
+                brand_context=brand_context
+            )
+        _set_queue_headers(response, ticket)
+        
+        # Written only onto the ad copy (and active variant) it was generated against
+        updated_campaign = await campaign_repo.set_ad_copy_field(
+            campaign_id, field, value, ad_copy, campaign.active_variant_index
+        )
+        if not updated_campaign:
+            raise HTTPException(status_code=409, detail="Ad copy changed during regeneration; reload and retry")
+        
+        message = f"Successfully regenerated {field}"
+        if field == "visual_direction":
+            message += " (generate the image again to match it)"
+        
+        return GenerateAdCopyResponse(
+            campaign_id=campaign_id,
+            ad_copy=AdCopySchema(**updated_campaign.ad_copy.model_dump()),
+            message=message
+        )
+    except (HTTPException, AppException):
+        raise
+    except Exception as e:
+        error_detail = str(e)
+        logger.error(f"Error regenerating {field}: {error_detail}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to regenerate {field}: {error_detail}")
+
+
+@router.post(
+    "/{campaign_id}/generate-ad-copy-variants",
+    response_model=AdCopyVariantsResponse,
+    dependencies=[Depends(track_generation_request)]
+)
+async def generate_ad_copy_variants(
+    campaign_id: str,
+    request: GenerateAdCopyVariantsRequest,
+    http_request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    user_id: str = Depends(get_current_user_id),
+    campaign_repo: CampaignRepository = Depends(get_campaign_repository),
+    asset_service: AssetService = Depends(get_asset_service),
+    generation_guard: GenerationGuard = Depends(get_generation_guard),
+    generation_slot: GenerationSlot = Depends(get_generation_slot),
+    brand_context: BrandContext = Depends(get_brand_context)
+):
+    """
+    Generate several ad copy variants of an idea for A/B testing, in one model call.
+    
+    Variants are stored without images and replace earlier variants; select
+    one to make it the active ad copy, then generate-image creates its image.
+    """
+    if request.campaign_id != campaign_id:
+        raise HTTPException(status_code=400, detail="Campaign ID mismatch")
+    
+    deadline = Deadline.for_operation("generate_ad_copy_variants")
+    await _verify_campaign_owner(campaign_repo, campaign_id, user_id)
+    return await run_until_disconnected(
+        http_request,
+        generation_guard.run(
+            campaign_id,
+            "generate_ad_copy_variants",
+            lambda: _generate_ad_copy_variants(
+                campaign_id, request, campaign_repo, asset_service, generation_slot, response, deadline, brand_context
+            ),
+            AdCopyVariantsResponse,
+            user_id=user_id,
+            idempotency_key=idempotency_key,
+            params=request.model_dump()
+        ),
+        "generate_ad_copy_variants",
+        keep_running=lambda: generation_guard.has_joiners(campaign_id, "generate_ad_copy_variants")
+    )
+
+
+async def _generate_ad_copy_variants(
+    campaign_id: str,
+    request: GenerateAdCopyVariantsRequest,
+    campaign_repo: CampaignRepository,
+    asset_service: AssetService,
+    generation_slot: GenerationSlot,
+    response: Response,
+    deadline: Deadline,
+    brand_context: BrandContext
+) -> AdCopyVariantsResponse:
+    try:
+        campaign = await campaign_repo.get_by_id(campaign_id)
+        if not campaign:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+        
+        if request.selected_idea_index < 0 or request.selected_idea_index >= len(campaign.top_ideas):
+            raise HTTPException(status_code=400, detail="Invalid selected idea index")
+        
+        selected_idea = campaign.top_ideas[request.selected_idea_index]
+        
+        # One model call for all variants; no images until the user picks one
+        campaign_service = get_campaign_service()
+        async with generation_slot(cost=1) as ticket:
+            variants = await campaign_service.generate_ad_copy_variants(
+                count=request.count,
+                campaign_brief=campaign.campaign_brief,
+                objective=campaign.objective,
+                target_audience=campaign.target_audience,
+                selected_idea_title=selected_idea.title,
+                selected_idea_description=selected_idea.description,
+                ad_formats=campaign.ad_formats,
+                deadline=deadline,
+                brand_context=brand_context
+            )
+        _set_queue_headers(response, ticket)
+        
+        variant_models = [{**variant, "image_url": None, "image_variants": {}} for variant in variants]
+        await campaign_repo.update(campaign_id, {
+            "ad_copy_variants": variant_models,
+            "ad_copy_variants_idea_index": request.selected_idea_index,
+            "active_variant_index": None
+        })
+        
+        # Release the images of the variants that were replaced
+        for index, old_variant in enumerate(campaign.ad_copy_variants):
+            await asset_service.replace_reference(
+                _variant_image_ref(campaign_id, index), old_variant.image_url, None
+            )
+        
+        return AdCopyVariantsResponse(
+            campaign_id=campaign_id,
+            variants=[AdCopySchema(**variant) for variant in variant_models],
+            message=f"Successfully generated {len(variant_models)} ad copy variants"
+        )
+    except (HTTPException, AppException):
+        raise
+    except Exception as e:
+        error_detail = str(e)
+        logger.error(f"Error generating ad copy variants: {error_detail}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to generate ad copy variants: {error_detail}")
+
+
+@router.post("/{campaign_id}/ad-copy-variants/{variant_index}/select", response_model=GenerateAdCopyResponse)
+async def select_ad_copy_variant(
+    campaign_id: str,
+    variant_index: int,
+    user_id: str = Depends(get_current_user_id),
+    campaign_repo: CampaignRepository = Depends(get_campaign_repository),
+    asset_service: AssetService = Depends(get_asset_service)
+):
+    """Make an ad copy variant the campaign's active ad copy"""
+    campaign = await campaign_repo.get_by_id(campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    if campaign.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this campaign")
+    
+    if variant_index < 0 or variant_index >= len(campaign.ad_copy_variants):
+        raise HTTPException(status_code=400, detail="Invalid variant index")
+    
+    if campaign.ad_copy_variants_idea_index is None:
+        raise HTTPException(
+            status_code=409,
+            detail="The idea these variants were written for has been replaced; generate variants again"
+        )
+    
+    variant = campaign.ad_copy_variants[variant_index]
+    await campaign_repo.update(campaign_id, {
+        "ad_copy": variant.model_dump(),
+        "active_variant_index": variant_index,
+        "selected_idea_index": campaign.ad_copy_variants_idea_index,
+        "status": "ad_copy_generated"
+    })
+    await asset_service.replace_reference(
+        campaign_ref(campaign_id, "image"),
+        campaign.ad_copy.image_url if campaign.ad_copy else None,
+        variant.image_url
+    )
+    
+    message = f"Selected ad copy variant {variant_index}"
+    if not variant.image_url:
+        message += " (call generate-image to create its image)"
+    
+    return GenerateAdCopyResponse(
+        campaign_id=campaign_id,
+        ad_copy=AdCopySchema(**variant.model_dump()),
+        message=message
+    )
+
+
+@router.post(
+    "/{campaign_id}/localize-ad-copy",
+    response_model=LocalizeAdCopyResponse,
+    dependencies=[Depends(track_generation_request)]
+)
+async def localize_ad_copy(
+    campaign_id: str,
+    request: LocalizeAdCopyRequest,
+    http_request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    user_id: str = Depends(get_current_user_id),
+    campaign_repo: CampaignRepository = Depends(get_campaign_repository),
+    translation_repo: TranslationRepository = Depends(get_translation_repository),
+    generation_guard: GenerationGuard = Depends(get_generation_guard),
+    generation_slot: GenerationSlot = Depends(get_generation_slot)
+):
+    """
+    Localize the campaign's ad copy into several locales.
+    
+    Locales are translated in batches (one model call per
+    LOCALIZATION_CHUNK_SIZE locales). Translations are cached per (ad copy,
+    locale), so unchanged copy is never translated twice.
+    """
+    if request.campaign_id != campaign_id:
+        raise HTTPException(status_code=400, detail="Campaign ID mismatch")
+    
+    deadline = Deadline.for_operation("localize_ad_copy")
+    await _verify_campaign_owner(campaign_repo, campaign_id, user_id)
+    return await run_until_disconnected(
+        http_request,
+        generation_guard.run(
+            campaign_id,
+            "localize_ad_copy",
+            lambda: _localize_ad_copy(
+                campaign_id, request, campaign_repo, translation_repo, generation_slot, response, deadline
+            ),
+            LocalizeAdCopyResponse,
+            user_id=user_id,
+            idempotency_key=idempotency_key,
+            params=sorted(request.locales)
+        ),
+        "localize_ad_copy",
+        keep_running=lambda: generation_guard.has_joiners(campaign_id, "localize_ad_copy")
+    )
+
+
+async def _localize_ad_copy(
+    campaign_id: str,
+    request: LocalizeAdCopyRequest,
+    campaign_repo: CampaignRepository,
+    translation_repo: TranslationRepository,
+    generation_slot: GenerationSlot,
+    response: Response,
+    deadline: Deadline
+) -> LocalizeAdCopyResponse:
+    try:
+        campaign = await campaign_repo.get_by_id(campaign_id)
+        if not campaign:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+        
+        if not campaign.ad_copy:
+            raise HTTPException(status_code=400, detail="Ad copy must be generated first")
+        
+        ad_copy = campaign.ad_copy.model_dump(include={"headline", "body", "call_to_action"})
+        source_hash = request_fingerprint(ad_copy)
+        
+        # Reuse translations of this exact copy: the campaign's own, then the shared cache
+        localizations = {
+            locale: campaign.localized_ad_copy[locale].model_dump(include={"headline", "body", "call_to_action"})
+            for locale in request.locales
+            if locale in campaign.localized_ad_copy and campaign.localized_ad_copy[locale].source_hash == source_hash
+        }
+        stored = set(localizations)
+        cached = await translation_repo.get_many(source_hash, [l for l in request.locales if l not in stored])
+        for locale, translation in cached.items():
+            localizations[locale] = translation.model_dump(include={"headline", "body", "call_to_action"})
+        
+        missing = [locale for locale in request.locales if locale not in localizations]
+        translated = {}
+        if missing:
+            campaign_service = get_campaign_service()
+            chunks = math.ceil(len(missing) / settings.LOCALIZATION_CHUNK_SIZE)
+            async with generation_slot(cost=chunks) as ticket:
+                translated = await campaign_service.localize_ad_copy(ad_copy, missing, deadline)
+            _set_queue_headers(response, ticket)
+            await translation_repo.save_many(source_hash, translated)
+            localizations.update(translated)
+        
+        new_locales = [locale for locale in localizations if locale not in stored]
+        if new_locales:
+            now = datetime.utcnow()
+            await campaign_repo.update(campaign_id, {
+                f"localized_ad_copy.{locale}": {**localizations[locale], "source_hash": source_hash, "updated_at": now}
+                for locale in new_locales
+            })
+        
+        failed = [locale for locale in missing if locale not in translated]
+        message = f"Localized ad copy into {len(localizations)} locale(s)"
+        if failed:
+            message += f"; failed: {', '.join(failed)} (retry to translate them)"
+        
+        return LocalizeAdCopyResponse(
+            campaign_id=campaign_id,
+            localizations={
+                locale: LocalizedAdCopySchema(**fields, source_hash=source_hash)
+                for locale, fields in localizations.items()
+            },
+            translated=list(translated),
+            cached=[locale for locale in localizations if locale not in translated],
+            failed=failed,
+            message=message
+        )
+    except (HTTPException, AppException):
+        raise
+    except Exception as e:
+        error_detail = str(e)
+        logger.error(f"Error localizing ad copy: {error_detail}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to localize ad copy: {error_detail}")
+
+
+# Content types of a JSON Lines batch body (one campaign per line)
+JSON_LINES_TYPES = ("application/x-ndjson", "application/jsonl", "application/x-jsonlines")
+
+
+def _parse_campaign_batch(content_type: str, body: bytes) -> CreateCampaignBatchRequest:
+    """Read a batch from a JSON body ({"campaigns": [...]}) or from JSON Lines"""
+    try:
+        if content_type.split(";")[0].strip().lower() in JSON_LINES_TYPES:
+            campaigns = []
+            for line_number, line in enumerate(body.splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    campaigns.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise HTTPException(status_code=400, detail=f"Invalid JSON on line {line_number}: {e.msg}")
+            return CreateCampaignBatchRequest(campaigns=campaigns)
+        return CreateCampaignBatchRequest.model_validate_json(body)
+    except PydanticValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False, include_context=False))
+
+
+def _batch_status(batch: CampaignBatchModel) -> str:
+    """Batch status; one that stopped making progress was lost with its worker"""
+    stale_after = timedelta(seconds=settings.CAMPAIGN_BATCH_STALE_SECONDS)
+    if batch.status == "running" and datetime.utcnow() - batch.updated_at > stale_after:
+        return "interrupted"
+    return batch.status
+
+
+def _batch_response(batch: CampaignBatchModel) -> CampaignBatchResponse:
+    items = [
+        CampaignBatchItemSchema(index=index, campaign_id=item.campaign_id, status=item.status, error=item.error)
+        for index, item in enumerate(batch.items)
+    ]
+    return CampaignBatchResponse(
+        batch_id=batch.id,
+        status=_batch_status(batch),
+        items=items,
+        completed=sum(1 for item in items if item.status == "completed"),
+        failed=sum(1 for item in items if item.status == "failed"),
+        created_at=batch.created_at.isoformat(),
+        updated_at=batch.updated_at.isoformat()
+    )
+
+
+async def _get_owned_batch(batch_repo: CampaignBatchRepository, batch_id: str, user_id: str) -> CampaignBatchModel:
+    batch = await batch_repo.get_by_id(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    if batch.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this batch")
+    return batch
+
+
+@router.post("/batches", response_model=CampaignBatchResponse, status_code=202)
+async def create_campaign_batch(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    plan: str = Depends(get_current_user_plan),
+    campaign_repo: CampaignRepository = Depends(get_campaign_repository),
+    batch_repo: CampaignBatchRepository = Depends(get_campaign_batch_repository),
+    generation_guard: GenerationGuard = Depends(get_generation_guard),
+    generation_quota: GenerationQuota = Depends(get_generation_quota),
+    brand_context: BrandContext = Depends(get_brand_context)
+):
+    """
+    Create several campaigns and generate their ideas in the background.
+    
+    The body is JSON ({"campaigns": [...]}) or JSON Lines
+    (application/x-ndjson, one campaign per line), with up to
+    MAX_BATCH_CAMPAIGNS campaigns. Ideas are generated in the batch lane, at
+    most the plan's max_in_flight at a time, and identical briefs are
+    generated once. Poll GET /campaigns/batches/{batch_id} or stream
+    /campaigns/batches/{batch_id}/events for progress.
+    """
+    batch_request = _parse_campaign_batch(request.headers.get("content-type", ""), await request.body())
+    
+    try:
+        campaign_docs = [_campaign_document(campaign_data, user_id) for campaign_data in batch_request.campaigns]
+        campaign_ids = await campaign_repo.create_many(campaign_docs)
+        
+        # Identical briefs share the first one's generation
+        first_index = {}
+        items = []
+        for index, (campaign_id, doc) in enumerate(zip(campaign_ids, campaign_docs)):
+            ideas_hash = _ideas_input_hash(
+                doc["campaign_brief"], doc["objective"], doc["target_audience"], doc["ad_formats"],
+                brand_context.fingerprint
+            )
+            shared_from = first_index.setdefault(ideas_hash, index)
+            items.append({
+                "campaign_id": campaign_id,
+                "status": "pending",
+                "error": None,
+                "shared_from": shared_from if shared_from != index else None
+            })
+        
+        now = datetime.utcnow()
+        batch = await batch_repo.create({
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "items": items,
+            "status": "running",
+            "created_at": now,
+            "updated_at": now
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create campaign batch: {str(e)}")
+    
+    spawn(
+        _run_campaign_batch(batch, plan, campaign_repo, batch_repo, generation_guard, generation_quota, brand_context),
+        name=f"campaign-batch-{batch.id}"
+    )
+    return _batch_response(batch)
+
+
+async def _run_campaign_batch(
+    batch: CampaignBatchModel,
+    plan: str,
+    campaign_repo: CampaignRepository,
+    batch_repo: CampaignBatchRepository,
+    generation_guard: GenerationGuard,
+    generation_quota: GenerationQuota,
+    brand_context: BrandContext
+) -> None:
+    """Generate ideas for every campaign of a batch, recording each item's progress"""
+    generation_slot = partial(generation_quota.slot, batch.user_id, plan, BATCH)
+    # Queue no more than the user may run, so a batch never fills the shared queue
+    concurrency = asyncio.Semaphore(get_generation_scheduler().max_in_flight(plan))
+    copies = defaultdict(list)
+    for index, item in enumerate(batch.items):
+        if item.shared_from is not None:
+            copies[item.shared_from].append(index)
+    
+    async def set_status(indexes: List[int], status: str, error: Optional[str] = None) -> None:
+        for index in indexes:
+            await batch_repo.set_item_status(batch.id, index, status, error)
+    
+    async def generate(index: int) -> None:
+        campaign_id = batch.items[index].campaign_id
+        group = [index, *copies[index]]
+        async with concurrency:
+            await set_status(group, "running")
+            deadline = Deadline.for_operation("generate_ideas")
+            await generation_guard.run(
+                campaign_id,
+                "generate_ideas",
+                lambda: _generate_campaign_ideas(
+                    campaign_id, campaign_repo, generation_slot, Response(), deadline, brand_context
+                ),
+                GenerateIdeasResponse,
+                user_id=batch.user_id
+            )
+        
+        campaign = await campaign_repo.get_by_id(campaign_id) if copies[index] else None
+        if campaign:
+            for copy_index in copies[index]:
+                await campaign_repo.update(batch.items[copy_index].campaign_id, {
+                    "all_ideas": [idea.model_dump() for idea in campaign.all_ideas],
+                    "top_ideas": [idea.model_dump() for idea in campaign.top_ideas],
+                    "status": "ideas_generated"
+                })
+        await set_status(group, "completed")
+    
+    async def run_item(index: int) -> None:
+        """One item; a failure is recorded on the item and never fails the batch"""
+        try:
+            await generate(index)
+        except Exception as e:
+            error = str(getattr(e, "detail", None) or e) or type(e).__name__
+            logger.warning(
+                f"Batch idea generation failed: {error}",
+                extra={"batch_id": batch.id, "campaign_id": batch.items[index].campaign_id}
+            )
+            try:
+                await set_status([index, *copies[index]], "failed", error)
+            except Exception:
+                logger.error("Could not record batch item failure", exc_info=True, extra={"batch_id": batch.id})
+    
+    # Tracked like a request, so shutdown waits for the batch before cancelling it
+    async with generation_tracker.track():
+        status = "interrupted"
+        try:
+            await asyncio.gather(*(
+                run_item(index) for index, item in enumerate(batch.items) if item.shared_from is None
+            ))
+            status = "completed"
+        finally:
+            try:
+                await batch_repo.finish(batch.id, status)
+            except Exception:
+                # Readers report it interrupted once it stops making progress
+                logger.error("Could not finish campaign batch", exc_info=True, extra={"batch_id": batch.id})
+
+
+@router.get("/batches/{batch_id}", response_model=CampaignBatchResponse)
+async def get_campaign_batch(
+    batch_id: str,
+    user_id: str = Depends(get_current_user_id),
+    batch_repo: CampaignBatchRepository = Depends(get_campaign_batch_repository)
+):
+    """Get the progress of a campaign batch"""
+    return _batch_response(await _get_owned_batch(batch_repo, batch_id, user_id))
+
+
+@router.get("/batches/{batch_id}/events")
+async def stream_campaign_batch(
+    batch_id: str,
+    user_id: str = Depends(get_current_user_id),
+    batch_repo: CampaignBatchRepository = Depends(get_campaign_batch_repository)
+):
+    """
+    Stream the progress of a campaign batch as JSON Lines.
+    
+    Each item (index, campaign_id, status, error) is sent when its status
+    changes; the last line is the batch summary (batch_id, status, counts),
+    sent once the batch has finished or has made no progress for
+    CAMPAIGN_BATCH_STALE_SECONDS (reported as interrupted).
+    """
+    batch = await _get_owned_batch(batch_repo, batch_id, user_id)
+    
+    async def events() -> AsyncIterator[str]:
+        current = batch
+        sent = {}
+        while True:
+            summary = _batch_response(current)
+            for item in summary.items:
+                if sent.get(item.index) != (item.status, item.error):
+                    sent[item.index] = (item.status, item.error)
+                    yield item.model_dump_json() + "\n"
+            if summary.status != "running":
+                yield summary.model_dump_json(exclude={"items"}) + "\n"
+                return
+            await asyncio.sleep(settings.CAMPAIGN_BATCH_POLL_INTERVAL)
+            current = await batch_repo.get_by_id(batch_id) or current
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -0,0 +1,20 @@
+import os
+from fastapi import APIRouter
+from app.core.loop_watchdog import get_loop_stall_detector
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/loop-stalls", include_in_schema=False)
+async def get_loop_stalls(reset: bool = False):
+    """Event loop stalls in this worker, grouped by the call site that blocked"""
+    detector = get_loop_stall_detector()
+    report = {
+        "pid": os.getpid(),
+        "running": detector.running,
+        "threshold_ms": int(detector.threshold * 1000),
+        "stalls": detector.report(),
+    }
+    if reset:
+        detector.reset()
+    return report
@@ -0,0 +1,54 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.circuit_breaker import gemini_circuit_breaker
+from app.core.config import settings
+from app.core.database import ping_mongo
+from app.core.inflight import generation_tracker
+from app.core.metrics import current_loop_lag
+from app.services.generation_scheduler import get_generation_scheduler
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("")
+async def health_check():
+    """Health check endpoint"""
+    return {"status": "healthy", "version": settings.APP_VERSION}
+
+
+@router.get("/live")
+async def liveness():
+    """Liveness: the process is up and its event loop is serving requests"""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness():
+    """
+    Readiness: whether this replica should receive traffic.
+    
+    Fails while MongoDB is unreachable, the worker is draining, the
+    generation queue is full or the event loop is lagging. The Gemini
+    circuit breaker is reported but does not fail readiness: it affects
+    every replica alike, and reads keep working while it is open.
+    """
+    scheduler = get_generation_scheduler()
+    loop_lag_ms = round(current_loop_lag() * 1000, 1)
+    checks = {
+        "mongodb": await ping_mongo(settings.READINESS_MONGO_TIMEOUT),
+        "draining": not generation_tracker.draining,
+        "generation_queue": scheduler.queue_depth < settings.ADMISSION_MAX_QUEUE_DEPTH,
+        "event_loop": loop_lag_ms < settings.ADMISSION_MAX_LOOP_LAG_MS,
+    }
+    ready = all(checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "checks": checks,
+            "gemini_circuit": gemini_circuit_breaker.state,
+            "generation_queue_depth": scheduler.queue_depth,
+            "generation_in_flight": scheduler.in_flight,
+            "event_loop_lag_ms": loop_lag_ms,
+        }
+    )
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, Form, File, UploadFile
+from fastapi import APIRouter, Depends, Form, File, Request, Response, UploadFile
 from typing import Optional, List
 from app.schemas.onboarding import OnboardingResponse
 from app.services.onboarding_service import OnboardingService
 from app.utils.dependencies import get_onboarding_service, get_current_user_id
+from app.utils.etag import etag_matches, not_modified, set_etag
 
 router = APIRouter(prefix="/onboarding", tags=["onboarding"])
 
@@ -65,15 +66,25 @@ async def create_or_update_onboarding(
 
 @router.get("", response_model=OnboardingResponse)
 async def get_onboarding(
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_current_user_id),
     onboarding_service: OnboardingService = Depends(get_onboarding_service)
 ):
-    """Get onboarding data for current user"""
+    """Get onboarding data for current user (supports If-None-Match)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Answer polling from a projection before loading the whole document
+        etag = await onboarding_service.get_onboarding_etag(user_id)
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    
     result = await onboarding_service.get_onboarding(user_id)
     
     if not result:
         return OnboardingResponse(message="No onboarding data found")
     
+    set_etag(response, result.pop("etag"))
     return OnboardingResponse(**result)
 
 
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import RedirectResponse
+from app.core.storage import get_storage
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+
+@router.get("/{key:path}", include_in_schema=False)
+async def get_upload(key: str):
+    """Redirect to the object's direct or presigned URL so the API never streams the bytes"""
+    return RedirectResponse(url=get_storage().url_for(key), status_code=307)
@@ -1,5 +1,6 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field
+import re
+from typing import List, Literal, Optional, Dict
+from pydantic import BaseModel, Field, field_validator
 
 
 class CampaignIdeaSchema(BaseModel):
@@ -52,6 +53,19 @@ class AdCopySchema(BaseModel):
     call_to_action: str
     visual_direction: str
     image_url: Optional[str] = None
+    image_variants: Dict[str, str] = {}
+
+
+# Ad copy fields that can be regenerated on their own
+AdCopyField = Literal["headline", "body", "call_to_action", "visual_direction"]
+
+
+class RegenerateIdeaResponse(BaseModel):
+    """Regenerate single idea response schema"""
+    campaign_id: str
+    idea_index: int
+    idea: CampaignIdeaSchema
+    message: str
 
 
 class GenerateAdCopyRequest(BaseModel):
@@ -60,6 +74,62 @@ class GenerateAdCopyRequest(BaseModel):
     selected_idea_index: int = Field(..., ge=0, description="Index of selected idea from top_ideas")
 
 
+MAX_AD_COPY_VARIANTS = 5
+
+
+class GenerateAdCopyVariantsRequest(BaseModel):
+    """Generate ad copy variants request schema"""
+    campaign_id: str
+    selected_idea_index: int = Field(..., ge=0, description="Index of selected idea from top_ideas")
+    count: int = Field(default=3, ge=2, le=MAX_AD_COPY_VARIANTS, description="Number of variants")
+
+
+class AdCopyVariantsResponse(BaseModel):
+    """Generate ad copy variants response schema"""
+    campaign_id: str
+    variants: List[AdCopySchema]
+    message: str
+
+
+MAX_LOCALES = 30
+
+# BCP 47 style tags such as "de", "pt-BR" or "zh-Hant-TW"
+LOCALE_PATTERN = re.compile(r"^[A-Za-z]{2,3}(-[A-Za-z0-9]{2,8})*$")
+
+
+class LocalizeAdCopyRequest(BaseModel):
+    """Localize ad copy request schema"""
+    campaign_id: str
+    locales: List[str] = Field(..., min_length=1, max_length=MAX_LOCALES)
+    
+    @field_validator("locales")
+    @classmethod
+    def validate_locales(cls, locales: List[str]) -> List[str]:
+        for locale in locales:
+            if not LOCALE_PATTERN.match(locale):
+                raise ValueError(f"Invalid locale: {locale}")
+        # Drop duplicates, keep order
+        return list(dict.fromkeys(locales))
+
+
+class LocalizedAdCopySchema(BaseModel):
+    """Ad copy translated into one locale"""
+    headline: str
+    body: str
+    call_to_action: str
+    source_hash: str
+
+
+class LocalizeAdCopyResponse(BaseModel):
+    """Localize ad copy response schema"""
+    campaign_id: str
+    localizations: Dict[str, LocalizedAdCopySchema]
+    translated: List[str]  # locales translated by this request
+    cached: List[str]  # locales reused from earlier translations
+    failed: List[str] = []
+    message: str
+
+
 class GenerateAdCopyResponse(BaseModel):
     """Generate ad copy response schema"""
     campaign_id: str
@@ -79,7 +149,37 @@ class CampaignResponse(BaseModel):
     top_ideas: List[CampaignIdeaSchema] = []
     selected_idea_index: Optional[int] = None
     ad_copy: Optional[AdCopySchema] = None
+    ad_copy_variants: List[AdCopySchema] = []
+    active_variant_index: Optional[int] = None
+    localized_ad_copy: Dict[str, LocalizedAdCopySchema] = {}
     status: str
     created_at: str
     updated_at: str
 
+
+
+MAX_BATCH_CAMPAIGNS = 50
+
+
+class CreateCampaignBatchRequest(BaseModel):
+    """Bulk campaign creation request schema"""
+    campaigns: List[CreateCampaignRequest] = Field(..., min_length=1, max_length=MAX_BATCH_CAMPAIGNS)
+
+
+class CampaignBatchItemSchema(BaseModel):
+    """Progress of one campaign in a batch"""
+    index: int
+    campaign_id: str
+    status: str  # pending, running, completed, failed
+    error: Optional[str] = None
+
+
+class CampaignBatchResponse(BaseModel):
+    """Campaign batch response schema"""
+    batch_id: str
+    status: str  # running, completed, interrupted
+    items: List[CampaignBatchItemSchema]
+    completed: int
+    failed: int
+    created_at: str
+    updated_at: str
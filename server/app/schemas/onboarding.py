@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel, Field
 
 
@@ -25,6 +25,7 @@ class OnboardingDataResponse(BaseModel):
     brand_name: str
     industry: str
     logo_url: Optional[str] = None
+    logo_variants: Dict[str, str] = {}
     logo_position: str
     typography: str
     font_type: Optional[str] = None
@@ -1,40 +1,69 @@
-import json
-import base64
-from typing import Dict, Any, Optional
-from pathlib import Path
-import google.generativeai as genai
+import asyncio
+import hashlib
+import logging
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 from datetime import datetime
-import uuid
+from app.core.deadline import Deadline, record_degraded, run_stage
+from app.core.exceptions import DeadlineExceededError
+from app.core.metrics import observe_gemini
+from app.core.storage import StorageBackend, content_key, url_for_key
+from app.services.agent.image_response import extract_inline_image, response_text
+from app.services.agent.json_output import parse_json_output
+from app.services.brand_context import NO_BRAND_CONTEXT, BrandContext
+
+if TYPE_CHECKING:  # the SDK is imported when CampaignService is built
+    import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
+
+# Share of the remaining budget for the ad copy call; the image gets the rest
+AD_COPY_BUDGET_SHARE = 0.4
+
+# Ad copy field -> what the model should write, for single-field regeneration
+AD_COPY_FIELD_GUIDANCE = {
+    "headline": "A compelling headline (max 100 characters, catchy and attention-grabbing)",
+    "body": "The main body copy (max 300 characters, persuasive and engaging)",
+    "call_to_action": "A clear call-to-action (max 50 characters, action-oriented)",
+    "visual_direction": (
+        "Description of ONLY visual elements (objects, scenes, colors, mood, composition) for a "
+        "concept-based image with ABSOLUTELY NO TEXT, words, letters or numbers (max 280 characters)"
+    ),
+}
+
+
+class ImageGenerationError(Exception):
+    """The image model returned no image"""
 
 
 class AdCopyVisualAgent:
     """Agent for generating ad copy and visual direction with image generation"""
     
-    def __init__(self, text_model: genai.GenerativeModel, image_model: genai.GenerativeModel, upload_dir: Path):
+    def __init__(self, text_model: "genai.GenerativeModel", image_model: "genai.GenerativeModel", storage: StorageBackend):
         """
         Initialize the Ad Copy & Visual Direction Agent
         
         Args:
             text_model: Pre-configured Gemini model for text generation
             image_model: Pre-configured Gemini model for image generation
-            upload_dir: Directory to save generated images
+            storage: Storage backend generated images are saved to
         """
         self.text_model = text_model
         self.image_model = image_model
-        self.upload_dir = upload_dir
-        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.storage = storage
     
-    async def generate_ad_copy_and_image(
+    async def generate_ad_copy(
         self,
         campaign_brief: str,
         objective: str,
         target_audience: str,
         selected_idea_title: str,
         selected_idea_description: str,
-        ad_formats: list[str]
-    ) -> Dict[str, Any]:
+        ad_formats: list[str],
+        deadline: Optional[Deadline] = None,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> Dict[str, str]:
         """
-        Generate ad copy and visual direction with image
+        Generate ad copy and visual direction (step 1, no image)
         
         Args:
             campaign_brief: The campaign brief
@@ -43,35 +72,231 @@ class AdCopyVisualAgent:
             selected_idea_title: Title of selected campaign idea
             selected_idea_description: Description of selected campaign idea
             ad_formats: List of ad formats needed
+            deadline: Request deadline
+            brand_context: Brand profile block placed at the start of the prompt
         
         Returns:
-            Dictionary with ad_copy (headline, body, cta) and image_url
+            Dictionary with headline, body, call_to_action and visual_direction
         """
-        # Step 1: Generate ad copy and visual direction description
-        ad_copy_result = await self._generate_ad_copy(
-            campaign_brief=campaign_brief,
-            objective=objective,
-            target_audience=target_audience,
-            selected_idea_title=selected_idea_title,
-            selected_idea_description=selected_idea_description,
-            ad_formats=ad_formats
-        )
-        
-        # Step 2: Generate image based on visual direction (optional, can return None)
-        image_url = await self._generate_image(
-            visual_direction=ad_copy_result.get("visual_direction", ""),
-            headline=ad_copy_result.get("headline", ""),
-            campaign_brief=campaign_brief
-        )
+        try:
+            ad_copy_result = await run_stage(
+                self._generate_ad_copy(
+                    campaign_brief=campaign_brief,
+                    objective=objective,
+                    target_audience=target_audience,
+                    selected_idea_title=selected_idea_title,
+                    selected_idea_description=selected_idea_description,
+                    ad_formats=ad_formats,
+                    brand_context=brand_context
+                ),
+                deadline,
+                AD_COPY_BUDGET_SHARE
+            )
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError("Ad copy generation timed out")
         
         return {
             "headline": ad_copy_result.get("headline", ""),
             "body": ad_copy_result.get("body", ""),
             "call_to_action": ad_copy_result.get("call_to_action", ""),
-            "visual_direction": ad_copy_result.get("visual_direction", ""),
-            "image_url": image_url
+            "visual_direction": ad_copy_result.get("visual_direction", "")
+        }
+    
+    async def generate_image_for_ad_copy(
+        self,
+        ad_copy: Dict[str, str],
+        campaign_brief: str,
+        deadline: Optional[Deadline] = None,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> Dict[str, Any]:
+        """
+        Generate the image for ad copy from step 1 (optional, can return no image)
+        
+        Args:
+            ad_copy: Result of generate_ad_copy
+            campaign_brief: The campaign brief
+            deadline: Request deadline; without time left the image is skipped
+            brand_context: Brand profile; its visual block starts the image prompt
+        
+        Returns:
+            Dictionary with image_url and degraded (stages skipped for lack of time)
+        """
+        degraded = []
+        try:
+            image_url = await run_stage(
+                self._generate_image(
+                    visual_direction=ad_copy.get("visual_direction", ""),
+                    headline=ad_copy.get("headline", ""),
+                    campaign_brief=campaign_brief,
+                    brand_context=brand_context
+                ),
+                deadline
+            )
+        except asyncio.TimeoutError:
+            logger.warning("No time left for image generation; returning ad copy without an image")
+            record_degraded("image")
+            degraded.append("image")
+            image_url = None
+        
+        return {"image_url": image_url, "degraded": degraded}
+    
+    async def generate_ad_copy_variants(
+        self,
+        count: int,
+        campaign_brief: str,
+        objective: str,
+        target_audience: str,
+        selected_idea_title: str,
+        selected_idea_description: str,
+        ad_formats: list[str],
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> List[Dict[str, str]]:
+        """
+        Generate several distinct ad copy variants in one structured call
+        
+        Args:
+            count: Number of variants
+            campaign_brief: The campaign brief
+            objective: Campaign objective
+            target_audience: Target audience description
+            selected_idea_title: Title of selected campaign idea
+            selected_idea_description: Description of selected campaign idea
+            ad_formats: List of ad formats needed
+            brand_context: Brand profile block placed at the start of the prompt
+        
+        Returns:
+            Variants with headline, body, call_to_action and visual_direction
+        
+        Raises:
+            ValueError: The model returned no usable variants
+        """
+        fields = "\n".join(f'- "{name}": {guidance}' for name, guidance in AD_COPY_FIELD_GUIDANCE.items())
+        prompt = f"""{brand_context.text_prefix}You are a Creative Copywriter and Art Director working on an advertising campaign. Write {count} distinct ad copy variants of the same campaign idea for A/B testing.
+
+Campaign Brief: {campaign_brief}
+Objective: {objective}
+Target Audience: {target_audience}
+Selected Campaign Idea: {selected_idea_title}
+Idea Description: {selected_idea_description}
+Ad Formats Needed: {', '.join(ad_formats)}
+
+Make the variants differ in angle and tone (for example benefit-led, emotional, urgent), not just wording.
+
+Return a JSON array of {count} objects, each with:
+{fields}"""
+
+        with observe_gemini("ad_copy_visual", "generate_ad_copy_variants"):
+            response = await self.text_model.generate_content_async(
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            )
+        variants = parse_json_output(response.text)
+        if not isinstance(variants, list):
+            raise ValueError("Model returned no ad copy variants")
+        result = [
+            {name: str(variant.get(name, "")) for name in AD_COPY_FIELD_GUIDANCE}
+            for variant in variants[:count]
+            if isinstance(variant, dict) and variant.get("headline")
+        ]
+        if not result:
+            raise ValueError("Model returned no ad copy variants")
+        return result
+    
+    async def localize_ad_copy(self, ad_copy: Dict[str, str], locales: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Localize ad copy into several locales in one structured call
+        
+        Args:
+            ad_copy: Source headline, body and call_to_action
+            locales: Locale tags, e.g. ["de-DE", "fr-FR"]
+        
+        Returns:
+            Locale -> headline, body and call_to_action, for the locales the
+            model returned
+        """
+        prompt = f"""You are a Creative Copywriter localizing an ad for other markets. For each locale, adapt the copy rather than translating word for word: natural phrasing and local idioms, same meaning, tone and call to action, same length limits.
+
+Headline (max 100 characters): {ad_copy.get('headline', '')}
+Body (max 300 characters): {ad_copy.get('body', '')}
+Call to action (max 50 characters): {ad_copy.get('call_to_action', '')}
+
+Locales: {', '.join(locales)}
+
+Return a JSON object with one key per locale (exactly as written above), each an object with "headline", "body" and "call_to_action"."""
+
+        with observe_gemini("ad_copy_visual", "localize_ad_copy"):
+            response = await self.text_model.generate_content_async(
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            )
+        localized = parse_json_output(response.text)
+        if not isinstance(localized, dict):
+            raise ValueError("Model returned no localizations")
+        return {
+            locale: {
+                "headline": str(localized[locale].get("headline", "")),
+                "body": str(localized[locale].get("body", "")),
+                "call_to_action": str(localized[locale].get("call_to_action", ""))
+            }
+            for locale in locales
+            if isinstance(localized.get(locale), dict) and localized[locale].get("headline")
         }
     
+    async def regenerate_field(
+        self,
+        field: str,
+        ad_copy: Dict[str, str],
+        campaign_brief: str,
+        objective: str,
+        target_audience: str,
+        selected_idea_title: str,
+        selected_idea_description: str,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> str:
+        """
+        Rewrite one ad copy field, keeping the others fixed as context
+        
+        Args:
+            field: headline, body, call_to_action or visual_direction
+            ad_copy: Current ad copy fields
+            campaign_brief: The campaign brief
+            objective: Campaign objective
+            target_audience: Target audience description
+            selected_idea_title: Title of selected campaign idea
+            selected_idea_description: Description of selected campaign idea
+            brand_context: Brand profile block placed at the start of the prompt
+        
+        Returns:
+            New value for the field
+        
+        Raises:
+            ValueError: The model's reply could not be parsed
+        """
+        kept = "\n".join(
+            f"{name}: {ad_copy.get(name, '')}" for name in AD_COPY_FIELD_GUIDANCE if name != field
+        )
+        prompt = f"""{brand_context.text_prefix}You are a Creative Copywriter and Art Director revising one part of an ad. The client wants a new {field} and keeps everything else.
+
+Campaign Brief: {campaign_brief}
+Objective: {objective}
+Target Audience: {target_audience}
+Selected Campaign Idea: {selected_idea_title}
+Idea Description: {selected_idea_description}
+
+Current ad (keep consistent with these fields):
+{kept}
+Rejected {field}: {ad_copy.get(field, '')}
+
+Return ONLY a valid JSON object with one key:
+- "{field}": {AD_COPY_FIELD_GUIDANCE[field]}, clearly different from the rejected one"""
+
+        with observe_gemini("ad_copy_visual", "regenerate_field"):
+            response = await self.text_model.generate_content_async(prompt)
+        value = parse_json_output(response.text)
+        if not isinstance(value, dict) or not value.get(field):
+            raise ValueError(f"Model returned no {field}")
+        return str(value[field])
+    
     async def _generate_ad_copy(
         self,
         campaign_brief: str,
@@ -79,11 +304,12 @@ class AdCopyVisualAgent:
         target_audience: str,
         selected_idea_title: str,
         selected_idea_description: str,
-        ad_formats: list[str]
+        ad_formats: list[str],
+        brand_context: BrandContext = NO_BRAND_CONTEXT
     ) -> Dict[str, str]:
         """Generate ad copy text including headline, body, CTA, and visual direction"""
         
-        prompt = f"""You are a Creative Copywriter and Art Director working on an advertising campaign. Your job is to create compelling ad copy and visual direction.
+        prompt = f"""{brand_context.text_prefix}You are a Creative Copywriter and Art Director working on an advertising campaign. Your job is to create compelling ad copy and visual direction.
 
 Campaign Brief: {campaign_brief}
 Objective: {objective}
@@ -112,49 +338,49 @@ Example format:
 
 Return ONLY the JSON object, no additional text or markdown formatting."""
 
+        # Failures raise so the ad_copy stage is recorded as failed and retried,
+        # rather than checkpointing placeholder copy as the result
+        with observe_gemini("ad_copy_visual", "generate_ad_copy"):
+            response = await self.text_model.generate_content_async(prompt)
         try:
-            response = self.text_model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # Clean up markdown code blocks if present
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
-            
-            ad_copy_data = json.loads(response_text)
-            return ad_copy_data
-            
-        except json.JSONDecodeError as e:
-            print(f"Error parsing Ad Copy response: {e}")
-            print(f"Response text: {response_text if 'response_text' in locals() else 'No response'}")
-            # Return default ad copy
-            return self._get_default_ad_copy()
-        except Exception as e:
-            print(f"Error generating ad copy: {e}")
-            return self._get_default_ad_copy()
+            ad_copy_data = parse_json_output(response.text)
+        except ValueError as e:
+            logger.debug("Ad Copy response text: %s", response.text)
+            raise ValueError(f"Could not parse ad copy: {e}") from e
+        if not isinstance(ad_copy_data, dict) or not ad_copy_data.get("headline"):
+            raise ValueError("Model returned no ad copy")
+        return ad_copy_data
     
     async def _generate_image(
         self,
         visual_direction: str,
         headline: str,
-        campaign_brief: str
-    ) -> Optional[str]:
+        campaign_brief: str,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> str:
         """Generate an image based on visual direction using Gemini image generation"""
-        return await self.generate_image_only(visual_direction, headline, campaign_brief)
+        return await self.generate_image_only(visual_direction, headline, campaign_brief, brand_context)
     
     async def generate_image_only(
         self,
         visual_direction: str,
         headline: str,
-        campaign_brief: str
-    ) -> Optional[str]:
-        """Generate an image based on visual direction using Gemini 2.5 Flash Image model"""
+        campaign_brief: str,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> str:
+        """
+        Generate an image based on visual direction using Gemini 2.5 Flash Image model
+        
+        Returns:
+            URL of the stored image
+        
+        Raises:
+            ImageGenerationError: The model returned no image
+        """
         
         # Create a detailed image generation prompt - CONCEPT-BASED, NO TEXT
         # Extract the core concept from campaign brief to represent it visually
-        image_prompt = f"""Create a professional, concept-based advertising image. This is a PURELY VISUAL image with ABSOLUTELY NO TEXT.
+        image_prompt = f"""{brand_context.visual_prefix}Create a professional, concept-based advertising image. This is a PURELY VISUAL image with ABSOLUTELY NO TEXT.
 
 Campaign Context: {campaign_brief}
 Visual Style Guide: {visual_direction}
@@ -179,197 +405,24 @@ CRITICAL REQUIREMENTS:
 
 Generate a high-quality, professional advertising image that represents the campaign concept using ONLY visual imagery - absolutely NO text, words, letters, numbers, or typography of any kind."""
 
-        try:
-            model_name = getattr(self.image_model, 'model_name', None) or getattr(self.image_model, '_model_name', None) or 'unknown'
-            print(f"\n{'='*60}")
-            print(f"Generating image with model: {model_name}")
-            print(f"Prompt length: {len(image_prompt)} characters")
-            print(f"{'='*60}\n")
-            
-            # Generate content - try different approaches
-            response = None
-            
-            # Try 1: With generation_config dict (if supported)
-            try:
-                print("Attempt 1: Trying with generation_config dict...")
-                generation_config = {
-                    'response_modalities': ['IMAGE'],
-                }
-                response = self.image_model.generate_content(
-                    image_prompt,
-                    generation_config=generation_config
-                )
-                print("✓ Success with generation_config dict")
-            except Exception as e1:
-                print(f"✗ Failed with generation_config: {e1}")
-                
-                # Try 2: With response_modalities as direct parameter
-                try:
-                    print("Attempt 2: Trying with response_modalities parameter...")
-                    response = self.image_model.generate_content(
-                        image_prompt,
-                        response_modalities=['IMAGE']
-                    )
-                    print("✓ Success with response_modalities parameter")
-                except Exception as e2:
-                    print(f"✗ Failed with response_modalities: {e2}")
-                    
-                    # Try 3: Without any config (model might default to image)
-                    try:
-                        print("Attempt 3: Trying without any config...")
-                        response = self.image_model.generate_content(image_prompt)
-                        print("✓ Success without config")
-                    except Exception as e3:
-                        print(f"✗ All attempts failed. Last error: {e3}")
-                        raise e3
-            
-            if not response:
-                print("❌ No response received")
-                return None
-            
-            print(f"Response type: {type(response)}")
-            print(f"Response dir: {[attr for attr in dir(response) if not attr.startswith('_')]}")
-            
-            # Process response following JavaScript structure:
-            # chunk.candidates[0].content.parts[0].inlineData
-            if not hasattr(response, 'candidates'):
-                print("❌ Response has no 'candidates' attribute")
-                print(f"Available attributes: {dir(response)}")
-                return None
-            
-            if not response.candidates:
-                print("❌ Response.candidates is empty")
-                return None
-            
-            print(f"Found {len(response.candidates)} candidate(s)")
-            
-            for candidate_idx, candidate in enumerate(response.candidates):
-                print(f"\n--- Processing candidate {candidate_idx} ---")
-                print(f"Candidate type: {type(candidate)}")
-                print(f"Candidate attributes: {[attr for attr in dir(candidate) if not attr.startswith('_')]}")
-                
-                # Access candidate.content
-                if not hasattr(candidate, 'content'):
-                    print(f"✗ Candidate {candidate_idx} has no 'content' attribute")
-                    continue
-                
-                content = candidate.content
-                if not content:
-                    print(f"✗ Candidate {candidate_idx} content is None")
-                    continue
-                
-                print(f"Content type: {type(content)}")
-                print(f"Content attributes: {[attr for attr in dir(content) if not attr.startswith('_')]}")
-                
-                # Access content.parts
-                if not hasattr(content, 'parts'):
-                    print(f"✗ Content has no 'parts' attribute")
-                    continue
-                
-                parts = content.parts
-                if not parts:
-                    print(f"✗ Content.parts is empty")
-                    continue
-                
-                print(f"Found {len(parts)} part(s)")
-                
-                for part_idx, part in enumerate(parts):
-                    print(f"\n  Processing part {part_idx}")
-                    print(f"  Part type: {type(part)}")
-                    part_attrs = [attr for attr in dir(part) if not attr.startswith('_')]
-                    print(f"  Part attributes: {part_attrs}")
-                    
-                    # Check for inline_data - try both snake_case and camelCase
-                    inline_data = None
-                    if 'inline_data' in part_attrs:
-                        inline_data = getattr(part, 'inline_data', None)
-                        if inline_data:
-                            print(f"  ✓ Found inline_data (snake_case)")
-                    elif 'inlineData' in part_attrs:
-                        inline_data = getattr(part, 'inlineData', None)
-                        if inline_data:
-                            print(f"  ✓ Found inlineData (camelCase)")
-                    
-                    if inline_data:
-                        print(f"  Inline data type: {type(inline_data)}")
-                        inline_attrs = [attr for attr in dir(inline_data) if not attr.startswith('_')]
-                        print(f"  Inline data attributes: {inline_attrs}")
-                        
-                        # Extract data
-                        image_bytes = None
-                        mime_type = "image/png"
-                        
-                        # Try to get data
-                        if 'data' in inline_attrs:
-                            data_attr = getattr(inline_data, 'data', None)
-                            if data_attr:
-                                if isinstance(data_attr, bytes):
-                                    image_bytes = data_attr
-                                    print(f"  ✓ Data is bytes: {len(image_bytes)} bytes")
-                                elif isinstance(data_attr, str):
-                                    try:
-                                        image_bytes = base64.b64decode(data_attr)
-                                        print(f"  ✓ Data is base64 string, decoded: {len(image_bytes)} bytes")
-                                    except Exception as decode_err:
-                                        print(f"  ✗ Failed to decode base64: {decode_err}")
-                        
-                        # Try to get mime_type
-                        if 'mime_type' in inline_attrs:
-                            mime_type = getattr(inline_data, 'mime_type', 'image/png') or "image/png"
-                        elif 'mimeType' in inline_attrs:
-                            mime_type = getattr(inline_data, 'mimeType', 'image/png') or "image/png"
-                        
-                        print(f"  MIME type: {mime_type}")
-                        
-                        if image_bytes:
-                            # Determine file extension
-                            extension = "png"
-                            mime_lower = mime_type.lower()
-                            if "jpeg" in mime_lower or "jpg" in mime_lower:
-                                extension = "jpg"
-                            elif "webp" in mime_lower:
-                                extension = "webp"
-                            
-                            # Generate filename and save
-                            filename = f"ad_poster_{uuid.uuid4().hex[:8]}.{extension}"
-                            file_path = self.upload_dir / filename
-                            
-                            with open(file_path, "wb") as f:
-                                f.write(image_bytes)
-                            
-                            print(f"\n{'='*60}")
-                            print(f"✓✓✓ SUCCESS: Image saved as {filename}")
-                            print(f"   Size: {len(image_bytes)} bytes")
-                            print(f"   Path: {file_path}")
-                            print(f"{'='*60}\n")
-                            
-                            return f"/uploads/{filename}"
-                        else:
-                            print(f"  ✗ No image bytes extracted from inline_data")
-                    else:
-                        # Check for text (for debugging)
-                        if 'text' in part_attrs:
-                            text_content = getattr(part, 'text', '')
-                            if text_content:
-                                print(f"  Part contains text: {text_content[:150]}...")
-            
-            print(f"\n{'='*60}")
-            print("❌ No image data found in response")
-            print(f"{'='*60}\n")
-            return None
-            
-        except Exception as e:
-            print(f"❌ Error generating image: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
-    
-    def _get_default_ad_copy(self) -> Dict[str, str]:
-        """Return default ad copy if generation fails"""
-        return {
-            "headline": "Experience the Difference",
-            "body": "Discover our innovative products designed to enhance your lifestyle. Quality meets style in every detail.",
-            "call_to_action": "Learn More",
-            "visual_direction": "Modern, clean design with vibrant colors, professional photography showcasing product visuals, optimistic mood, concept-based imagery with relevant visual elements representing the product or service"
-        }
-
+        model_name = getattr(self.image_model, 'model_name', None) or getattr(self.image_model, '_model_name', None) or 'unknown'
+        logger.debug("Generating image", extra={"model": model_name, "prompt_length": len(image_prompt)})
+        
+        # google-generativeai 0.8 has no response_modalities option; image models answer with an image by default
+        with observe_gemini("ad_copy_visual", "generate_image"):
+            response = await self.image_model.generate_content_async(image_prompt)
+        
+        if not response:
+            raise ImageGenerationError(f"Image model {model_name} returned no response")
+        
+        image = extract_inline_image(response)
+        if image is None:
+            raise ImageGenerationError(f"Image model {model_name} returned no image: {response_text(response)!r}")
+        
+        # Content-addressed filename; identical images are stored once
+        filename = content_key(hashlib.sha256(image.data).hexdigest(), image.extension)
+        if not await self.storage.exists(filename):
+            await self.storage.put_bytes(filename, image.data, content_type=image.mime_type)
+        
+        logger.debug("Image saved", extra={"key": filename, "size": len(image.data), "mime_type": image.mime_type})
+        return url_for_key(filename)
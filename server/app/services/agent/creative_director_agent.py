@@ -1,13 +1,26 @@
 import json
-from typing import List
-import google.generativeai as genai
+import logging
+import re
+from typing import TYPE_CHECKING, List, Set
 from app.schemas.campaign import CampaignIdeaSchema
+from app.core.metrics import observe_gemini
+from app.services.brand_context import NO_BRAND_CONTEXT, BrandContext
+from app.services.agent.json_output import parse_json_output
+
+if TYPE_CHECKING:  # the SDK is imported when CampaignService is built
+    import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
+
+
+def _keywords(text: str) -> Set[str]:
+    return {word for word in re.findall(r"[a-z0-9]+", text.lower()) if len(word) > 3}
 
 
 class CreativeDirectorAgent:
     """Creative Director Agent: Evaluates and scores campaign ideas"""
     
-    def __init__(self, model: genai.GenerativeModel):
+    def __init__(self, model: "genai.GenerativeModel"):
         """
         Initialize the Creative Director Agent
         
@@ -16,13 +29,92 @@ class CreativeDirectorAgent:
         """
         self.model = model
     
+    @staticmethod
+    def rank_locally(
+        ideas: List[CampaignIdeaSchema],
+        campaign_brief: str,
+        objective: str,
+        target_audience: str,
+        limit: int = 3
+    ) -> List[CampaignIdeaSchema]:
+        """
+        Rank ideas without a model call, by keyword overlap with the brief
+        
+        Used when there is no time left for the director's evaluation.
+        
+        Args:
+            ideas: Ideas from the Creative Team
+            campaign_brief: The campaign brief
+            objective: Campaign objective
+            target_audience: Target audience description
+            limit: Number of ideas to return
+        
+        Returns:
+            Best-matching ideas with heuristic scores
+        """
+        brief_keywords = _keywords(f"{campaign_brief} {objective} {target_audience}")
+        for idea in ideas:
+            idea_keywords = _keywords(f"{idea.title} {idea.description}")
+            overlap = len(idea_keywords & brief_keywords) / len(idea_keywords) if idea_keywords else 0.0
+            idea.score = round(5.0 + 5.0 * overlap, 1)
+            idea.reasoning = "Ranked by match with the brief (director evaluation skipped)"
+        # sorted() is stable, so ties keep the Creative Team's order
+        return sorted(ideas, key=lambda x: x.score, reverse=True)[:limit]
+    
+    async def score_idea(
+        self,
+        idea: CampaignIdeaSchema,
+        campaign_brief: str,
+        objective: str,
+        target_audience: str,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> CampaignIdeaSchema:
+        """
+        Score a single idea (after it was regenerated)
+        
+        Args:
+            idea: Idea to score (updated in place)
+            campaign_brief: The campaign brief
+            objective: Campaign objective
+            target_audience: Target audience description
+            brand_context: Brand profile block placed at the start of the prompt
+        
+        Returns:
+            The idea with score and reasoning; ranked locally if evaluation fails
+        """
+        prompt = f"""{brand_context.text_prefix}You are a Creative Director evaluating a campaign idea.
+
+Campaign Brief: {campaign_brief}
+Objective: {objective}
+Target Audience: {target_audience}
+
+Idea: {idea.title} - {idea.description}
+
+Evaluate it on creativity and originality (30%), alignment with the brief and objective (30%), appeal to the target audience (25%) and feasibility and clarity (15%).
+
+Return ONLY a valid JSON object with:
+- "score": A numerical score from 1.0 to 10.0 (use decimals for precision)
+- "reasoning": Brief explanation of the score (max 150 characters)"""
+
+        try:
+            with observe_gemini("creative_director", "score_idea"):
+                response = await self.model.generate_content_async(prompt)
+            evaluation = parse_json_output(response.text)
+            idea.score = float(evaluation.get("score", 0.0))
+            idea.reasoning = evaluation.get("reasoning", "")
+            return idea
+        except Exception as e:
+            logger.error(f"Error in Creative Director scoring: {e}")
+            return self.rank_locally([idea], campaign_brief, objective, target_audience)[0]
+    
     async def evaluate_ideas(
         self,
         ideas: List[CampaignIdeaSchema],
         campaign_brief: str,
         objective: str,
         target_audience: str,
-        threshold: float = 7.0
+        threshold: float = 7.0,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
     ) -> List[CampaignIdeaSchema]:
         """
         Evaluate and score campaign ideas
@@ -33,6 +125,7 @@ class CreativeDirectorAgent:
             objective: Campaign objective
             target_audience: Target audience description
             threshold: Minimum score threshold (default: 7.0)
+            brand_context: Brand profile block placed at the start of the prompt
         
         Returns:
             List of scored and filtered CampaignIdeaSchema objects
@@ -42,7 +135,7 @@ class CreativeDirectorAgent:
             for i, idea in enumerate(ideas)
         ])
         
-        prompt = f"""You are a Creative Director evaluating campaign ideas. Your job is to critically assess each idea and assign a quality score from 1-10.
+        prompt = f"""{brand_context.text_prefix}You are a Creative Director evaluating campaign ideas. Your job is to critically assess each idea and assign a quality score from 1-10.
 
 Campaign Brief: {campaign_brief}
 Objective: {objective}
@@ -73,7 +166,8 @@ Example format:
 Return ONLY the JSON array, no additional text or markdown formatting."""
 
         try:
-            response = self.model.generate_content(prompt)
+            with observe_gemini("creative_director", "evaluate_ideas"):
+                response = await self.model.generate_content_async(prompt)
             response_text = response.text.strip()
             
             # Clean up markdown code blocks if present
@@ -107,15 +201,15 @@ Return ONLY the JSON array, no additional text or markdown formatting."""
             return filtered_ideas
             
         except json.JSONDecodeError as e:
-            print(f"Error parsing Creative Director response: {e}")
-            print(f"Response text: {response_text if 'response_text' in locals() else 'No response'}")
+            logger.warning(f"Error parsing Creative Director response: {e}")
+            logger.debug("Creative Director response text: %s", response_text if 'response_text' in locals() else 'No response')
             # Return ideas with default scores
             for i, idea in enumerate(ideas):
                 idea.score = 8.0 - (i * 0.5)  # Descending scores
                 idea.reasoning = "Default scoring due to evaluation error"
             return sorted(ideas, key=lambda x: x.score, reverse=True)[:3]
         except Exception as e:
-            print(f"Error in Creative Director evaluation: {e}")
+            logger.error(f"Error in Creative Director evaluation: {e}")
             for i, idea in enumerate(ideas):
                 idea.score = 8.0 - (i * 0.5)
                 idea.reasoning = "Default scoring due to evaluation error"
@@ -1,13 +1,21 @@
 import json
-from typing import List
-import google.generativeai as genai
+import logging
+from typing import TYPE_CHECKING, List
 from app.schemas.campaign import CampaignIdeaSchema
+from app.core.metrics import observe_gemini
+from app.services.brand_context import NO_BRAND_CONTEXT, BrandContext
+from app.services.agent.json_output import parse_json_output
+
+if TYPE_CHECKING:  # the SDK is imported when CampaignService is built
+    import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
 
 
 class CreativeTeamAgent:
     """Creative Team Agent: Generates diverse and creative campaign ideas"""
     
-    def __init__(self, model: genai.GenerativeModel):
+    def __init__(self, model: "genai.GenerativeModel"):
         """
         Initialize the Creative Team Agent
         
@@ -21,7 +29,8 @@ class CreativeTeamAgent:
         campaign_brief: str,
         objective: str,
         target_audience: str,
-        ad_formats: List[str]
+        ad_formats: List[str],
+        brand_context: BrandContext = NO_BRAND_CONTEXT
     ) -> List[CampaignIdeaSchema]:
         """
         Generate 10 creative campaign ideas
@@ -31,11 +40,12 @@ class CreativeTeamAgent:
             objective: Campaign objective (Awareness, Sales, Launch)
             target_audience: Target audience description
             ad_formats: List of ad formats (Instagram Post, Story, Poster)
+            brand_context: Brand profile block placed at the start of the prompt
         
         Returns:
             List of CampaignIdeaSchema objects with title and description
         """
-        prompt = f"""You are a Creative Team working on an advertising campaign. Your job is to generate 10 diverse and creative campaign ideas.
+        prompt = f"""{brand_context.text_prefix}You are a Creative Team working on an advertising campaign. Your job is to generate 10 diverse and creative campaign ideas.
 
 Campaign Brief: {campaign_brief}
 Objective: {objective}
@@ -57,7 +67,8 @@ Example format:
 Return ONLY the JSON array, no additional text or markdown formatting."""
 
         try:
-            response = self.model.generate_content(prompt)
+            with observe_gemini("creative_team", "generate_ideas"):
+                response = await self.model.generate_content_async(prompt)
             response_text = response.text.strip()
             
             # Clean up markdown code blocks if present
@@ -82,14 +93,70 @@ Return ONLY the JSON array, no additional text or markdown formatting."""
             return ideas
             
         except json.JSONDecodeError as e:
-            print(f"Error parsing Creative Team response: {e}")
-            print(f"Response text: {response_text if 'response_text' in locals() else 'No response'}")
+            logger.warning(f"Error parsing Creative Team response: {e}")
+            logger.debug("Creative Team response text: %s", response_text if 'response_text' in locals() else 'No response')
             # Return default ideas if parsing fails
             return self._get_default_ideas()
         except Exception as e:
-            print(f"Error in Creative Team generation: {e}")
+            logger.error(f"Error in Creative Team generation: {e}")
             return self._get_default_ideas()
     
+    async def regenerate_idea(
+        self,
+        campaign_brief: str,
+        objective: str,
+        target_audience: str,
+        ad_formats: List[str],
+        replaced_idea: CampaignIdeaSchema,
+        kept_ideas: List[CampaignIdeaSchema],
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> CampaignIdeaSchema:
+        """
+        Generate one idea to replace an idea the user rejected
+        
+        Args:
+            campaign_brief: The campaign brief
+            objective: Campaign objective
+            target_audience: Target audience description
+            ad_formats: List of ad formats
+            replaced_idea: Idea being replaced
+            kept_ideas: Ideas the user keeps (the new one must differ from them)
+            brand_context: Brand profile block placed at the start of the prompt
+        
+        Returns:
+            New unscored idea
+        
+        Raises:
+            ValueError: The model's reply could not be parsed
+        """
+        kept_titles = "\n".join(f"- {idea.title}" for idea in kept_ideas) or "- (none)"
+        prompt = f"""{brand_context.text_prefix}You are a Creative Team working on an advertising campaign. Replace one campaign idea the client rejected with a new one.
+
+Campaign Brief: {campaign_brief}
+Objective: {objective}
+Target Audience: {target_audience}
+Ad Formats: {', '.join(ad_formats)}
+
+Rejected idea: {replaced_idea.title}
+Ideas the client keeps (the new idea must be clearly different from all of these):
+{kept_titles}
+
+Return ONLY a valid JSON object with:
+- "title": A catchy campaign title (max 60 characters)
+- "description": A detailed description of the campaign concept (max 200 characters)"""
+
+        with observe_gemini("creative_team", "regenerate_idea"):
+            response = await self.model.generate_content_async(prompt)
+        idea = parse_json_output(response.text)
+        if not isinstance(idea, dict) or not idea.get("title"):
+            raise ValueError("Creative Team returned no idea")
+        return CampaignIdeaSchema(
+            title=idea["title"],
+            description=idea.get("description", "No description provided"),
+            score=0.0,  # Score will be assigned by Creative Director
+            reasoning=None
+        )
+    
     def _get_default_ideas(self) -> List[CampaignIdeaSchema]:
         """Return default campaign ideas if generation fails"""
         return [
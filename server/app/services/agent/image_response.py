@@ -0,0 +1,86 @@
+"""
+Image extraction from Gemini generate_content responses.
+
+The SDK returns `GenerateContentResponse` wrapping a proto-plus message:
+candidates[].content.parts[].inline_data is a Blob whose `data` field is
+already raw bytes. Reading the underlying protobuf directly avoids the
+proto-plus marshalling layer; REST-style dict responses carry base64 text
+and are decoded exactly once.
+"""
+import binascii
+from typing import Any, Mapping, NamedTuple, Optional
+
+DEFAULT_IMAGE_MIME_TYPE = "image/png"
+
+# MIME type -> file extension for generated images
+IMAGE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/webp": ".webp",
+}
+
+
+class InlineImage(NamedTuple):
+    """Image bytes returned inline by the model"""
+    data: bytes
+    mime_type: str
+
+    @property
+    def extension(self) -> str:
+        return IMAGE_EXTENSIONS.get(self.mime_type.lower(), ".png")
+
+
+def _protobuf(message: Any) -> Any:
+    """Underlying protobuf of a proto-plus message (or the object itself)"""
+    to_pb = getattr(type(message), "pb", None)
+    if to_pb is None:
+        return message
+    try:
+        return to_pb(message)
+    except TypeError:
+        return message
+
+
+def _from_mapping(response: Mapping) -> Optional[InlineImage]:
+    for candidate in response.get("candidates") or ():
+        for part in (candidate.get("content") or {}).get("parts") or ():
+            blob = part.get("inline_data") or part.get("inlineData")
+            if blob and blob.get("data"):
+                data = blob["data"]
+                if isinstance(data, str):
+                    data = binascii.a2b_base64(data)
+                mime_type = blob.get("mime_type") or blob.get("mimeType") or DEFAULT_IMAGE_MIME_TYPE
+                return InlineImage(data, mime_type)
+    return None
+
+
+def extract_inline_image(response: Any) -> Optional[InlineImage]:
+    """
+    Return the first inline image in a generate_content response.
+
+    Args:
+        response: SDK GenerateContentResponse, a proto message or a REST-style dict
+
+    Returns:
+        InlineImage, or None if no candidate contains image data
+    """
+    if isinstance(response, Mapping):
+        return _from_mapping(response)
+
+    # GenerateContentResponse keeps the proto-plus result in `_result`
+    message = _protobuf(getattr(response, "_result", response))
+    for candidate in getattr(message, "candidates", None) or ():
+        for part in candidate.content.parts:
+            blob = part.inline_data
+            if blob.data:
+                return InlineImage(blob.data, blob.mime_type or DEFAULT_IMAGE_MIME_TYPE)
+    return None
+
+
+def response_text(response: Any, limit: int = 150) -> str:
+    """Leading text of the response, which usually explains a missing image"""
+    try:
+        return (response.text or "")[:limit]
+    except (ValueError, AttributeError):
+        return ""
@@ -0,0 +1,14 @@
+"""Parsing of the JSON the agents ask Gemini to return."""
+import json
+from typing import Any
+
+
+def parse_json_output(response_text: str) -> Any:
+    """Parse a JSON reply, tolerating a surrounding markdown code block"""
+    response_text = response_text.strip()
+    if response_text.startswith("```"):
+        response_text = response_text.split("```")[1]
+        if response_text.startswith("json"):
+            response_text = response_text[4:]
+        response_text = response_text.strip()
+    return json.loads(response_text)
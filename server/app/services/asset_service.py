@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from fastapi import UploadFile
+from app.core.config import settings
+from app.core.storage import StorageBackend, key_from_url
+from app.repositories.asset_repository import AssetRepository
+from app.utils.uploads import StoredUpload, stream_upload, store_precompressed_variants
+
+logger = logging.getLogger(__name__)
+
+# A collection claim older than this belongs to a collector that died midway
+GC_CLAIM_TIMEOUT = timedelta(hours=1)
+
+
+def onboarding_ref(user_id: str, field: str) -> str:
+    """Reference id for a file used by a user's onboarding document"""
+    return f"onboarding:{user_id}:{field}"
+
+
+def campaign_ref(campaign_id: str, field: str) -> str:
+    """Reference id for a file used by a campaign document"""
+    return f"campaign:{campaign_id}:{field}"
+
+
+class AssetService:
+    """Service for content-addressed files, their references and garbage collection"""
+    
+    def __init__(self, asset_repository: AssetRepository, storage: StorageBackend):
+        self.asset_repository = asset_repository
+        self.storage = storage
+    
+    async def store_upload(
+        self,
+        file: UploadFile,
+        allowed_extensions: Iterable[str],
+        max_size: int
+    ) -> StoredUpload:
+        """Stream an upload into content-addressed storage and record it"""
+        stored = await stream_upload(
+            file,
+            storage=self.storage,
+            allowed_extensions=allowed_extensions,
+            max_size=max_size
+        )
+        await self.asset_repository.register(
+            stored.key,
+            sha256=stored.sha256,
+            size=stored.size,
+            content_type=stored.content_type
+        )
+        await store_precompressed_variants(self.storage, stored)
+        return stored
+    
+    async def replace_reference(self, ref: str, old_url: Optional[str], new_url: Optional[str]) -> None:
+        """
+        Point a document reference at a new file.
+        
+        Args:
+            ref: Reference id (see onboarding_ref / campaign_ref)
+            old_url: URL the document used before (released)
+            new_url: URL the document uses now (retained)
+        """
+        if old_url == new_url:
+            return
+        new_key = key_from_url(new_url)
+        if new_key:
+            await self.asset_repository.add_reference(new_key, ref)
+        old_key = key_from_url(old_url)
+        if old_key:
+            await self.asset_repository.remove_reference(old_key, ref)
+    
+    async def collect_garbage(self, grace_days: Optional[int] = None) -> int:
+        """
+        Delete files that have had no references for grace_days.
+        
+        Each asset is claimed first, its files are deleted and the record goes
+        last, only if the claim still holds. An identical upload or a new
+        reference in the meantime clears the claim, so its record is kept.
+        Derived files (image variants, .gz/.br) are named after the key and go
+        with it.
+        
+        Returns:
+            Number of assets deleted
+        """
+        grace_days = settings.ASSET_GC_GRACE_DAYS if grace_days is None else grace_days
+        now = datetime.utcnow()
+        cutoff = now - timedelta(days=grace_days)
+        deleted = 0
+        
+        for asset in await self.asset_repository.find_orphans(cutoff):
+            claimed_at = await self.asset_repository.claim_orphan(asset.id, cutoff, now - GC_CLAIM_TIMEOUT)
+            if claimed_at is None:
+                continue
+            # <key>, <key>.gz/.br and <stem>_<variant>.<ext>
+            stem = os.path.splitext(asset.id)[0]
+            for prefix in (asset.id, f"{stem}_"):
+                async for key in self.storage.list_keys(prefix=prefix):
+                    await self.storage.delete(key)
+            if not await self.asset_repository.delete_if_claimed(asset.id, claimed_at):
+                # Revived while its files were being deleted; the record stays
+                if not await self.storage.exists(asset.id):
+                    logger.warning(f"Asset GC: {asset.id} was re-registered during collection and its file is gone")
+                continue
+            deleted += 1
+        
+        if deleted:
+            logger.info(f"Asset GC deleted {deleted} unreferenced file(s)")
+        return deleted
+
+async def run_asset_gc_periodically(asset_service: AssetService, interval_seconds: int) -> None:
+    """Background loop that runs asset garbage collection every interval_seconds"""
+    while True:
+        try:
+            await asset_service.collect_garbage()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Asset GC failed: {e}", exc_info=True)
+        await asyncio.sleep(interval_seconds)
@@ -1,4 +1,5 @@
 import os
+import logging
 from datetime import datetime, timedelta
 from typing import Optional
 from app.repositories.user_repository import UserRepository
@@ -13,6 +14,8 @@ from app.core.exceptions import UnauthorizedError, NotFoundError, ValidationErro
 from app.core.config import settings
 from app.utils.email import send_email, FORGOT_PASSWORD
 
+logger = logging.getLogger(__name__)
+
 
 class AuthService:
     """Service for authentication business logic"""
@@ -109,8 +112,7 @@ class AuthService:
             )
         except Exception as e:
             # Log error but don't fail the request
-            # In production, you might want to use a proper logging system
-            print(f"Failed to send password reset email: {str(e)}")
+            logger.error(f"Failed to send password reset email: {str(e)}")
 
         return {"message": "If the email exists, a password reset link has been sent"}
     
@@ -0,0 +1,126 @@
+"""
+Brand context for generation prompts.
+
+The brand profile collected at onboarding is compiled once per user into
+prompt blocks and kept in memory. Every prompt starts with its block, so a
+user's calls share an identical prefix the provider can cache: implicitly
+by prefix, or explicitly as cached content keyed by the fingerprint.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+from app.core.config import settings
+from app.models.onboarding import OnboardingModel
+from app.repositories.onboarding_repository import OnboardingRepository
+
+
+class BrandContext(NamedTuple):
+    """Compiled brand profile of one user"""
+    text: str  # block for copy, ideas and evaluation prompts
+    visual: str  # block for image prompts (no names or typography to render)
+    fingerprint: str  # stable key of the blocks, e.g. for a provider-side context cache
+
+    @property
+    def text_prefix(self) -> str:
+        return f"{self.text}\n\n" if self.text else ""
+
+    @property
+    def visual_prefix(self) -> str:
+        return f"{self.visual}\n\n" if self.visual else ""
+
+
+# Users without a brand profile get unchanged prompts
+NO_BRAND_CONTEXT = BrandContext(text="", visual="", fingerprint="")
+
+
+def compile_brand_context(onboarding: Optional[OnboardingModel]) -> BrandContext:
+    """
+    Build the prompt blocks for a brand profile.
+
+    Args:
+        onboarding: The user's onboarding data, or None if they have none
+
+    Returns:
+        BrandContext (NO_BRAND_CONTEXT without a profile)
+    """
+    if onboarding is None:
+        return NO_BRAND_CONTEXT
+
+    palette = ", ".join(onboarding.color_palette)
+    lines = [
+        "Brand profile (all work must fit this brand):",
+        f"- Brand name: {onboarding.brand_name}",
+        f"- Industry: {onboarding.industry}",
+        f"- Typography: {onboarding.typography}",
+    ]
+    visual_lines = [
+        "Brand visual identity (the image must fit this brand):",
+        f"- Industry: {onboarding.industry}",
+    ]
+    if palette:
+        lines.append(f"- Color palette: {palette}")
+        visual_lines.append(f"- Use the brand color palette: {palette}")
+    if onboarding.logo_position:
+        lines.append(f"- Logo position: {onboarding.logo_position}")
+        visual_lines.append(
+            f"- Keep the {onboarding.logo_position} area uncluttered; the brand logo is placed there "
+            "afterwards (do not draw a logo)"
+        )
+
+    text = "\n".join(lines)
+    visual = "\n".join(visual_lines)
+    fingerprint = hashlib.sha256(f"{text}\0{visual}".encode()).hexdigest()
+    return BrandContext(text=text, visual=visual, fingerprint=fingerprint)
+
+
+class BrandContextCache:
+    """
+    Per-worker LRU cache of compiled brand contexts.
+
+    Entries are dropped when the user's onboarding data is saved in this
+    worker; the TTL bounds how long other workers keep a stale profile.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, BrandContext]]" = OrderedDict()
+        self._invalidations = 0
+
+    async def get(self, user_id: str, onboarding_repository: OnboardingRepository) -> BrandContext:
+        """Cached brand context of a user, compiled from onboarding data on a miss"""
+        entry = self._entries.get(user_id)
+        if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+        invalidations = self._invalidations
+        context = compile_brand_context(await onboarding_repository.get_by_user_id(user_id))
+        if invalidations != self._invalidations:
+            # A profile was saved while we read it; don't cache what may be the old one
+            return context
+        self._entries[user_id] = (time.monotonic(), context)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return context
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget a user's brand context (their onboarding data changed)"""
+        self._invalidations += 1
+        self._entries.pop(user_id, None)
+
+
+_brand_context_cache: Optional[BrandContextCache] = None
+
+
+def get_brand_context_cache() -> BrandContextCache:
+    """Get or create the per-worker brand context cache"""
+    global _brand_context_cache
+    if _brand_context_cache is None:
+        _brand_context_cache = BrandContextCache(
+            ttl_seconds=settings.BRAND_CONTEXT_CACHE_TTL_SECONDS,
+            max_entries=settings.BRAND_CONTEXT_CACHE_SIZE
+        )
+    return _brand_context_cache
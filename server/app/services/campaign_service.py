@@ -1,10 +1,20 @@
+import asyncio
+import logging
 from typing import List, Dict, Any, Optional
-from pathlib import Path
-import google.generativeai as genai
 from app.core.config import settings
+from app.core.deadline import Deadline, record_degraded, run_stage
+from app.core.exceptions import DeadlineExceededError
+from app.core.storage import get_storage
+from app.services.image_derivative_service import get_image_derivative_service
 from app.schemas.campaign import CampaignIdeaSchema, AdCopySchema
 from app.services.agent import CreativeTeamAgent, CreativeDirectorAgent
 from app.services.agent.ad_copy_visual_agent import AdCopyVisualAgent
+from app.services.brand_context import NO_BRAND_CONTEXT, BrandContext
+
+logger = logging.getLogger(__name__)
+
+# Share of the remaining budget for the Creative Team; the Creative Director gets the rest
+IDEAS_BUDGET_SHARE = 0.6
 
 
 class CampaignService:
@@ -16,6 +26,10 @@ class CampaignService:
         if not api_key:
             raise ValueError("GEMINI_API_KEY not found in environment variables. Please add it to your .env file.")
         
+        # Imported here so processes that never generate (CLIs, auth-only use) skip the SDK
+        import google.generativeai as genai
+        self._genai = genai
+        
         genai.configure(api_key=api_key)
         self.text_model_name = "gemini-flash-latest"
         self.image_model_name = "gemini-2.5-flash-image"  # Model for image generation
@@ -28,53 +42,117 @@ class CampaignService:
         # Initialize image model for ad copy generation
         try:
             image_model = genai.GenerativeModel(self.image_model_name)
-            print(f"Successfully initialized image model: {self.image_model_name}")
+            logger.info(f"Initialized image model: {self.image_model_name}")
         except Exception as e:
-            print(f"Warning: Could not initialize image model {self.image_model_name}: {e}")
-            print("Falling back to text model for image generation")
+            logger.warning(f"Could not initialize image model {self.image_model_name}, falling back to text model: {e}")
             image_model = text_model
         
-        # Initialize upload directory
-        upload_dir = Path(settings.UPLOAD_DIR)
-        self.ad_copy_visual_agent = AdCopyVisualAgent(text_model, image_model, upload_dir)
+        # Generated images go to the configured storage backend
+        self.ad_copy_visual_agent = AdCopyVisualAgent(text_model, image_model, get_storage())
     
-    async def generate_campaign_ideas(
+    async def warm_up(self, timeout: float) -> bool:
+        """
+        Open the connection to the Gemini API before the first request needs it
+        
+        Args:
+            timeout: Seconds to wait for the metadata call
+        
+        Returns:
+            True if the API answered in time
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.to_thread(self._genai.get_model, f"models/{self.text_model_name}"),
+                timeout=timeout
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Gemini warmup failed: {e}")
+            return False
+    
+    async def generate_idea_drafts(
         self,
         campaign_brief: str,
         objective: str,
         target_audience: str,
         ad_formats: List[str],
-        threshold: float = 7.0
-    ) -> Dict[str, Any]:
+        deadline: Optional[Deadline] = None,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> List[CampaignIdeaSchema]:
         """
-        Generate campaign ideas using multi-agent system
+        Step 1: Creative Team generates 10 unscored campaign ideas
         
         Args:
             campaign_brief: The campaign brief
-            objective: Campaign objective (Awareness, Sales, Launch)
+            objective: Campaign objective
             target_audience: Target audience description
-            ad_formats: List of ad formats (Instagram Post, Story, Poster)
-            threshold: Minimum score threshold (default: 7.0)
+            ad_formats: List of ad formats
+            deadline: Request deadline
+            brand_context: The user's compiled brand profile
         
         Returns:
-            Dictionary with all_ideas and top_ideas
+            Ideas with score 0
         """
-        # Step 1: Creative Team generates 10 campaign ideas
-        all_ideas = await self.creative_team_agent.generate_ideas(
-            campaign_brief=campaign_brief,
-            objective=objective,
-            target_audience=target_audience,
-            ad_formats=ad_formats
-        )
+        try:
+            return await run_stage(
+                self.creative_team_agent.generate_ideas(
+                    campaign_brief=campaign_brief,
+                    objective=objective,
+                    target_audience=target_audience,
+                    ad_formats=ad_formats,
+                    brand_context=brand_context
+                ),
+                deadline,
+                IDEAS_BUDGET_SHARE
+            )
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError("Idea generation timed out")
+    
+    async def evaluate_ideas(
+        self,
+        all_ideas: List[CampaignIdeaSchema],
+        campaign_brief: str,
+        objective: str,
+        target_audience: str,
+        threshold: float = 7.0,
+        deadline: Optional[Deadline] = None,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> Dict[str, Any]:
+        """
+        Step 2: Creative Director scores the ideas and picks the top ones
         
-        # Step 2: Creative Director evaluates and filters ideas
-        top_ideas = await self.creative_director_agent.evaluate_ideas(
-            ideas=all_ideas,
-            campaign_brief=campaign_brief,
-            objective=objective,
-            target_audience=target_audience,
-            threshold=threshold
-        )
+        Args:
+            all_ideas: Ideas from generate_idea_drafts (scored in place)
+            campaign_brief: The campaign brief
+            objective: Campaign objective
+            target_audience: Target audience description
+            threshold: Minimum score threshold
+            deadline: Request deadline; without time left the ideas are ranked locally
+            brand_context: The user's compiled brand profile
+        
+        Returns:
+            Dictionary with all_ideas, top_ideas and degraded
+        """
+        degraded = []
+        try:
+            top_ideas = await run_stage(
+                self.creative_director_agent.evaluate_ideas(
+                    ideas=all_ideas,
+                    campaign_brief=campaign_brief,
+                    objective=objective,
+                    target_audience=target_audience,
+                    threshold=threshold,
+                    brand_context=brand_context
+                ),
+                deadline
+            )
+        except asyncio.TimeoutError:
+            logger.warning("No time left for the Creative Director; ranking ideas locally")
+            record_degraded("director")
+            degraded.append("director")
+            top_ideas = CreativeDirectorAgent.rank_locally(
+                all_ideas, campaign_brief, objective, target_audience
+            )
         
         # Ensure we always have at least some ideas
         if not top_ideas or len(top_ideas) == 0:
@@ -83,49 +161,238 @@ class CampaignService:
         
         return {
             "all_ideas": all_ideas if all_ideas else [],
-            "top_ideas": top_ideas[:3] if top_ideas else []  # Return top 3 ideas
+            "top_ideas": top_ideas[:3] if top_ideas else [],  # Return top 3 ideas
+            "degraded": degraded
         }
     
-    async def generate_ad_copy_and_visual(
+    async def regenerate_idea(
         self,
+        replaced_idea: CampaignIdeaSchema,
+        kept_ideas: List[CampaignIdeaSchema],
         campaign_brief: str,
         objective: str,
         target_audience: str,
-        selected_idea_title: str,
-        selected_idea_description: str,
-        ad_formats: List[str]
-    ) -> Dict[str, Any]:
+        ad_formats: List[str],
+        deadline: Optional[Deadline] = None,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> CampaignIdeaSchema:
         """
-        Generate ad copy and visual direction with image
+        Replace one idea: the Creative Team writes it, the Creative Director scores only it
         
         Args:
+            replaced_idea: Idea the user rejected
+            kept_ideas: Ideas the user keeps
             campaign_brief: The campaign brief
             objective: Campaign objective
             target_audience: Target audience description
-            selected_idea_title: Title of selected campaign idea
-            selected_idea_description: Description of selected campaign idea
-            ad_formats: List of ad formats needed
+            ad_formats: List of ad formats
+            deadline: Request deadline; without time left for scoring the idea
+                is ranked locally
+            brand_context: The user's compiled brand profile
         
         Returns:
-            Dictionary with headline, body, call_to_action, visual_direction, and image_url
+            The new, scored idea
         """
-        result = await self.ad_copy_visual_agent.generate_ad_copy_and_image(
+        try:
+            idea = await run_stage(
+                self.creative_team_agent.regenerate_idea(
+                    campaign_brief=campaign_brief,
+                    objective=objective,
+                    target_audience=target_audience,
+                    ad_formats=ad_formats,
+                    replaced_idea=replaced_idea,
+                    kept_ideas=kept_ideas,
+                    brand_context=brand_context
+                ),
+                deadline,
+                IDEAS_BUDGET_SHARE
+            )
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError("Idea generation timed out")
+        
+        try:
+            return await run_stage(
+                self.creative_director_agent.score_idea(
+                    idea, campaign_brief, objective, target_audience, brand_context=brand_context
+                ),
+                deadline
+            )
+        except asyncio.TimeoutError:
+            record_degraded("director")
+            return CreativeDirectorAgent.rank_locally([idea], campaign_brief, objective, target_audience)[0]
+    
+    async def regenerate_ad_copy_field(
+        self,
+        field: str,
+        ad_copy: Dict[str, str],
+        campaign_brief: str,
+        objective: str,
+        target_audience: str,
+        selected_idea_title: str,
+        selected_idea_description: str,
+        deadline: Optional[Deadline] = None,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> str:
+        """
+        Rewrite one ad copy field with the other fields as fixed context
+        
+        Returns:
+            New value for the field
+        """
+        try:
+            return await run_stage(
+                self.ad_copy_visual_agent.regenerate_field(
+                    field=field,
+                    ad_copy=ad_copy,
+                    campaign_brief=campaign_brief,
+                    objective=objective,
+                    target_audience=target_audience,
+                    selected_idea_title=selected_idea_title,
+                    selected_idea_description=selected_idea_description,
+                    brand_context=brand_context
+                ),
+                deadline
+            )
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError(f"Regenerating {field} timed out")
+    
+    async def generate_ad_copy(
+        self,
+        campaign_brief: str,
+        objective: str,
+        target_audience: str,
+        selected_idea_title: str,
+        selected_idea_description: str,
+        ad_formats: List[str],
+        deadline: Optional[Deadline] = None,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> Dict[str, str]:
+        """
+        Generate ad copy and visual direction without the image
+        
+        Returns:
+            Dictionary with headline, body, call_to_action and visual_direction
+        """
+        return await self.ad_copy_visual_agent.generate_ad_copy(
             campaign_brief=campaign_brief,
             objective=objective,
             target_audience=target_audience,
             selected_idea_title=selected_idea_title,
             selected_idea_description=selected_idea_description,
-            ad_formats=ad_formats
+            ad_formats=ad_formats,
+            deadline=deadline,
+            brand_context=brand_context
         )
+    
+    async def generate_ad_copy_variants(
+        self,
+        count: int,
+        campaign_brief: str,
+        objective: str,
+        target_audience: str,
+        selected_idea_title: str,
+        selected_idea_description: str,
+        ad_formats: List[str],
+        deadline: Optional[Deadline] = None,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> List[Dict[str, str]]:
+        """
+        Generate `count` ad copy variants (no images) in one model call
+        
+        Returns:
+            Variants with headline, body, call_to_action and visual_direction
+        """
+        try:
+            return await run_stage(
+                self.ad_copy_visual_agent.generate_ad_copy_variants(
+                    count=count,
+                    campaign_brief=campaign_brief,
+                    objective=objective,
+                    target_audience=target_audience,
+                    selected_idea_title=selected_idea_title,
+                    selected_idea_description=selected_idea_description,
+                    ad_formats=ad_formats,
+                    brand_context=brand_context
+                ),
+                deadline
+            )
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError("Ad copy variant generation timed out")
+    
+    async def localize_ad_copy(
+        self,
+        ad_copy: Dict[str, str],
+        locales: List[str],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        Localize ad copy, LOCALIZATION_CHUNK_SIZE locales per model call
+        
+        Chunks run concurrently; the locales of a failed chunk are left out
+        so the caller can keep what succeeded and retry the rest.
         
+        Args:
+            ad_copy: Source headline, body and call_to_action
+            locales: Locale tags to produce
+            deadline: Request deadline
+        
+        Returns:
+            Locale -> headline, body and call_to_action
+        """
+        chunk_size = settings.LOCALIZATION_CHUNK_SIZE
+        chunks = [locales[start:start + chunk_size] for start in range(0, len(locales), chunk_size)]
+        results = await asyncio.gather(
+            *(run_stage(self.ad_copy_visual_agent.localize_ad_copy(ad_copy, chunk), deadline) for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        localized = {}
+        errors = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Localization failed for {', '.join(chunk)}: {result!r}")
+                errors.append(result)
+            else:
+                localized.update(result)
+        if not localized and errors:
+            if all(isinstance(error, asyncio.TimeoutError) for error in errors):
+                raise DeadlineExceededError("Localization timed out")
+            raise errors[0]
+        return localized
+    
+    async def generate_ad_copy_image(
+        self,
+        ad_copy: Dict[str, str],
+        campaign_brief: str,
+        deadline: Optional[Deadline] = None,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> Dict[str, Any]:
+        """
+        Generate the image and its variants for ad copy from generate_ad_copy
+        
+        Args:
+            ad_copy: Headline, body, call_to_action and visual_direction
+            campaign_brief: The campaign brief
+            deadline: Request deadline; without time left the image is skipped
+            brand_context: The user's compiled brand profile
+        
+        Returns:
+            Dictionary with image_url, image_variants and degraded
+        """
+        result = await self.ad_copy_visual_agent.generate_image_for_ad_copy(
+            ad_copy, campaign_brief, deadline, brand_context
+        )
+        result["image_variants"] = await self.create_image_variants(result.get("image_url"))
         return result
     
     async def generate_image_only(
         self,
         visual_direction: str,
         headline: str,
-        campaign_brief: str
-    ) -> Optional[str]:
+        campaign_brief: str,
+        deadline: Optional[Deadline] = None,
+        brand_context: BrandContext = NO_BRAND_CONTEXT
+    ) -> str:
         """
         Generate image only (without ad copy generation)
         
@@ -133,15 +400,39 @@ class CampaignService:
             visual_direction: Visual direction description
             headline: Campaign headline
             campaign_brief: Campaign brief
+            deadline: Request deadline
+            brand_context: The user's compiled brand profile
         
         Returns:
-            Image URL or None if generation fails
+            Image URL
+        
+        Raises:
+            ImageGenerationError: The model returned no image
         """
-        return await self.ad_copy_visual_agent.generate_image_only(
-            visual_direction=visual_direction,
-            headline=headline,
-            campaign_brief=campaign_brief
-        )
+        try:
+            return await run_stage(
+                self.ad_copy_visual_agent.generate_image_only(
+                    visual_direction=visual_direction,
+                    headline=headline,
+                    campaign_brief=campaign_brief,
+                    brand_context=brand_context
+                ),
+                deadline
+            )
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError("Image generation timed out")
+    
+    async def create_image_variants(self, image_url: Optional[str]) -> Dict[str, str]:
+        """
+        Create thumbnail, medium and WebP/AVIF variants of a generated image
+        
+        Args:
+            image_url: URL of the saved image
+        
+        Returns:
+            Variant key -> URL (empty if there is no image)
+        """
+        return await get_image_derivative_service().create_variants(image_url)
 
 
 # Create singleton instance (lazy initialization)
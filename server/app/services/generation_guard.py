@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel
+from app.core.config import settings
+from app.core.exceptions import AppException, ConflictError, ValidationError
+from app.repositories.generation_lease_repository import GenerationLeaseRepository
+
+logger = logging.getLogger(__name__)
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+# Identifies this worker as a lease owner
+WORKER_TOKEN = uuid.uuid4().hex
+
+
+class _Flight:
+    """A generation run in this worker and the requests waiting on it"""
+    __slots__ = ("fingerprint", "future", "joiners")
+
+    def __init__(self, fingerprint: str, future: asyncio.Future):
+        self.fingerprint = fingerprint
+        self.future = future  # resolves to the JSON result
+        self.joiners = 0
+
+
+# (campaign_id, operation) -> run in progress
+_local_flights: Dict[Tuple[str, str], _Flight] = {}
+
+
+def request_fingerprint(params: Any) -> str:
+    """Stable hash of the request parameters that determine the result"""
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class GenerationFailedError(AppException):
+    """A coalesced generation run failed"""
+    def __init__(self, message: str = "Generation failed"):
+        super().__init__(message, status_code=500)
+
+
+class GenerationGuard:
+    """
+    Single-flight and idempotency for generation operations.
+
+    Only one run per (campaign_id, operation) happens at a time: duplicates
+    in this worker await the same future, duplicates in other workers poll
+    the Mongo lease document and return its result. Responses are stored
+    per Idempotency-Key so client retries replay them.
+    """
+
+    def __init__(self, lease_repository: GenerationLeaseRepository):
+        self.lease_repository = lease_repository
+        self.lease_ttl = settings.GENERATION_LEASE_TTL_SECONDS
+        self.poll_interval = settings.GENERATION_LEASE_POLL_INTERVAL
+    
+    @staticmethod
+    def has_joiners(campaign_id: str, operation: str) -> bool:
+        """Whether other requests in this worker are waiting on the running operation"""
+        flight = _local_flights.get((campaign_id, operation))
+        return flight is not None and flight.joiners > 0
+
+    async def run(
+        self,
+        campaign_id: str,
+        operation: str,
+        produce: Callable[[], Awaitable[ResponseT]],
+        response_model: Type[ResponseT],
+        user_id: str,
+        idempotency_key: Optional[str] = None,
+        params: Any = None
+    ) -> ResponseT:
+        """
+        Run a generation operation at most once at a time per campaign.
+
+        Args:
+            campaign_id: Campaign the operation writes to
+            operation: Operation name, e.g. "generate_ideas"
+            produce: Coroutine function performing the work and returning the response
+            response_model: Response schema, used to rebuild stored results
+            user_id: Requesting user (idempotency keys are scoped per user)
+            idempotency_key: Optional Idempotency-Key header value
+            params: Request parameters; a concurrent duplicate with different
+                parameters is rejected instead of coalesced
+
+        Returns:
+            The response of this run, the in-flight run it joined, or the
+            replayed response for the idempotency key
+        """
+        fingerprint = request_fingerprint(params)
+        record_id = f"{user_id}:{idempotency_key}" if idempotency_key else None
+
+        if record_id:
+            record = await self.lease_repository.get_idempotency_record(record_id)
+            if record:
+                if (record.campaign_id, record.operation, record.fingerprint) != (campaign_id, operation, fingerprint):
+                    raise ValidationError("Idempotency-Key was already used for a different request")
+                return response_model(**record.response)
+
+        flight_key = (campaign_id, operation)
+        in_flight = _local_flights.get(flight_key)
+        if in_flight:
+            return response_model(**await self._join(in_flight, fingerprint, operation))
+
+        future = asyncio.get_running_loop().create_future()
+        _local_flights[flight_key] = _Flight(fingerprint, future)
+        try:
+            result = await self._run_leased(f"{campaign_id}:{operation}", fingerprint, operation, produce)
+            future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody joined this flight
+            future.exception()
+            raise
+        finally:
+            _local_flights.pop(flight_key, None)
+
+        if record_id:
+            await self.lease_repository.save_idempotency_record({
+                "_id": record_id,
+                "campaign_id": campaign_id,
+                "operation": operation,
+                "fingerprint": fingerprint,
+                "response": result,
+                "created_at": datetime.utcnow()
+            })
+        return response_model(**result)
+
+    @staticmethod
+    async def _join(flight: _Flight, fingerprint: str, operation: str) -> dict:
+        if flight.fingerprint != fingerprint:
+            raise ConflictError(f"Another {operation} request for this campaign is in progress")
+        flight.joiners += 1
+        try:
+            # Shield: a disconnecting duplicate must not cancel the original run
+            return await asyncio.shield(flight.future)
+        except asyncio.CancelledError:
+            if flight.future.cancelled():
+                raise GenerationFailedError(f"Concurrent {operation} request was cancelled")
+            raise
+        finally:
+            flight.joiners -= 1
+
+    async def _run_leased(
+        self,
+        lease_id: str,
+        fingerprint: str,
+        operation: str,
+        produce: Callable[[], Awaitable[BaseModel]]
+    ) -> dict:
+        while not await self.lease_repository.acquire(lease_id, WORKER_TOKEN, fingerprint, self.lease_ttl):
+            result = await self._wait_for_remote(lease_id, fingerprint, operation)
+            if result is not None:
+                return result
+            # The holder's lease expired without a result: take over
+
+        renewer = asyncio.create_task(self._renew(lease_id))
+        try:
+            response = await produce()
+            result = response.model_dump(mode="json")
+        except asyncio.CancelledError:
+            renewer.cancel()
+            # Cancelled (client went away), not failed: let a waiting worker run it
+            await self.lease_repository.release(lease_id, WORKER_TOKEN)
+            raise
+        except BaseException as e:
+            renewer.cancel()
+            error = getattr(e, "detail", None) or str(e) or type(e).__name__
+            await self.lease_repository.fail(lease_id, WORKER_TOKEN, str(error))
+            raise
+        renewer.cancel()
+        await self.lease_repository.complete(lease_id, WORKER_TOKEN, result)
+        return result
+
+    async def _wait_for_remote(self, lease_id: str, fingerprint: str, operation: str) -> Optional[dict]:
+        """Poll a lease held by another worker; None if it expired and can be taken over"""
+        while True:
+            lease = await self.lease_repository.get(lease_id)
+            if lease is None:
+                return None
+            if lease.status == "running":
+                if lease.fingerprint != fingerprint:
+                    raise ConflictError(f"Another {operation} request for this campaign is in progress")
+                if lease.expires_at and lease.expires_at <= datetime.utcnow():
+                    return None
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if lease.fingerprint != fingerprint:
+                # Finished before we looked; it was a different request, so run ours
+                return None
+            if lease.status == "failed":
+                raise GenerationFailedError(f"Concurrent {operation} request failed: {lease.error}")
+            return lease.result
+
+    async def _renew(self, lease_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            if not await self.lease_repository.renew(lease_id, WORKER_TOKEN, self.lease_ttl):
+                logger.warning(f"Lost generation lease {lease_id}")
+                return
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from app.core.config import settings
+from app.repositories.generation_quota_repository import GenerationQuotaRepository
+from app.services.generation_scheduler import GenerationScheduler, INTERACTIVE, SchedulerTicket
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationQuota:
+    """
+    Per-user concurrent generation limit across all workers.
+
+    The in-worker scheduler only sees its own requests, so with N workers a
+    user could run N times their plan's max_in_flight. Each generation first
+    takes one of the user's slots in MongoDB (renewed while it runs, expiring
+    if its worker dies), then a slot in this worker's scheduler.
+    """
+
+    def __init__(self, repository: GenerationQuotaRepository, scheduler: GenerationScheduler):
+        self.repository = repository
+        self.scheduler = scheduler
+        self.ttl_seconds = settings.GENERATION_LEASE_TTL_SECONDS
+        self.poll_interval = settings.GENERATION_LEASE_POLL_INTERVAL
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        user_id: str,
+        plan: Optional[str] = None,
+        priority: str = INTERACTIVE,
+        cost: float = 1.0
+    ) -> AsyncIterator[SchedulerTicket]:
+        """
+        Hold a user slot and a scheduler slot for the duration of the block.
+
+        Args:
+            user_id: User the work is for
+            plan: User's plan (its max_in_flight is the limit)
+            priority: Scheduler lane
+            cost: Relative cost of the work
+
+        Yields:
+            The scheduler's ticket, with the time spent waiting for either slot
+        """
+        arrived = time.monotonic()
+        token = uuid.uuid4().hex
+        limit = self.scheduler.max_in_flight(plan)
+        while not await self.repository.acquire(user_id, token, limit, self.ttl_seconds):
+            await asyncio.sleep(self.poll_interval)
+
+        renewer = asyncio.create_task(self._renew(user_id, token))
+        try:
+            async with self.scheduler.slot(user_id, plan, priority, cost) as ticket:
+                yield ticket._replace(waited_seconds=round(time.monotonic() - arrived, 3))
+        finally:
+            renewer.cancel()
+            await self.repository.release(user_id, token)
+
+    async def _renew(self, user_id: str, token: str) -> None:
+        while True:
+            await asyncio.sleep(self.ttl_seconds / 3)
+            if not await self.repository.renew(user_id, token, self.ttl_seconds):
+                logger.warning(f"Lost generation slot of user {user_id}")
+                return
@@ -0,0 +1,203 @@
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import GENERATION_IN_FLIGHT, GENERATION_QUEUE_DEPTH, GENERATION_QUEUE_WAIT
+
+# Lanes in dispatch order: interactive requests always go before batch work
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)
+
+
+class SchedulerTicket(NamedTuple):
+    """Where a request stood in the queue and how long it waited"""
+    position: int  # 0 when it started immediately
+    waited_seconds: float
+
+
+class _UserState:
+    __slots__ = ("in_flight", "max_in_flight", "last_tag", "waiting")
+
+    def __init__(self, max_in_flight: int):
+        self.in_flight = 0
+        self.max_in_flight = max_in_flight
+        self.last_tag = 0.0
+        self.waiting = 0
+
+
+class _Waiter:
+    __slots__ = ("user_id", "lane", "start_tag", "finish_tag", "seq", "future")
+
+    def __init__(self, user_id: str, lane: int, start_tag: float, finish_tag: float, seq: int, future: asyncio.Future):
+        self.user_id = user_id
+        self.lane = lane
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.seq = seq
+        self.future = future
+
+    @property
+    def order(self) -> Tuple[int, float, int]:
+        return self.lane, self.finish_tag, self.seq
+
+
+class GenerationScheduler:
+    """
+    Fair scheduler for Gemini generation work in this worker.
+
+    At most `capacity` generations run at once and each user at most their
+    plan's max_in_flight (GenerationQuota applies that limit across
+    workers). Waiting requests are dispatched by lane first, then by
+    weighted fair queuing: each request gets a virtual finish tag of
+    max(virtual time, the user's previous tag) + cost / weight, so a user
+    with many queued requests is interleaved with everyone else instead of
+    running them back to back.
+    """
+
+    def __init__(self, capacity: int, plan_limits: Dict[str, Dict[str, float]], default_plan: str):
+        self.capacity = capacity
+        self.plan_limits = plan_limits
+        self.default_plan = default_plan
+        self.in_flight = 0
+        self._virtual_time = 0.0
+        self._users: Dict[str, _UserState] = {}
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting for a slot"""
+        return len(self._waiting)
+
+    def _limits(self, plan: Optional[str]) -> Tuple[int, float]:
+        limits = self.plan_limits.get(plan or self.default_plan) or self.plan_limits.get(self.default_plan) or {}
+        return int(limits.get("max_in_flight", 1)), float(limits.get("weight", 1)) or 1.0
+
+    def max_in_flight(self, plan: Optional[str]) -> int:
+        """Generations a user on this plan may run at once"""
+        return self._limits(plan)[0]
+
+    def _can_start(self, user: _UserState) -> bool:
+        return self.in_flight < self.capacity and user.in_flight < user.max_in_flight
+
+    def _start(self, user: _UserState) -> None:
+        self.in_flight += 1
+        user.in_flight += 1
+        GENERATION_IN_FLIGHT.set(self.in_flight)
+
+    def _position(self, waiter: _Waiter) -> int:
+        return 1 + sum(1 for other in self._waiting if other.order < waiter.order)
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.capacity:
+            # Requests cancelled while queued give up their place
+            for waiter in [waiter for waiter in self._waiting if waiter.future.done()]:
+                self._remove(waiter)
+            eligible = [
+                waiter for waiter in self._waiting
+                if self._users[waiter.user_id].in_flight < self._users[waiter.user_id].max_in_flight
+            ]
+            if not eligible:
+                break
+            waiter = min(eligible, key=lambda candidate: candidate.order)
+            self._remove(waiter)
+            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+            self._start(self._users[waiter.user_id])
+            waiter.future.set_result(None)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        self._waiting.remove(waiter)
+        self._users[waiter.user_id].waiting -= 1
+        GENERATION_QUEUE_DEPTH.set(len(self._waiting))
+
+    def _release(self, user_id: str) -> None:
+        user = self._users[user_id]
+        self.in_flight -= 1
+        user.in_flight -= 1
+        GENERATION_IN_FLIGHT.set(self.in_flight)
+        if user.in_flight == 0 and user.waiting == 0:
+            # Idle users restart from the current virtual time anyway
+            del self._users[user_id]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        user_id: str,
+        plan: Optional[str] = None,
+        priority: str = INTERACTIVE,
+        cost: float = 1.0
+    ) -> AsyncIterator[SchedulerTicket]:
+        """
+        Hold a generation slot for the duration of the block.
+
+        Args:
+            user_id: User the work is for
+            plan: User's plan (limits come from settings.GENERATION_PLAN_LIMITS)
+            priority: INTERACTIVE or BATCH
+            cost: Relative cost of the work (e.g. 2 for ad copy plus image)
+
+        Yields:
+            SchedulerTicket with the queue position on arrival and time waited
+        """
+        max_in_flight, weight = self._limits(plan)
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = _UserState(max_in_flight)
+        user.max_in_flight = max_in_flight
+
+        start_tag = max(self._virtual_time, user.last_tag)
+        finish_tag = start_tag + cost / weight
+        user.last_tag = finish_tag
+
+        arrived = time.monotonic()
+        position = 0
+        if not self._waiting and self._can_start(user):
+            self._start(user)
+        else:
+            lane = LANES.index(priority) if priority in LANES else 0
+            waiter = _Waiter(
+                user_id, lane, start_tag, finish_tag, next(self._seq),
+                asyncio.get_running_loop().create_future()
+            )
+            self._waiting.append(waiter)
+            user.waiting += 1
+            GENERATION_QUEUE_DEPTH.set(len(self._waiting))
+            position = self._position(waiter)
+            self._dispatch()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # Slot was granted just as we were cancelled: hand it back
+                    self._release(user_id)
+                else:
+                    if waiter in self._waiting:
+                        self._remove(waiter)
+                    if user.in_flight == 0 and user.waiting == 0:
+                        self._users.pop(user_id, None)
+                raise
+            GENERATION_QUEUE_WAIT.observe(time.monotonic() - arrived)
+
+        try:
+            yield SchedulerTicket(position=position, waited_seconds=round(time.monotonic() - arrived, 3))
+        finally:
+            self._release(user_id)
+
+
+_generation_scheduler: Optional[GenerationScheduler] = None
+
+
+def get_generation_scheduler() -> GenerationScheduler:
+    """Get or create the per-worker generation scheduler"""
+    global _generation_scheduler
+    if _generation_scheduler is None:
+        _generation_scheduler = GenerationScheduler(
+            capacity=settings.GENERATION_MAX_CONCURRENCY,
+            plan_limits=settings.GENERATION_PLAN_LIMITS,
+            default_plan=settings.DEFAULT_PLAN
+        )
+    return _generation_scheduler
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.storage import StorageBackend, key_from_url, url_for_key
+from app.utils.image_processing import render_derivatives
+
+logger = logging.getLogger(__name__)
+
+# Formats Pillow can decode; SVG logos are served as-is
+RASTER_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+
+
+class ImageDerivativeService:
+    """Builds thumbnail/medium/WebP/AVIF variants of stored images in a process pool"""
+
+    def __init__(self, storage: StorageBackend, max_workers: int):
+        self.storage = storage
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and driver threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def create_variants(self, image_url: Optional[str]) -> Dict[str, str]:
+        """
+        Create derivatives for a stored image and save them next to the original.
+
+        Args:
+            image_url: /uploads/ URL of the original image
+
+        Returns:
+            Variant key (e.g. "thumbnail_webp") -> URL; empty if the image
+            can't be processed
+        """
+        key = key_from_url(image_url)
+        if not key or os.path.splitext(key)[1].lower() not in RASTER_EXTENSIONS:
+            return {}
+
+        sizes = {
+            "thumbnail": settings.IMAGE_THUMBNAIL_SIZE,
+            "medium": settings.IMAGE_MEDIUM_SIZE,
+            "full": 0,
+        }
+        try:
+            data = b"".join([chunk async for chunk in self.storage.get_stream(key)])
+            loop = asyncio.get_running_loop()
+            rendered = await loop.run_in_executor(
+                self.executor, render_derivatives, data, sizes, settings.IMAGE_VARIANT_QUALITY
+            )
+        except Exception as e:
+            logger.warning(f"Failed to create image variants for {key}: {e}")
+            return {}
+
+        stem = os.path.splitext(key)[0]
+        variants = {}
+        for variant_key, (extension, body, content_type) in rendered.items():
+            name = variant_key.rsplit("_", 1)[0]
+            variant_storage_key = f"{stem}_{name}.{extension}"
+            await self.storage.put_bytes(variant_storage_key, body, content_type=content_type)
+            variants[variant_key] = url_for_key(variant_storage_key)
+        return variants
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Create singleton instance (lazy initialization)
+_image_derivative_service_instance: Optional[ImageDerivativeService] = None
+
+
+def get_image_derivative_service() -> ImageDerivativeService:
+    """Get or create image derivative service singleton"""
+    global _image_derivative_service_instance
+    if _image_derivative_service_instance is None:
+        from app.core.storage import get_storage
+        _image_derivative_service_instance = ImageDerivativeService(
+            get_storage(), settings.IMAGE_DERIVATIVE_WORKERS
+        )
+    return _image_derivative_service_instance
+
+
+def shutdown_image_derivative_service() -> None:
+    """Shut down the worker pool if it was started"""
+    if _image_derivative_service_instance is not None:
+        _image_derivative_service_instance.shutdown()
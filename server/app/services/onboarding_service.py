@@ -1,72 +1,50 @@
 from typing import Optional
 import os
 import shutil
-from pathlib import Path
 from fastapi import UploadFile
 from bson import ObjectId
 from app.repositories.onboarding_repository import OnboardingRepository
 from app.schemas.onboarding import OnboardingRequest
 from app.core.config import settings
-from app.core.exceptions import ValidationError
+from app.services.asset_service import AssetService, onboarding_ref
+from app.services.brand_context import get_brand_context_cache
+from app.services.image_derivative_service import get_image_derivative_service
+from app.utils.etag import document_etag
 from datetime import datetime
-import uuid
+
+ALLOWED_FONT_EXTENSIONS = ['.woff', '.woff2', '.ttf', '.otf']
 
 
 class OnboardingService:
     """Service for onboarding business logic"""
     
-    def __init__(self, onboarding_repository: OnboardingRepository):
+    def __init__(self, onboarding_repository: OnboardingRepository, asset_service: AssetService):
         self.onboarding_repository = onboarding_repository
-        self.upload_dir = Path(settings.UPLOAD_DIR)
-        self.upload_dir.mkdir(exist_ok=True)
+        self.asset_service = asset_service
     
     async def save_logo(self, file: UploadFile, user_id: str) -> str:
         """Save uploaded logo file"""
-        # Validate file extension
-        file_ext = Path(file.filename).suffix.lower()
-        if file_ext not in settings.ALLOWED_EXTENSIONS:
-            raise ValidationError(f"File type not allowed. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}")
-        
-        # Validate file size
-        file_content = await file.read()
-        if len(file_content) > settings.MAX_UPLOAD_SIZE:
-            raise ValidationError(f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB")
-        
-        # Generate unique filename
-        filename = f"{user_id}_{uuid.uuid4()}{file_ext}"
-        file_path = self.upload_dir / filename
-        
-        # Save file
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        # Type is checked from the file's magic bytes, not its name;
+        # identical files share one content-addressed object
+        stored = await self.asset_service.store_upload(
+            file,
+            allowed_extensions=settings.ALLOWED_EXTENSIONS,
+            max_size=settings.MAX_UPLOAD_SIZE
+        )
         
         # Return relative URL
-        return f"/uploads/{filename}"
+        return stored.url
     
     async def save_font_file(self, file: UploadFile, user_id: str) -> str:
         """Save uploaded font file"""
-        # Validate file extension
-        file_ext = Path(file.filename).suffix.lower()
-        allowed_font_extensions = ['.woff', '.woff2', '.ttf', '.otf']
-        if file_ext not in allowed_font_extensions:
-            raise ValidationError(f"Font file type not allowed. Allowed types: {', '.join(allowed_font_extensions)}")
-        
-        # Validate file size (10MB for fonts)
-        file_content = await file.read()
-        max_font_size = 10 * 1024 * 1024  # 10MB
-        if len(file_content) > max_font_size:
-            raise ValidationError(f"Font file size exceeds maximum allowed size of 10MB")
-        
-        # Generate unique filename
-        filename = f"{user_id}_font_{uuid.uuid4()}{file_ext}"
-        file_path = self.upload_dir / filename
-        
-        # Save file
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        stored = await self.asset_service.store_upload(
+            file,
+            allowed_extensions=ALLOWED_FONT_EXTENSIONS,
+            max_size=settings.MAX_FONT_UPLOAD_SIZE
+        )
         
         # Return relative URL
-        return f"/uploads/{filename}"
+        return stored.url
     
     async def create_or_update_onboarding(
         self,
@@ -77,11 +55,13 @@ class OnboardingService:
     ) -> dict:
         """Create or update onboarding data"""
         logo_url = None
+        logo_variants = None
         font_file_url = None
         
         # Handle logo upload if provided
         if logo_file:
             logo_url = await self.save_logo(logo_file, user_id)
+            logo_variants = await get_image_derivative_service().create_variants(logo_url)
         
         # Handle font file upload if provided
         if font_file:
@@ -110,6 +90,7 @@ class OnboardingService:
         
         if logo_url:
             onboarding_dict["logo_url"] = logo_url
+            onboarding_dict["logo_variants"] = logo_variants
         
         if font_file_url:
             onboarding_dict["font_file_url"] = font_file_url
@@ -121,6 +102,19 @@ class OnboardingService:
             # Create new
             onboarding = await self.onboarding_repository.create(onboarding_dict)
         
+        # Generation prompts pick up the new brand profile
+        get_brand_context_cache().invalidate(user_id)
+        
+        # Track which files this document uses so replaced ones can be collected
+        if logo_url:
+            await self.asset_service.replace_reference(
+                onboarding_ref(user_id, "logo"), existing.logo_url if existing else None, logo_url
+            )
+        if font_file_url:
+            await self.asset_service.replace_reference(
+                onboarding_ref(user_id, "font"), existing.font_file_url if existing else None, font_file_url
+            )
+        
         return {
             "message": "Brand setup completed successfully",
             "data": {
@@ -128,6 +122,7 @@ class OnboardingService:
                 "brand_name": onboarding.brand_name,
                 "industry": onboarding.industry,
                 "logo_url": onboarding.logo_url,
+                "logo_variants": onboarding.logo_variants,
                 "logo_position": onboarding.logo_position,
                 "typography": onboarding.typography,
                 "font_type": onboarding.font_type,
@@ -142,6 +137,13 @@ class OnboardingService:
             }
         }
     
+    async def get_onboarding_etag(self, user_id: str) -> Optional[str]:
+        """Current ETag of the user's onboarding data, without loading it"""
+        version = await self.onboarding_repository.get_version(user_id)
+        if not version or not version.get("updated_at"):
+            return None
+        return document_etag(version["_id"], version["updated_at"])
+    
     async def get_onboarding(self, user_id: str) -> Optional[dict]:
         """Get onboarding data for user"""
         onboarding = await self.onboarding_repository.get_by_user_id(user_id)
@@ -150,11 +152,13 @@ class OnboardingService:
             return None
         
         return {
+            "etag": document_etag(onboarding.id, onboarding.updated_at),
             "data": {
                 "id": str(onboarding.id),
                 "brand_name": onboarding.brand_name,
                 "industry": onboarding.industry,
                 "logo_url": onboarding.logo_url,
+                "logo_variants": onboarding.logo_variants,
                 "logo_position": onboarding.logo_position,
                 "typography": onboarding.typography,
                 "font_type": onboarding.font_type,
@@ -1,4 +1,6 @@
-from fastapi import Depends, HTTPException, status
+from functools import partial
+from typing import AsyncContextManager, Callable, Optional
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.core.database import get_database
@@ -6,9 +8,22 @@ from app.core.security import decode_access_token
 from app.repositories.user_repository import UserRepository
 from app.repositories.onboarding_repository import OnboardingRepository
 from app.repositories.campaign_repository import CampaignRepository
+from app.repositories.campaign_batch_repository import CampaignBatchRepository
+from app.repositories.asset_repository import AssetRepository
+from app.repositories.generation_lease_repository import GenerationLeaseRepository
+from app.repositories.generation_quota_repository import GenerationQuotaRepository
+from app.repositories.translation_repository import TranslationRepository
+from app.core.storage import get_storage
+from app.services.asset_service import AssetService
 from app.services.auth_service import AuthService
+from app.services.brand_context import BrandContext, get_brand_context_cache
+from app.services.generation_guard import GenerationGuard
+from app.services.generation_quota import GenerationQuota
+from app.services.generation_scheduler import BATCH, INTERACTIVE, SchedulerTicket, get_generation_scheduler
 from app.services.onboarding_service import OnboardingService
-from app.core.exceptions import UnauthorizedError
+from app.core.exceptions import UnauthorizedError, ServiceUnavailableError
+from app.core.config import settings
+from app.core.inflight import generation_tracker
 
 security = HTTPBearer()
 
@@ -27,6 +42,14 @@ async def get_current_user_id(
         raise UnauthorizedError("Invalid or expired token")
 
 
+async def track_generation_request():
+    """Count a generation request as in flight so shutdown can drain it"""
+    if generation_tracker.draining:
+        raise ServiceUnavailableError("Server is shutting down, please retry")
+    async with generation_tracker.track():
+        yield
+
+
 def get_user_repository(db: AsyncIOMotorDatabase = Depends(get_database)) -> UserRepository:
     """Get user repository instance"""
     return UserRepository(db)
@@ -42,6 +65,78 @@ def get_campaign_repository(db: AsyncIOMotorDatabase = Depends(get_database)) ->
     return CampaignRepository(db)
 
 
+def get_campaign_batch_repository(db: AsyncIOMotorDatabase = Depends(get_database)) -> CampaignBatchRepository:
+    """Get campaign batch repository instance"""
+    return CampaignBatchRepository(db)
+
+
+def get_asset_repository(db: AsyncIOMotorDatabase = Depends(get_database)) -> AssetRepository:
+    """Get asset repository instance"""
+    return AssetRepository(db)
+
+
+async def get_current_user_plan(
+    user_id: str = Depends(get_current_user_id),
+    user_repo: UserRepository = Depends(get_user_repository)
+) -> str:
+    """Get the current user's plan"""
+    return await user_repo.get_plan(user_id) or settings.DEFAULT_PLAN
+
+
+def get_generation_priority(
+    x_request_priority: Optional[str] = Header(None, alias="X-Request-Priority")
+) -> str:
+    """Scheduling lane: "batch" if requested, otherwise interactive"""
+    return BATCH if (x_request_priority or "").lower() == BATCH else INTERACTIVE
+
+
+def get_generation_quota(db: AsyncIOMotorDatabase = Depends(get_database)) -> GenerationQuota:
+    """Get the cross-worker generation quota bound to this worker's scheduler"""
+    return GenerationQuota(GenerationQuotaRepository(db), get_generation_scheduler())
+
+
+def get_generation_slot(
+    user_id: str = Depends(get_current_user_id),
+    plan: str = Depends(get_current_user_plan),
+    priority: str = Depends(get_generation_priority),
+    generation_quota: GenerationQuota = Depends(get_generation_quota)
+) -> Callable[..., AsyncContextManager[SchedulerTicket]]:
+    """Generation slot factory bound to the current user, plan and lane; call with cost="""
+    return partial(generation_quota.slot, user_id, plan, priority)
+
+
+async def get_brand_context(
+    user_id: str = Depends(get_current_user_id),
+    onboarding_repo: OnboardingRepository = Depends(get_onboarding_repository)
+) -> BrandContext:
+    """Compiled brand profile of the current user, for generation prompts"""
+    return await get_brand_context_cache().get(user_id, onboarding_repo)
+
+
+def get_generation_lease_repository(db: AsyncIOMotorDatabase = Depends(get_database)) -> GenerationLeaseRepository:
+    """Get generation lease repository instance"""
+    return GenerationLeaseRepository(db)
+
+
+def get_translation_repository(db: AsyncIOMotorDatabase = Depends(get_database)) -> TranslationRepository:
+    """Get translation cache repository instance"""
+    return TranslationRepository(db)
+
+
+def get_generation_guard(
+    lease_repo: GenerationLeaseRepository = Depends(get_generation_lease_repository)
+) -> GenerationGuard:
+    """Get generation guard instance"""
+    return GenerationGuard(lease_repo)
+
+
+def get_asset_service(
+    asset_repo: AssetRepository = Depends(get_asset_repository)
+) -> AssetService:
+    """Get asset service instance"""
+    return AssetService(asset_repo, get_storage())
+
+
 def get_auth_service(
     user_repo: UserRepository = Depends(get_user_repository)
 ) -> AuthService:
@@ -50,8 +145,9 @@ def get_auth_service(
 
 
 def get_onboarding_service(
-    onboarding_repo: OnboardingRepository = Depends(get_onboarding_repository)
+    onboarding_repo: OnboardingRepository = Depends(get_onboarding_repository),
+    asset_service: AssetService = Depends(get_asset_service)
 ) -> OnboardingService:
     """Get onboarding service instance"""
-    return OnboardingService(onboarding_repo)
+    return OnboardingService(onboarding_repo, asset_service)
 
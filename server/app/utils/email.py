@@ -1,5 +1,11 @@
+import re
+import html
 import smtplib
+from datetime import datetime
 from email.message import EmailMessage
+from html.parser import HTMLParser
+from string import Template
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
 from app.core.config import settings
 
 # email details
@@ -9,17 +15,26 @@ EMAIL_PASSWORD = settings.EMAIL_PASSWORD
 # company details
 COMPANY_NAME = settings.COMPANY_NAME
 COMPANY_ADDRESS = settings.COMPANY_ADDRESS
+SUPPORT_EMAIL = settings.SUPPORT_EMAIL
 
+# template names
 FORGOT_PASSWORD = "forgot_password"
+WELCOME = "welcome"
+CAMPAIGN_READY = "campaign_ready"
 
-mail_template = {
-    FORGOT_PASSWORD: """
+# Placeholders use the {{KEY}} format
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+# Shared layout for every HTML email. $-fields are filled once when the
+# template is registered; {{KEY}} slots are filled on every send.
+_LAYOUT = Template("""
     <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Reset Your Password</title>
+    <title>$title</title>
 </head>
 <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #f5f5f5;">
     <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5; padding: 40px 20px;">
@@ -29,65 +44,34 @@ mail_template = {
                     <!-- Header Section -->
                     <tr>
                         <td style="background: linear-gradient(135deg, #CD9C74 0%, #E4C5AC 100%); padding: 50px 40px; text-align: center;">
-                            <h1 style="margin: 0; color: #ffffff; font-size: 32px; font-weight: 600; letter-spacing: -0.5px;">Password Reset</h1>
-                            <p style="margin: 15px 0 0 0; color: rgba(255,255,255,0.95); font-size: 16px; line-height: 1.5;">We received a request to reset your password</p>
+                            <h1 style="margin: 0; color: #ffffff; font-size: 32px; font-weight: 600; letter-spacing: -0.5px;">$heading</h1>
+                            <p style="margin: 15px 0 0 0; color: rgba(255,255,255,0.95); font-size: 16px; line-height: 1.5;">$subheading</p>
                         </td>
                     </tr>
-                    
+
                     <!-- Content Section -->
                     <tr>
                         <td style="padding: 50px 40px; background-color: #FAF0E6;">
-                            <p style="margin: 0 0 20px 0; color: #5A4A3A; font-size: 16px; line-height: 1.6;">Hello {{user_name}},</p>
-                            
-                            <p style="margin: 0 0 25px 0; color: #5A4A3A; font-size: 16px; line-height: 1.6;">
-                                You recently requested to reset your password for your account. Click the button below to reset it.
-                            </p>
-                            
-                            <!-- Reset Button -->
-                            <table width="100%" cellpadding="0" cellspacing="0" style="margin: 35px 0;">
-                                <tr>
-                                    <td align="center">
-                                        <a href="{{RESET_LINK}}" style="display: inline-block; background-color: #CD9C74; color: #ffffff; text-decoration: none; padding: 16px 48px; border-radius: 12px; font-size: 16px; font-weight: 600; letter-spacing: 0.3px; box-shadow: 0 4px 12px rgba(205, 156, 116, 0.3); transition: all 0.3s ease;">Reset Password</a>
-                                    </td>
-                                </tr>
-                            </table>
-                            
-                            <p style="margin: 30px 0 15px 0; color: #5A4A3A; font-size: 14px; line-height: 1.6;">
-                                <strong>This link will expire in 24 hours.</strong>
-                            </p>
-                            
-                            <p style="margin: 0 0 20px 0; color: #5A4A3A; font-size: 14px; line-height: 1.6;">
-                                If you didn't request a password reset, you can safely ignore this email. Your password will remain unchanged.
-                            </p>
-                            
-                            <!-- Alternative Link Section -->
-                            <div style="margin-top: 35px; padding: 20px; background-color: #ffffff; border-radius: 12px; border-left: 4px solid #CD9C74;">
-                                <p style="margin: 0 0 10px 0; color: #5A4A3A; font-size: 13px; line-height: 1.5;">
-                                    <strong>Button not working?</strong> Copy and paste this link into your browser:
-                                </p>
-                                <p style="margin: 0; color: #CD9C74; font-size: 13px; word-break: break-all; line-height: 1.5;">
-                                    {{RESET_LINK}}
-                                </p>
-                            </div>
+$content
                         </td>
                     </tr>
-                    
+
                     <!-- Footer Section -->
                     <tr>
                         <td style="padding: 40px; background-color: #F5EBE0; text-align: center; border-top: 1px solid #E8D5C4;">
                             <p style="margin: 0 0 10px 0; color: #8B7355; font-size: 14px; line-height: 1.5;">
-                                Need help? <a href="mailto:support@yourcompany.com" style="color: #CD9C74; text-decoration: none; font-weight: 600;">Contact Support</a>
+                                Need help? <a href="mailto:{{SUPPORT_EMAIL}}" style="color: #CD9C74; text-decoration: none; font-weight: 600;">Contact Support</a>
                             </p>
                             <p style="margin: 15px 0 0 0; color: #A89080; font-size: 12px; line-height: 1.5;">
-                                © 2024 {COMPANY_NAME}. All rights reserved.
+                                © {{YEAR}} {{COMPANY_NAME}}. All rights reserved.
                             </p>
                             <p style="margin: 8px 0 0 0; color: #A89080; font-size: 12px; line-height: 1.5;">
-                                {COMPANY_ADDRESS}
+                                {{COMPANY_ADDRESS}}
                             </p>
                         </td>
                     </tr>
                 </table>
-                
+
                 <!-- Legal Text -->
                 <table width="600" cellpadding="0" cellspacing="0" style="margin-top: 20px;">
                     <tr>
@@ -102,58 +86,288 @@ mail_template = {
         </tr>
     </table>
 </body>
-</html>"""
-}
+</html>""")
 
-def build_email_body(body_type: str, message_data: list[dict]) -> str:
+_BUTTON = Template("""                            <table width="100%" cellpadding="0" cellspacing="0" style="margin: 35px 0;">
+                                <tr>
+                                    <td align="center">
+                                        <a href="$href" style="display: inline-block; background-color: #CD9C74; color: #ffffff; text-decoration: none; padding: 16px 48px; border-radius: 12px; font-size: 16px; font-weight: 600; letter-spacing: 0.3px; box-shadow: 0 4px 12px rgba(205, 156, 116, 0.3); transition: all 0.3s ease;">$label</a>
+                                    </td>
+                                </tr>
+                            </table>""")
+
+_FORGOT_PASSWORD_CONTENT = """                            <p style="margin: 0 0 20px 0; color: #5A4A3A; font-size: 16px; line-height: 1.6;">Hello {{user_name}},</p>
+
+                            <p style="margin: 0 0 25px 0; color: #5A4A3A; font-size: 16px; line-height: 1.6;">
+                                You recently requested to reset your password for your account. Click the button below to reset it.
+                            </p>
+
+                            <!-- Reset Button -->
+""" + _BUTTON.substitute(href="{{RESET_LINK}}", label="Reset Password") + """
+
+                            <p style="margin: 30px 0 15px 0; color: #5A4A3A; font-size: 14px; line-height: 1.6;">
+                                <strong>This link will expire in 24 hours.</strong>
+                            </p>
+
+                            <p style="margin: 0 0 20px 0; color: #5A4A3A; font-size: 14px; line-height: 1.6;">
+                                If you didn't request a password reset, you can safely ignore this email. Your password will remain unchanged.
+                            </p>
+
+                            <!-- Alternative Link Section -->
+                            <div style="margin-top: 35px; padding: 20px; background-color: #ffffff; border-radius: 12px; border-left: 4px solid #CD9C74;">
+                                <p style="margin: 0 0 10px 0; color: #5A4A3A; font-size: 13px; line-height: 1.5;">
+                                    <strong>Button not working?</strong> Copy and paste this link into your browser:
+                                </p>
+                                <p style="margin: 0; color: #CD9C74; font-size: 13px; word-break: break-all; line-height: 1.5;">
+                                    {{RESET_LINK}}
+                                </p>
+                            </div>"""
+
+_WELCOME_CONTENT = """                            <p style="margin: 0 0 20px 0; color: #5A4A3A; font-size: 16px; line-height: 1.6;">Hello {{user_name}},</p>
+
+                            <p style="margin: 0 0 25px 0; color: #5A4A3A; font-size: 16px; line-height: 1.6;">
+                                Thanks for joining {{COMPANY_NAME}}. Set up your brand profile and create your first campaign in a few minutes.
+                            </p>
+
+""" + _BUTTON.substitute(href="{{CLIENT_URL}}/onboarding", label="Get Started")
+
+_CAMPAIGN_READY_CONTENT = """                            <p style="margin: 0 0 20px 0; color: #5A4A3A; font-size: 16px; line-height: 1.6;">Hello {{user_name}},</p>
+
+                            <p style="margin: 0 0 25px 0; color: #5A4A3A; font-size: 16px; line-height: 1.6;">
+                                Your campaign <strong>{{campaign_title}}</strong> is ready to review.
+                            </p>
+
+""" + _BUTTON.substitute(href="{{CAMPAIGN_LINK}}", label="View Campaign")
+
+
+class _TextExtractor(HTMLParser):
+    """Convert an HTML template to a plain-text alternative"""
+
+    BLOCK_TAGS = {"p", "div", "tr", "table", "h1", "h2", "h3", "br"}
+    SKIP_TAGS = {"head", "style", "script"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines: List[str] = []
+        self.current: List[str] = []
+        self.skip_depth = 0
+        self.hrefs: List[Optional[str]] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == "a":
+            self.hrefs.append(dict(attrs).get("href"))
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == "a":
+            href = self.hrefs.pop() if self.hrefs else None
+            # Keep the link target visible; mailto: links show the address
+            if href:
+                self.current.append(f" ({href.replace('mailto:', '')})")
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.current.append(data)
+
+    def _flush(self):
+        line = " ".join("".join(self.current).split())
+        self.current = []
+        if line:
+            self.lines.append(line)
+
+    def text(self) -> str:
+        self._flush()
+        return "\n\n".join(self.lines)
+
+
+def html_to_text(html_body: str) -> str:
+    """Build a plain-text version of an HTML email body"""
+    parser = _TextExtractor()
+    parser.feed(html_body)
+    parser.close()
+    return parser.text()
+
+
+def _compile(source: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Split a template into static segments and slot names (len(segments) == len(slots) + 1)"""
+    segments = []
+    slots = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(source):
+        segments.append(source[position:match.start()])
+        slots.append(match.group(1))
+        position = match.end()
+    segments.append(source[position:])
+    return tuple(segments), tuple(slots)
+
+
+def _render(segments: Tuple[str, ...], slots: Tuple[str, ...], values: Mapping[str, str]) -> str:
+    """Join segments and slot values in a single pass"""
+    parts = [segments[0]]
+    for slot, segment in zip(slots, segments[1:]):
+        parts.append(values.get(slot, ""))
+        parts.append(segment)
+    return "".join(parts)
+
+
+class RenderedEmail(NamedTuple):
+    """Rendered subject, HTML and plain-text bodies"""
+    subject: str
+    html: str
+    text: str
+
+
+class CompiledEmailTemplate:
+    """Email template parsed once into static segments and slots"""
+
+    def __init__(self, name: str, subject: str, html_body: str):
+        self.name = name
+        self.subject = _compile(subject)
+        self.html = _compile(html_body)
+        self.text = _compile(html_to_text(html_body))
+        self.slots = frozenset(self.subject[1] + self.html[1] + self.text[1])
+
+    def render(self, context: Mapping[str, object]) -> RenderedEmail:
+        """
+        Render subject, HTML and plain-text bodies.
+
+        Values are HTML-escaped for the HTML body only. Slots missing from the
+        context render as empty strings.
+        """
+        values = {key: str(context[key]) for key in self.slots if context.get(key) is not None}
+        escaped = {key: html.escape(value) for key, value in values.items()}
+        return RenderedEmail(
+            subject=_render(*self.subject, values),
+            html=_render(*self.html, escaped),
+            text=_render(*self.text, values),
+        )
+
+
+class EmailTemplateRegistry:
+    """Registry of compiled email templates"""
+
+    def __init__(self):
+        self._templates: Dict[str, CompiledEmailTemplate] = {}
+
+    def register(self, name: str, subject: str, html_body: str) -> CompiledEmailTemplate:
+        """Compile and register a template"""
+        template = CompiledEmailTemplate(name, subject, html_body)
+        self._templates[name] = template
+        return template
+
+    def get(self, name: str) -> CompiledEmailTemplate:
+        """Get a compiled template by name"""
+        template = self._templates.get(name)
+        if template is None:
+            raise ValueError(f"Email template '{name}' not found")
+        return template
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._templates
+
+
+email_templates = EmailTemplateRegistry()
+
+email_templates.register(
+    FORGOT_PASSWORD,
+    subject="Reset Your Password - {{COMPANY_NAME}}",
+    html_body=_LAYOUT.substitute(
+        title="Reset Your Password",
+        heading="Password Reset",
+        subheading="We received a request to reset your password",
+        content=_FORGOT_PASSWORD_CONTENT,
+    ),
+)
+
+email_templates.register(
+    WELCOME,
+    subject="Welcome to {{COMPANY_NAME}}",
+    html_body=_LAYOUT.substitute(
+        title="Welcome",
+        heading="Welcome aboard",
+        subheading="Your account is ready",
+        content=_WELCOME_CONTENT,
+    ),
+)
+
+email_templates.register(
+    CAMPAIGN_READY,
+    subject="Your campaign is ready - {{COMPANY_NAME}}",
+    html_body=_LAYOUT.substitute(
+        title="Your Campaign Is Ready",
+        heading="Campaign Ready",
+        subheading="Your ideas and ad copy have been generated",
+        content=_CAMPAIGN_READY_CONTENT,
+    ),
+)
+
+
+def _build_context(message_data: list[dict]) -> Dict[str, object]:
+    """Merge company defaults with per-message key/value pairs"""
+    context: Dict[str, object] = {
+        "COMPANY_NAME": COMPANY_NAME,
+        "COMPANY_ADDRESS": COMPANY_ADDRESS,
+        "SUPPORT_EMAIL": SUPPORT_EMAIL,
+        "CLIENT_URL": settings.CLIENT_URL,
+        "YEAR": datetime.utcnow().year,
+    }
+    for data in message_data:
+        context[data.get("key", "")] = data.get("value", "")
+    return context
+
+
+def render_email(body_type: str, message_data: list[dict]) -> RenderedEmail:
     """
-    Build email body by replacing placeholders in template with message data.
-    
+    Render an email template with message data.
+
     Args:
         body_type: Type of email template (e.g., 'forgot_password')
         message_data: List of dictionaries containing key-value pairs for template replacement
                      Example: [{"key": "RESET_LINK", "value": "https://example.com/reset?token=abc123"}]
-    
+
     Returns:
-        Processed email body string with placeholders replaced
+        RenderedEmail with subject, HTML body and plain-text body
     """
-    if body_type not in mail_template:
-        raise ValueError(f"Email template '{body_type}' not found")
-    
-    template = mail_template[body_type]
-    
-    # Replace placeholders in template with values from message_data
-    # Template uses {{KEY}} format, so we need to construct {{KEY}} for replacement
-    for data in message_data:
-        key = data.get("key", "")
-        value = data.get("value", "")
-        # Construct placeholder in format {{KEY}} (double curly braces)
-        placeholder = "{{" + key + "}}"
-        
-        if placeholder in template:
-            template = template.replace(placeholder, str(value))
-    
-    return template
+    return email_templates.get(body_type).render(_build_context(message_data))
+
+
+def build_email_body(body_type: str, message_data: list[dict]) -> str:
+    """
+    Build the HTML email body by filling template placeholders with message data.
+
+    Args:
+        body_type: Type of email template (e.g., 'forgot_password')
+        message_data: List of dictionaries containing key-value pairs for template replacement
 
+    Returns:
+        Processed HTML email body
+    """
+    return render_email(body_type, message_data).html
 
 
 def send_email(
     to_address: str,
-    subject: str,
+    subject: Optional[str],
     body_type: str,
     message_data: list[dict]
 ):
+    rendered = render_email(body_type, message_data)
+
     msg = EmailMessage()
     msg["From"] = EMAIL_ADDRESS
     msg["To"] = to_address
-    msg["Subject"] = subject
-
-    body = build_email_body(body_type, message_data)
+    msg["Subject"] = subject or rendered.subject
 
-    # All email templates are HTML, so always set as HTML alternative
-    # with a plain text fallback for email clients that don't support HTML
-    msg.set_content("Your email client does not support HTML. Please view this email in an HTML-compatible email client.")
-    msg.add_alternative(body, subtype="html")
+    # Plain-text body generated from the template, with the HTML as alternative
+    msg.set_content(rendered.text)
+    msg.add_alternative(rendered.html, subtype="html")
 
     with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
         server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
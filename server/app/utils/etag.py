@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import Response
+
+# Polled reads must be revalidated every time, but only by the same user
+CACHE_CONTROL = "private, no-cache"
+
+
+def document_etag(document_id: Any, updated_at: datetime) -> str:
+    """Weak ETag for a document version: its id plus updated_at"""
+    return f'W/"{document_id}-{updated_at:%Y%m%d%H%M%S%f}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    opaque = etag.removeprefix("W/")
+    return "*" in candidates or any(tag.removeprefix("W/") == opaque for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    """304 response carrying the current validator"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Attach the validator to a full response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,60 @@
+"""
+Image derivative rendering.
+
+Runs inside process-pool workers, so this module only imports Pillow and
+the standard library.
+"""
+import io
+from typing import Dict, Tuple
+
+# (file extension, Pillow format, content type)
+WEBP = ("webp", "WEBP", "image/webp")
+AVIF = ("avif", "AVIF", "image/avif")
+
+
+def _avif_supported() -> bool:
+    from PIL import Image
+    try:
+        import pillow_avif  # noqa: F401  registers the AVIF plugin on older Pillow
+    except ImportError:
+        pass
+    return "AVIF" in Image.SAVE
+
+
+def render_derivatives(
+    data: bytes,
+    sizes: Dict[str, int],
+    quality: int = 80
+) -> Dict[str, Tuple[str, bytes, str]]:
+    """
+    Render resized WebP (and AVIF when available) variants of an image.
+
+    Args:
+        data: Original image bytes
+        sizes: Variant name -> longest side in pixels; 0 keeps the original size
+        quality: Encoder quality (0-100)
+
+    Returns:
+        Variant key (e.g. "thumbnail_webp") -> (extension, bytes, content type)
+    """
+    from PIL import Image
+
+    formats = [WEBP] + ([AVIF] if _avif_supported() else [])
+    results: Dict[str, Tuple[str, bytes, str]] = {}
+
+    with Image.open(io.BytesIO(data)) as source:
+        source.seek(0)  # first frame of animated GIFs
+        has_alpha = source.mode in ("RGBA", "LA", "PA") or "transparency" in source.info
+        image = source.convert("RGBA" if has_alpha else "RGB")
+
+    for name, max_side in sizes.items():
+        variant = image
+        if max_side and max(image.size) > max_side:
+            variant = image.copy()
+            variant.thumbnail((max_side, max_side), Image.LANCZOS)
+        for extension, image_format, content_type in formats:
+            buffer = io.BytesIO()
+            variant.save(buffer, image_format, quality=quality)
+            results[f"{name}_{extension}"] = (extension, buffer.getvalue(), content_type)
+
+    return results
@@ -0,0 +1,159 @@
+import asyncio
+import gzip
+import hashlib
+import os
+import uuid
+from typing import AsyncIterator, Dict, Iterable, NamedTuple, Optional
+from fastapi import UploadFile
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.core.static_files import PRECOMPRESSIBLE_EXTENSIONS
+from app.core.storage import INCOMING_PREFIX, StorageBackend, content_key, url_for_key
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are produced without it
+    brotli = None
+
+
+# Leading bytes -> (extension, content type)
+MAGIC_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", ".png", "image/png"),
+    (b"\xff\xd8\xff", ".jpg", "image/jpeg"),
+    (b"GIF87a", ".gif", "image/gif"),
+    (b"GIF89a", ".gif", "image/gif"),
+    (b"wOFF", ".woff", "font/woff"),
+    (b"wOF2", ".woff2", "font/woff2"),
+    (b"OTTO", ".otf", "font/otf"),
+    (b"\x00\x01\x00\x00", ".ttf", "font/ttf"),
+    (b"true", ".ttf", "font/ttf"),
+)
+
+# Bytes read up front to sniff the file type (SVG may start with a long XML prolog)
+SNIFF_SIZE = 4096
+
+# Extensions that share a signature with the detected one
+EXTENSION_ALIASES: Dict[str, str] = {
+    ".jpeg": ".jpg",
+}
+
+
+class StoredUpload(NamedTuple):
+    """Result of streaming an upload into storage"""
+    key: str
+    url: str
+    size: int
+    sha256: str
+    content_type: str
+
+
+def detect_file_type(head: bytes) -> Optional[tuple]:
+    """
+    Detect file type from the first bytes of a file.
+
+    Returns:
+        (extension, content_type) or None if the type is not recognised
+    """
+    for signature, extension, content_type in MAGIC_SIGNATURES:
+        if head.startswith(signature):
+            return extension, content_type
+    if head[8:12] == b"WEBP" and head.startswith(b"RIFF"):
+        return ".webp", "image/webp"
+
+    # SVG is text: skip BOM/whitespace, XML declaration and comments
+    text = head.lstrip(b"\xef\xbb\xbf").lstrip().lower()
+    if text.startswith(b"<?xml") or text.startswith(b"<!--") or text.startswith(b"<svg") or text.startswith(b"<!doctype svg"):
+        if b"<svg" in text:
+            return ".svg", "image/svg+xml"
+    return None
+
+
+async def stream_upload(
+    file: UploadFile,
+    storage: StorageBackend,
+    allowed_extensions: Iterable[str],
+    max_size: int,
+    chunk_size: Optional[int] = None
+) -> StoredUpload:
+    """
+    Stream an upload into content-addressed storage in chunks.
+
+    The first chunk is sniffed to determine the real file type and every chunk
+    is hashed on its way to the storage backend. The object is written under
+    a temporary key and then moved to its SHA-256 key, so identical uploads
+    end up as one object. The upload is aborted as soon as it grows past
+    max_size.
+
+    Args:
+        file: Incoming upload
+        storage: Backend the file is stored in
+        allowed_extensions: Extensions accepted for this upload
+        max_size: Maximum size in bytes
+        chunk_size: Read size (defaults to settings.UPLOAD_CHUNK_SIZE)
+
+    Returns:
+        StoredUpload describing the saved file
+    """
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    allowed = {EXTENSION_ALIASES.get(ext.lower(), ext.lower()) for ext in allowed_extensions}
+
+    first_chunk = await file.read(max(chunk_size, SNIFF_SIZE))
+    if not first_chunk:
+        raise ValidationError("Uploaded file is empty")
+
+    detected = detect_file_type(first_chunk)
+    if detected is None or detected[0] not in allowed:
+        raise ValidationError(f"File type not allowed. Allowed types: {', '.join(sorted(allowed))}")
+    extension, content_type = detected
+
+    hasher = hashlib.sha256()
+
+    async def chunks() -> AsyncIterator[bytes]:
+        size = 0
+        chunk = first_chunk
+        while chunk:
+            size += len(chunk)
+            if size > max_size:
+                raise ValidationError(f"File size exceeds maximum allowed size of {max_size / 1024 / 1024:g}MB")
+            hasher.update(chunk)
+            yield chunk
+            chunk = await file.read(chunk_size)
+
+    incoming_key = f"{INCOMING_PREFIX}{uuid.uuid4().hex}{extension}"
+    size = await storage.put_stream(incoming_key, chunks(), content_type=content_type)
+
+    # Same bytes -> same key, so replacing an existing object is harmless
+    key = content_key(hasher.hexdigest(), extension)
+    await storage.move(incoming_key, key)
+
+    return StoredUpload(
+        key=key,
+        url=url_for_key(key),
+        size=size,
+        sha256=hasher.hexdigest(),
+        content_type=content_type
+    )
+
+
+def _compress_variants(data: bytes) -> Dict[str, bytes]:
+    variants = {".gz": gzip.compress(data, compresslevel=9)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    # Only keep variants that actually save bytes
+    return {suffix: body for suffix, body in variants.items() if len(body) < len(data)}
+
+
+async def store_precompressed_variants(storage: StorageBackend, stored: StoredUpload) -> None:
+    """
+    Store .gz (and .br when brotli is installed) variants next to a
+    compressible upload so the /uploads mount can serve them directly.
+    """
+    if not storage.serves_locally:
+        return
+    if os.path.splitext(stored.key)[1].lower() not in PRECOMPRESSIBLE_EXTENSIONS:
+        return
+
+    data = b"".join([chunk async for chunk in storage.get_stream(stored.key)])
+    variants = await asyncio.to_thread(_compress_variants, data)
+    for suffix, body in variants.items():
+        await storage.put_bytes(stored.key + suffix, body)
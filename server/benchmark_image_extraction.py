@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark Gemini image extraction and storage
+
+Compares the previous reflection-based walk of a generate_content response
+(dir() probing, snake/camelCase lookups, string base64 detection) with the
+typed extractor, and times writing the image to local storage.
+
+Usage:
+    python benchmark_image_extraction.py [--size BYTES] [--iterations N]
+"""
+import argparse
+import asyncio
+import base64
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.core.storage import LocalStorageBackend
+from app.services.agent.image_response import extract_inline_image
+
+
+def build_response(image: bytes) -> SimpleNamespace:
+    """Response shaped like the SDK's: candidates[].content.parts[].inline_data"""
+    text_part = SimpleNamespace(inline_data=SimpleNamespace(data=b"", mime_type=""), text="Here is your image")
+    image_part = SimpleNamespace(inline_data=SimpleNamespace(data=image, mime_type="image/png"), text="")
+    content = SimpleNamespace(parts=[text_part, image_part])
+    return SimpleNamespace(candidates=[SimpleNamespace(content=content)])
+
+
+def legacy_extract(response):
+    """The extraction loop generate_image_only used before the typed extractor"""
+    for candidate in response.candidates:
+        [attr for attr in dir(candidate) if not attr.startswith('_')]
+        content = candidate.content
+        [attr for attr in dir(content) if not attr.startswith('_')]
+        for part in content.parts:
+            part_attrs = [attr for attr in dir(part) if not attr.startswith('_')]
+            inline_data = None
+            if 'inline_data' in part_attrs:
+                inline_data = getattr(part, 'inline_data', None)
+            elif 'inlineData' in part_attrs:
+                inline_data = getattr(part, 'inlineData', None)
+            if inline_data:
+                inline_attrs = [attr for attr in dir(inline_data) if not attr.startswith('_')]
+                image_bytes = None
+                if 'data' in inline_attrs:
+                    data_attr = getattr(inline_data, 'data', None)
+                    if data_attr:
+                        if isinstance(data_attr, bytes):
+                            image_bytes = data_attr
+                        elif isinstance(data_attr, str):
+                            image_bytes = base64.b64decode(data_attr)
+                if image_bytes:
+                    return image_bytes
+    return None
+
+
+def time_per_call(function, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations
+
+
+async def time_storage_writes(image: bytes, iterations: int) -> tuple:
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalStorageBackend(Path(root))
+
+        start = time.perf_counter()
+        for index in range(iterations):
+            await storage.put_bytes(f"bytes-{index}.png", image)
+        put_bytes = (time.perf_counter() - start) / iterations
+
+        async def single_chunk():
+            yield image
+
+        start = time.perf_counter()
+        for index in range(iterations):
+            await storage.put_stream(f"stream-{index}.png", single_chunk())
+        put_stream = (time.perf_counter() - start) / iterations
+    return put_bytes, put_stream
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Gemini image extraction")
+    parser.add_argument("--size", type=int, default=1_500_000, help="Image size in bytes")
+    parser.add_argument("--iterations", type=int, default=2000, help="Extraction iterations")
+    parser.add_argument("--write-iterations", type=int, default=50, help="Storage write iterations")
+    args = parser.parse_args()
+
+    image = b"\x89PNG\r\n\x1a\n" + bytes(args.size - 8)
+    response = build_response(image)
+    rest_response = {"candidates": [{"content": {"parts": [
+        {"inlineData": {"mimeType": "image/png", "data": base64.b64encode(image).decode()}}
+    ]}}]}
+
+    legacy = time_per_call(lambda: legacy_extract(response), args.iterations)
+    typed = time_per_call(lambda: extract_inline_image(response), args.iterations)
+    rest = time_per_call(lambda: extract_inline_image(rest_response), max(1, args.iterations // 100))
+    put_bytes, put_stream = asyncio.run(time_storage_writes(image, args.write_iterations))
+
+    print(f"Image size: {args.size} bytes")
+    print(f"Legacy extraction:        {legacy * 1e6:10.1f} us/image")
+    print(f"Typed extraction:         {typed * 1e6:10.1f} us/image ({legacy / typed:.1f}x faster)")
+    print(f"Typed extraction (REST):  {rest * 1e6:10.1f} us/image (one base64 decode)")
+    print(f"Storage put_bytes:        {put_bytes * 1e3:10.2f} ms/image")
+    print(f"Storage put_stream:       {put_stream * 1e3:10.2f} ms/image")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Copy existing uploads from the local UPLOAD_DIR into the configured storage backend.
+
+Usage:
+    STORAGE_BACKEND=s3 python migrate_storage.py [--overwrite]
+"""
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.storage import LocalStorageBackend, create_storage_backend, migrate_storage
+
+
+async def main(overwrite: bool) -> None:
+    source = LocalStorageBackend(Path(settings.UPLOAD_DIR))
+    destination = create_storage_backend()
+    if isinstance(destination, LocalStorageBackend):
+        print("STORAGE_BACKEND is 'local'; nothing to migrate")
+        return
+    copied = await migrate_storage(source, destination, overwrite=overwrite)
+    print(f"Migrated {copied} file(s)")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(overwrite="--overwrite" in sys.argv[1:]))
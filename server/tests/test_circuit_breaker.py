@@ -0,0 +1,35 @@
+import time
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert 0 < breaker.retry_after <= 30
+
+
+def test_success_resets_the_count():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_call_decides():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == HALF_OPEN
+    assert breaker.retry_after == 0
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.02)
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
@@ -0,0 +1,73 @@
+import asyncio
+from app.services.generation_quota import GenerationQuota
+from app.services.generation_scheduler import GenerationScheduler
+
+PLANS = {"free": {"max_in_flight": 1, "weight": 1}}
+
+
+class SharedSlots:
+    """In-memory stand-in for the MongoDB slots all workers share"""
+
+    def __init__(self):
+        self.slots = {}
+
+    async def acquire(self, user_id, token, limit, ttl_seconds):
+        held = self.slots.setdefault(user_id, set())
+        if len(held) >= limit:
+            return False
+        held.add(token)
+        return True
+
+    async def renew(self, user_id, token, ttl_seconds):
+        return token in self.slots.get(user_id, ())
+
+    async def release(self, user_id, token):
+        self.slots.get(user_id, set()).discard(token)
+
+
+def _worker(slots: SharedSlots) -> GenerationQuota:
+    quota = GenerationQuota(slots, GenerationScheduler(capacity=4, plan_limits=PLANS, default_plan="free"))
+    quota.poll_interval = 0.01
+    return quota
+
+
+def test_limit_holds_across_workers():
+    async def scenario():
+        slots = SharedSlots()
+        workers = [_worker(slots), _worker(slots)]
+        running = 0
+        peak = 0
+
+        async def generate(quota):
+            nonlocal running, peak
+            async with quota.slot("u", "free"):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.02)
+                running -= 1
+
+        await asyncio.gather(*(generate(workers[index % 2]) for index in range(4)))
+        assert peak == 1
+        assert slots.slots["u"] == set()
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+
+def test_cancelled_holder_releases_its_slot():
+    async def scenario():
+        slots = SharedSlots()
+        quota = _worker(slots)
+
+        async def generate():
+            async with quota.slot("u", "free"):
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(generate())
+        await asyncio.sleep(0.01)
+        assert len(slots.slots["u"]) == 1
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert slots.slots["u"] == set()
+        assert quota.scheduler.in_flight == 0
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from app.services.generation_scheduler import GenerationScheduler
+
+PLANS = {"free": {"max_in_flight": 2, "weight": 1}}
+
+
+def test_cancel_while_being_dispatched():
+    async def scenario():
+        scheduler = GenerationScheduler(capacity=1, plan_limits=PLANS, default_plan="free")
+        entered = asyncio.Event()
+
+        async def queued():
+            async with scheduler.slot("b"):
+                entered.set()
+
+        async with scheduler.slot("a"):
+            waiter = asyncio.create_task(queued())
+            await asyncio.sleep(0)
+            assert scheduler.queue_depth == 1
+            # Cancelled, but its handler has not run when the slot is released
+            waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert not entered.is_set()
+        assert scheduler.in_flight == 0
+        assert scheduler.queue_depth == 0
+
+        async with scheduler.slot("c"):
+            assert scheduler.in_flight == 1
+        assert scheduler.in_flight == 0
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+
+def test_cancel_while_queued():
+    async def scenario():
+        scheduler = GenerationScheduler(capacity=1, plan_limits=PLANS, default_plan="free")
+
+        async def queued():
+            async with scheduler.slot("b"):
+                pass
+
+        async with scheduler.slot("a"):
+            waiter = asyncio.create_task(queued())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert scheduler.queue_depth == 0
+        assert scheduler.in_flight == 0
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
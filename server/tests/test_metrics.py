@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from google.api_core.exceptions import ServiceUnavailable
+from app.core import metrics
+from app.core.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker("gemini", failure_threshold=2, reset_timeout=30)
+    monkeypatch.setattr(metrics, "gemini_circuit_breaker", breaker)
+    return breaker
+
+
+def _duration_count(outcome: str) -> float:
+    value = metrics.REGISTRY.get_sample_value(
+        "gemini_call_duration_seconds_count",
+        {"agent": "test", "operation": "call", "outcome": outcome}
+    )
+    return value or 0.0
+
+
+def test_api_errors_open_the_circuit(breaker):
+    before = _duration_count("error")
+    for _ in range(2):
+        with pytest.raises(ServiceUnavailable):
+            with metrics.observe_gemini("test", "call"):
+                raise ServiceUnavailable("overloaded")
+    assert breaker.state == OPEN
+    assert _duration_count("error") == before + 2
+
+
+def test_local_errors_leave_the_circuit_alone(breaker):
+    before = _duration_count("local_error")
+    for error in (ValueError("Unknown field for GenerationConfig"), TypeError("unexpected keyword argument")):
+        with pytest.raises(type(error)):
+            with metrics.observe_gemini("test", "call"):
+                raise error
+    assert breaker.failures == 0
+    assert breaker.state == CLOSED
+    assert _duration_count("local_error") == before + 2
+
+
+def test_cancellation_leaves_the_circuit_alone(breaker):
+    with pytest.raises(asyncio.CancelledError):
+        with metrics.observe_gemini("test", "call"):
+            raise asyncio.CancelledError()
+    assert breaker.failures == 0
+
+
+def test_success_closes_the_circuit(breaker):
+    breaker.record_failure()
+    with metrics.observe_gemini("test", "call"):
+        pass
+    assert breaker.failures == 0
+    assert breaker.state == CLOSED